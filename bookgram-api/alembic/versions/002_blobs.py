@@ -0,0 +1,53 @@
+"""Content-addressed blob store with refcounts
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Create blobs table
+    op.create_table(
+        "blobs",
+        sa.Column("checksum", sa.String(length=64), nullable=False),
+        sa.Column("location_url", sa.String(length=512), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("refcount", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("checksum"),
+        sa.UniqueConstraint("location_url"),
+    )
+
+    # Files reference their blob; several files may now share one location
+    op.add_column("files", sa.Column("checksum", sa.String(length=64), nullable=True))
+    op.create_foreign_key("files_checksum_fkey", "files", "blobs", ["checksum"], ["checksum"])
+    op.create_index(op.f("ix_files_checksum"), "files", ["checksum"], unique=False)
+    op.drop_index(op.f("ix_files_location_url"), table_name="files")
+    op.create_index(op.f("ix_files_location_url"), "files", ["location_url"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_files_location_url"), table_name="files")
+    op.create_index(op.f("ix_files_location_url"), "files", ["location_url"], unique=True)
+    op.drop_index(op.f("ix_files_checksum"), table_name="files")
+    op.drop_constraint("files_checksum_fkey", "files", type_="foreignkey")
+    op.drop_column("files", "checksum")
+
+    # Drop blobs table
+    op.drop_table("blobs")
@@ -0,0 +1,63 @@
+"""Normalize topic subscriptions into user_topic_subscriptions
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_topic_subscriptions",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("topic", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "topic"),
+    )
+
+    # Backfill from the subscribed_topics arrays
+    op.execute(
+        """
+        INSERT INTO user_topic_subscriptions (user_id, topic, created_at)
+        SELECT DISTINCT u.id, t.topic, timezone('UTC', now())
+        FROM users u
+        CROSS JOIN LATERAL unnest(u.subscribed_topics) AS t(topic)
+        WHERE t.topic IS NOT NULL
+        """
+    )
+
+    op.drop_column("users", "subscribed_topics")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column("users", sa.Column("subscribed_topics", sa.ARRAY(sa.String()), nullable=True))
+    op.execute(
+        """
+        UPDATE users
+        SET subscribed_topics = coalesce(
+            (
+                SELECT array_agg(s.topic ORDER BY s.created_at, s.topic)
+                FROM user_topic_subscriptions s
+                WHERE s.user_id = users.id
+            ),
+            '{}'
+        )
+        """
+    )
+    op.drop_table("user_topic_subscriptions")
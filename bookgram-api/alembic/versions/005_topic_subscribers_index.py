@@ -0,0 +1,42 @@
+"""Index user_topic_subscriptions by topic for subscriber lookups
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build without blocking subscribe inserts on large tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_topic_subscriptions_topic_user_id",
+            "user_topic_subscriptions",
+            ["topic", "user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_user_topic_subscriptions_topic_user_id",
+            table_name="user_topic_subscriptions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,41 @@
+"""Track chapter/page extraction jobs on files
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "files",
+        sa.Column(
+            "extraction_status", sa.String(length=20), nullable=False, server_default="pending"
+        ),
+    )
+    op.add_column(
+        "files",
+        sa.Column("extraction_attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column("files", sa.Column("extraction_error", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("files", "extraction_error")
+    op.drop_column("files", "extraction_attempts")
+    op.drop_column("files", "extraction_status")
@@ -0,0 +1,77 @@
+"""Move chapters/pages out of files into file_pages
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "file_pages",
+        sa.Column("file_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=10), nullable=False),
+        sa.Column("page_index", sa.Integer(), nullable=False),
+        sa.Column("byte_offset", sa.BigInteger(), nullable=True),
+        sa.Column("byte_length", sa.BigInteger(), nullable=True),
+        sa.Column("text", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["file_id"], ["files.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("file_id", "kind", "page_index"),
+    )
+    op.add_column("files", sa.Column("chapter_count", sa.Integer(), nullable=True))
+    op.add_column("files", sa.Column("page_count", sa.Integer(), nullable=True))
+
+    # Backfill from the arrays (byte ranges of existing extractions are unknown)
+    for kind, column in (("page", "pages"), ("chapter", "chapters")):
+        op.execute(
+            f"""
+            INSERT INTO file_pages (file_id, kind, page_index, text)
+            SELECT f.id, '{kind}', t.ordinality - 1, t.text
+            FROM files f
+            CROSS JOIN LATERAL unnest(f.{column}) WITH ORDINALITY AS t(text, ordinality)
+            """
+        )
+    op.execute(
+        """
+        UPDATE files
+        SET chapter_count = cardinality(chapters), page_count = cardinality(pages)
+        WHERE chapters IS NOT NULL OR pages IS NOT NULL
+        """
+    )
+
+    op.drop_column("files", "pages")
+    op.drop_column("files", "chapters")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column("files", sa.Column("chapters", sa.ARRAY(sa.Text()), nullable=True))
+    op.add_column("files", sa.Column("pages", sa.ARRAY(sa.Text()), nullable=True))
+    for kind, column in (("page", "pages"), ("chapter", "chapters")):
+        op.execute(
+            f"""
+            UPDATE files
+            SET {column} = (
+                SELECT array_agg(p.text ORDER BY p.page_index)
+                FROM file_pages p
+                WHERE p.file_id = files.id AND p.kind = '{kind}'
+            )
+            """
+        )
+    op.drop_column("files", "page_count")
+    op.drop_column("files", "chapter_count")
+    op.drop_table("file_pages")
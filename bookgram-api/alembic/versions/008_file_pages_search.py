@@ -0,0 +1,91 @@
+"""Full-text search vector on file_pages
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Files whose pages are vectorized per backfill transaction
+BACKFILL_FILES_PER_BATCH = 100
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable column without a default: a catalog change, no table rewrite
+    op.add_column("file_pages", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+    # New and changed rows are vectorized by a trigger from now on
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION file_pages_search_vector() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := CASE WHEN NEW.kind = 'page'
+                THEN to_tsvector('english'::regconfig, coalesce(NEW.text, '')) END;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER file_pages_search_vector
+        BEFORE INSERT OR UPDATE OF kind, text ON file_pages
+        FOR EACH ROW EXECUTE FUNCTION file_pages_search_vector()
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        # Existing pages: one short transaction per range of files (primary key order),
+        # so row locks are held briefly and extraction writes keep going
+        conn = op.get_bind()
+        max_file_id = conn.execute(sa.text("SELECT max(file_id) FROM file_pages")).scalar() or 0
+        for start in range(0, max_file_id, BACKFILL_FILES_PER_BATCH):
+            conn.execute(
+                sa.text(
+                    """
+                    UPDATE file_pages
+                    SET search_vector = to_tsvector('english'::regconfig, coalesce(text, ''))
+                    WHERE file_id > :start AND file_id <= :stop
+                      AND kind = 'page' AND search_vector IS NULL
+                    """
+                ),
+                {"start": start, "stop": start + BACKFILL_FILES_PER_BATCH},
+            )
+
+        # Build without blocking extraction writes on large tables
+        op.create_index(
+            "ix_file_pages_search_vector",
+            "file_pages",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_file_pages_search_vector",
+            table_name="file_pages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.execute("DROP TRIGGER IF EXISTS file_pages_search_vector ON file_pages")
+    op.execute("DROP FUNCTION IF EXISTS file_pages_search_vector()")
+    op.drop_column("file_pages", "search_vector")
@@ -0,0 +1,56 @@
+"""Outbox jobs for post-upload work
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "outbox_jobs",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("kind", sa.String(length=50), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("status", sa.String(length=20), server_default="pending", nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_outbox_jobs_status_available_at", "outbox_jobs", ["status", "available_at"])
+    # Extraction jobs still pending from before the outbox are picked up by the worker
+    op.execute(
+        """
+        INSERT INTO outbox_jobs (kind, payload, available_at, created_at, updated_at)
+        SELECT 'extract_file', jsonb_build_object('file_id', id),
+               timezone('utc', now()), timezone('utc', now()), timezone('utc', now())
+        FROM files
+        WHERE extraction_status IN ('pending', 'processing')
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_outbox_jobs_status_available_at", table_name="outbox_jobs")
+    op.drop_table("outbox_jobs")
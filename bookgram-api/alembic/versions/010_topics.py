@@ -0,0 +1,125 @@
+"""Normalize topics into a topics table referenced by integer ID
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "topics",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.execute(
+        """
+        INSERT INTO topics (name, created_at)
+        SELECT name, timezone('UTC', now())
+        FROM (
+            SELECT topic FROM files
+            UNION
+            SELECT topic FROM user_topic_subscriptions
+        ) AS t(name)
+        ORDER BY name
+        """
+    )
+
+    # files.topic -> files.topic_id
+    op.add_column("files", sa.Column("topic_id", sa.Integer(), nullable=True))
+    op.execute("UPDATE files SET topic_id = t.id FROM topics t WHERE t.name = files.topic")
+    op.alter_column("files", "topic_id", nullable=False)
+    op.create_foreign_key("files_topic_id_fkey", "files", "topics", ["topic_id"], ["id"])
+    op.create_index("ix_files_topic_id_id", "files", ["topic_id", "id"])
+    op.drop_index("ix_files_topic", table_name="files")
+    op.drop_column("files", "topic")
+
+    # user_topic_subscriptions.topic -> user_topic_subscriptions.topic_id
+    op.add_column("user_topic_subscriptions", sa.Column("topic_id", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE user_topic_subscriptions SET topic_id = t.id
+        FROM topics t WHERE t.name = user_topic_subscriptions.topic
+        """
+    )
+    op.alter_column("user_topic_subscriptions", "topic_id", nullable=False)
+    op.drop_index(
+        "ix_user_topic_subscriptions_topic_user_id",
+        table_name="user_topic_subscriptions",
+        if_exists=True,
+    )
+    op.drop_constraint("user_topic_subscriptions_pkey", "user_topic_subscriptions", type_="primary")
+    op.drop_column("user_topic_subscriptions", "topic")
+    op.create_primary_key(
+        "user_topic_subscriptions_pkey", "user_topic_subscriptions", ["user_id", "topic_id"]
+    )
+    op.create_foreign_key(
+        "user_topic_subscriptions_topic_id_fkey",
+        "user_topic_subscriptions",
+        "topics",
+        ["topic_id"],
+        ["id"],
+    )
+    op.create_index(
+        "ix_user_topic_subscriptions_topic_id_user_id",
+        "user_topic_subscriptions",
+        ["topic_id", "user_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        "user_topic_subscriptions", sa.Column("topic", sa.String(length=255), nullable=True)
+    )
+    op.execute(
+        """
+        UPDATE user_topic_subscriptions SET topic = t.name
+        FROM topics t WHERE t.id = user_topic_subscriptions.topic_id
+        """
+    )
+    op.alter_column("user_topic_subscriptions", "topic", nullable=False)
+    op.drop_index(
+        "ix_user_topic_subscriptions_topic_id_user_id", table_name="user_topic_subscriptions"
+    )
+    op.drop_constraint(
+        "user_topic_subscriptions_topic_id_fkey", "user_topic_subscriptions", type_="foreignkey"
+    )
+    op.drop_constraint("user_topic_subscriptions_pkey", "user_topic_subscriptions", type_="primary")
+    op.drop_column("user_topic_subscriptions", "topic_id")
+    op.create_primary_key(
+        "user_topic_subscriptions_pkey", "user_topic_subscriptions", ["user_id", "topic"]
+    )
+    op.create_index(
+        "ix_user_topic_subscriptions_topic_user_id",
+        "user_topic_subscriptions",
+        ["topic", "user_id"],
+    )
+
+    op.add_column("files", sa.Column("topic", sa.String(length=255), nullable=True))
+    op.execute("UPDATE files SET topic = t.name FROM topics t WHERE t.id = files.topic_id")
+    op.alter_column("files", "topic", nullable=False)
+    op.create_index("ix_files_topic", "files", ["topic"])
+    op.drop_index("ix_files_topic_id_id", table_name="files")
+    op.drop_constraint("files_topic_id_fkey", "files", type_="foreignkey")
+    op.drop_column("files", "topic_id")
+
+    op.drop_table("topics")
@@ -1,5 +1,5 @@
 """API routes."""
 
-from app.api import health, v1
+from app.api import health, internal, metrics, v1
 
-__all__ = ["health", "v1"]
+__all__ = ["health", "internal", "metrics", "v1"]
@@ -1,12 +1,13 @@
-"""Health check endpoint."""
+"""Health check endpoints."""
 
-from typing import Annotated
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_db
+from app.services.readiness import readiness_monitor
 
 router = APIRouter()
 
@@ -18,7 +19,8 @@ async def health_check(
     """
     Health check endpoint.
 
-    Verifies API and database connectivity.
+    Verifies API and database connectivity with a query on a pooled
+    connection. Orchestrator probes should use /livez and /readyz instead.
     """
     try:
         # Check database connection
@@ -31,3 +33,30 @@ async def health_check(
         "status": "healthy" if db_status == "healthy" else "degraded",
         "database": db_status,
     }
+
+
+@router.get("/livez")
+async def liveness_check() -> dict[str, str]:
+    """
+    Liveness probe.
+
+    Answers as long as the event loop is serving requests; never touches
+    the database or the disk.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/readyz")
+async def readiness_check(response: Response) -> dict[str, Any]:
+    """
+    Readiness probe.
+
+    Serves the database and upload-disk status refreshed by a background
+    task every READINESS_CHECK_INTERVAL seconds, plus the current request
+    pool saturation. Returns 503 while the database is unreachable, its last
+    successful check is stale, or the upload disk is low on space.
+    """
+    result = readiness_monitor.status()
+    if result["status"] != "ready":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
@@ -0,0 +1,104 @@
+"""Internal operational endpoints (not part of the public API)."""
+
+import hmac
+from typing import Annotated, Any, Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.admission import upload_admission
+from app.core.config import settings
+from app.core.profiling import profile_store
+from app.db import engine, get_db
+from app.db.pool import pool_status
+from app.services.outbox_service import OutboxService
+
+
+def require_internal_api() -> None:
+    """Answer 404 unless INTERNAL_API_ENABLED (read per request, so it can change at runtime)."""
+    if not settings.INTERNAL_API_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+router = APIRouter(
+    prefix="/internal", include_in_schema=False, dependencies=[Depends(require_internal_api)]
+)
+
+
+@router.get("/pool")
+async def get_pool_status() -> dict[str, Any]:
+    """
+    Database connection pool statistics of this worker process.
+
+    Reports the pool's size, connections checked in and out, current
+    overflow, and a histogram of how long checkouts waited (including
+    timeouts).
+    """
+    return pool_status(engine.sync_engine.pool)
+
+
+@router.get("/outbox")
+async def get_outbox_status(db: Annotated[AsyncSession, Depends(get_db)]) -> dict[str, Any]:
+    """
+    Outbox backlog: job counts by status and kind, the age of the oldest
+    due job, and the most recently dead-lettered jobs with their errors.
+    """
+    return await OutboxService.stats(db)
+
+
+@router.get("/uploads")
+async def get_upload_admission_status() -> dict[str, Any]:
+    """Upload requests and body bytes in flight in this worker process (see admission)."""
+    return upload_admission.stats()
+
+
+def require_profiling_token(
+    authorization: Annotated[str | None, Header(include_in_schema=False)] = None,
+) -> None:
+    """
+    Only let callers with `Authorization: Bearer <PROFILING_TOKEN>` read profiles (403).
+
+    Profiles hold request paths and call stacks, so they are not readable
+    without PROFILING_TOKEN, even where /internal is reachable.
+    """
+    token = settings.PROFILING_TOKEN
+    expected = f"Bearer {token}".encode()
+    if not token or not hmac.compare_digest((authorization or "").encode(), expected):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Reading profiles requires the PROFILING_TOKEN bearer token",
+        )
+
+
+@router.get("/profiles", dependencies=[Depends(require_profiling_token)])
+async def list_profiles() -> list[dict[str, Any]]:
+    """Request profiles kept by this worker process, newest first."""
+    return [profile.summary() for profile in profile_store.list()]
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profiling_token)])
+async def get_profile(
+    profile_id: str,
+    format: Annotated[
+        Literal["collapsed", "speedscope"], Query(description="Download format")
+    ] = "speedscope",
+) -> Response:
+    """
+    Download a request profile.
+
+    collapsed: one "frame;frame;... samples" line per stack, for flamegraph.pl.
+    speedscope: JSON for https://www.speedscope.app.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile '{profile_id}' not found",
+        )
+    if format == "collapsed":
+        filename, response = f"{profile_id}.txt", PlainTextResponse(profile.collapsed())
+    else:
+        filename, response = f"{profile_id}.speedscope.json", JSONResponse(profile.speedscope())
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
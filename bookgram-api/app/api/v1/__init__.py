@@ -2,8 +2,10 @@
 
 from fastapi import APIRouter
 
-from app.api.v1 import files
+from app.api.v1 import files, topics, uploads
 
 router = APIRouter()
 
 router.include_router(files.router)
+router.include_router(uploads.router)
+router.include_router(topics.router)
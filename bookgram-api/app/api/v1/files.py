@@ -1,36 +1,105 @@
-"""SaveFile API endpoint."""
+"""SaveFile API endpoints."""
 
-from typing import Annotated
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.admission import USER_ID_HEADER, admitted_user_id
+from app.core.config import settings
+from app.core.metrics import SAVE_SECONDS, SAVE_STAGE_SECONDS, count_upload
 from app.db import get_db
-from app.services.file_service import FileService
+from app.db.models.file_page import CHAPTER, PAGE
+from app.db.schemas.file import (
+    BatchSaveItem,
+    BatchSaveResponse,
+    ExtractionStatusResponse,
+    FilePageItem,
+    FilePagesResponse,
+    SearchHit,
+    SearchResponse,
+)
+from app.services import outbox_worker, page_index
+from app.services.blob_service import BlobService
+from app.services.exceptions import (
+    ExtractionInProgressError,
+    InvalidFormError,
+    UploadRejectedError,
+)
+from app.services.extraction_service import ExtractionService
+from app.services.file_service import FileService, StoredFile
+from app.services.multipart import FormPart, MultipartStream
+from app.services.search_service import SearchService
+from app.services.storage import storage_io
 from app.services.user_service import UserService
 
 router = APIRouter(prefix="/files", tags=["files"])
 
+# Most pages/chapters returned by one range request
+MAX_PAGE_RANGE = 100
+# Most search results returned by one request
+MAX_SEARCH_LIMIT = 50
+# Largest form field other than a file (title, user_id) read into memory
+MAX_FORM_FIELD_SIZE = 64 * 1024
 
-@router.post("/save", response_model=str, status_code=status.HTTP_201_CREATED)
-async def save_file(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    file: UploadFile = File(..., description="Text file to upload (supports compressed/chunks)"),
-    title: str = Form(..., description="Title for the file (will be normalized as topic)"),
-    user_id: int = Form(..., description="User ID for subscription"),
-) -> str:
+
+@dataclass
+class _SaveTracker:
+    """What is known about an upload for its metrics (format once validated)."""
+
+    format: str = "unknown"
+    size: int = 0
+
+
+@contextmanager
+def _track_save() -> Iterator[_SaveTracker]:
     """
-    Save a file and subscribe user to the topic.
+    Time a single-file save and count it by outcome.
 
-    **Business Logic:**
-    1. **File Service:**
-       - Validates the file (non-empty, text format)
-       - Saves file to disk
-       - Creates file record in database with metadata
-    2. **User Service:**
-       - Subscribes the user to the topic
+    Client errors (4xx) count as rejected, anything else raised as failed.
+    """
+    tracker = _SaveTracker()
+    started = time.perf_counter()
+    outcome = "failed"
+    try:
+        yield tracker
+        outcome = "saved"
+    except HTTPException as e:
+        if e.status_code < status.HTTP_500_INTERNAL_SERVER_ERROR:
+            outcome = "rejected"
+        raise
+    finally:
+        SAVE_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+        count_upload(tracker.format, outcome, tracker.size)
 
-    **Returns:** Topic string (normalized title)
+
+def _validate_title(title: str) -> str:
+    """
+    Validate an upload's title.
+
+    Returns:
+        Normalized topic
+
+    Raises:
+        HTTPException: 400 if the title is empty
     """
     # Validation: Check for empty title
     if not title or not title.strip():
@@ -39,89 +108,685 @@ async def save_file(
             detail="Title cannot be empty",
         )
 
+    # Normalize title to topic
+    return FileService.normalize_topic(title)
+
+
+def _validate_file_name(filename: str | None) -> str:
+    """
+    Validate an upload's file name.
+
+    Returns:
+        Content format
+
+    Raises:
+        HTTPException: 400 if the file name or format is invalid
+    """
     # Validation: Check for empty or corrupted file
-    if not file.filename:
+    if not filename:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File name is required",
         )
 
-    # Read file content
-    try:
-        file_content = await file.read()
-    except Exception as e:
+    # Get content extension (a compression suffix such as .gz is skipped)
+    file_format = FileService.get_content_extension(filename)
+
+    # Validate file has an extension
+    if not file_format:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Failed to read file: {str(e)}",
-        ) from e
+            detail="File must have a valid extension",
+        )
 
-    # Validation: Check if file is empty
-    if not file_content or len(file_content) == 0:
+    # Validate file format (text formats only)
+    if file_format not in FileService.ALLOWED_FORMATS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File is empty or corrupted",
+            detail=f"Unsupported file format. Allowed formats: {', '.join(FileService.ALLOWED_FORMATS)}",
         )
 
-    # Normalize title to topic
-    topic = FileService.normalize_topic(title)
+    return file_format
 
-    # Get file extension
-    file_format = FileService.get_file_extension(file.filename)
 
-    # Validate file has an extension
-    if not file_format:
+def _form_field(fields: dict[str, list[str]], name: str) -> str:
+    """First value of a required form field (422 if it is missing)."""
+    values = fields.get(name)
+    if not values:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must have a valid extension",
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Missing form field '{name}'",
         )
+    return values[0]
 
-    # Validate file format (text formats only)
-    allowed_formats = ["txt", "md", "log", "pdf", "epub"]
-    if file_format not in allowed_formats:
+
+def _user_id_field(fields: dict[str, list[str]], request: Request) -> int:
+    """
+    The required integer user_id form field (422 if missing or invalid).
+
+    It must be the user the upload was admitted under (X-User-Id), so that
+    the per-user admission limits apply to the user actually saving (400).
+    """
+    try:
+        user_id = int(_form_field(fields, "user_id"))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Form field 'user_id' must be an integer",
+        ) from e
+    admitted = admitted_user_id(request)
+    if admitted is not None and admitted != str(user_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported file format. Allowed formats: {', '.join(allowed_formats)}",
+            detail=f"Form field 'user_id' does not match the {USER_ID_HEADER} header",
         )
+    return user_id
+
+
+def _form_body(**properties: dict[str, Any]) -> dict[str, Any]:
+    """OpenAPI request body of an endpoint that parses its multipart form itself."""
+    schema = {"type": "object", "required": list(properties), "properties": properties}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": schema}},
+        }
+    }
+
 
+async def _store_part(part: FormPart, file_format: str) -> StoredFile:
+    """Stream a file part's (decompressed) content into the blob store as it arrives."""
+    return await FileService.save_stream_to_disk(
+        chunks=FileService.iter_stream_content(part.chunks()),
+        page_index_builder=FileService.page_index_builder(file_format),
+        validator=FileService.content_validator(file_format),
+    )
+
+
+@router.post(
+    "/save",
+    response_model=str,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=_form_body(
+        title={"type": "string", "description": "Title for the file (normalized as topic)"},
+        user_id={"type": "integer", "description": "User ID for subscription"},
+        file={
+            "type": "string",
+            "format": "binary",
+            "description": "Text file to upload (gzip, bz2, xz and zstd are decompressed)",
+        },
+    ),
+)
+async def save_file(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    background_tasks: BackgroundTasks,
+    request: Request,
+) -> str:
+    """
+    Save a file and subscribe user to the topic.
+
+    **Business Logic:**
+    1. **File Service:**
+       - Validates the file (non-empty, allowed format, size limit)
+       - Parses the multipart body as it is received, without spooling it:
+         the content of `file` is checked against its format (UTF-8 text,
+         PDF header and trailer, EPUB zip structure), hashed and written
+         chunk by chunk, so invalid content is rejected with 400 before the
+         rest of the body is read
+       - Decompresses gzip/bz2/xz/zstd uploads (detected by magic bytes);
+         these are spooled until received, then checked while decompressing
+       - Streams file into the content-addressed blob store in bounded chunks
+       - References the shared blob (duplicate content is stored once)
+       - Creates file record in database with metadata
+    2. **User Service:**
+       - Subscribes the user to the topic
+    3. **Extraction:**
+       - An extraction job is written to the outbox in the same transaction;
+         chapters and pages are extracted after the response by the outbox
+         worker (see `GET /files/{id}/extraction`)
+
+    Send `title` and `user_id` before `file` (as HTML forms and most
+    clients do) to have them checked before any content is stored. With an
+    `X-User-Id` header (see upload admission), `user_id` must match it.
+
+    **Returns:** Topic string (normalized title)
+    """
+    with _track_save() as tracker:
+        fields: dict[str, list[str]] = {}
+        stored_file: StoredFile | None = None
+        file_format = "unknown"
+        try:
+            stream = MultipartStream(request.stream(), request.headers.get("content-type"))
+            async for part in stream.parts():
+                if part.filename is None:
+                    fields.setdefault(part.name, []).append(await part.text(MAX_FORM_FIELD_SIZE))
+                elif part.name == "file" and stored_file is None:
+                    if "title" in fields:
+                        _validate_title(fields["title"][0])
+                    if "user_id" in fields:
+                        _user_id_field(fields, request)
+                    file_format = _validate_file_name(part.filename)
+                    tracker.format = file_format
+                    stored_file = await _store_part(part, file_format)
+        except HTTPException:
+            raise
+        except UploadRejectedError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save file: {str(e)}",
+            ) from e
+
+        if stored_file is None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail="Missing form field 'file'",
+            )
+        topic = _validate_title(_form_field(fields, "title"))
+        user_id = _user_id_field(fields, request)
+
+        try:
+            # Reference the shared blob (identical content is stored once)
+            await BlobService.acquire(
+                db=db,
+                checksum=stored_file.checksum,
+                location_url=stored_file.location_url,
+                size=stored_file.size,
+            )
+
+            # Create file record in database
+            file_record = await FileService.create_file_record(
+                db=db,
+                location_url=stored_file.location_url,
+                topic=topic,
+                size=stored_file.size,
+                file_format=file_format,
+                checksum=stored_file.checksum,
+            )
+
+            # Subscribe user to topic
+            await UserService.subscribe_user_to_topic(
+                db=db,
+                user_id=user_id,
+                topic=topic,
+            )
+
+            # Record the chapter/page extraction job with the file (outbox)
+            job_ids = await ExtractionService.enqueue(db, [file_record.id])
+
+            # Commit transaction
+            with SAVE_STAGE_SECONDS.time(stage="commit"):
+                await db.commit()
+
+            # Run the jobs here once the response is sent (unless left to the worker)
+            outbox_worker.dispatch(background_tasks, job_ids)
+
+            tracker.size = stored_file.size
+
+            # Return topic string
+            return file_record.topic
+
+        except ValueError as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e),
+            ) from e
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save file: {str(e)}",
+            ) from e
+
+
+@router.post(
+    "/save-batch",
+    response_model=BatchSaveResponse,
+    openapi_extra=_form_body(
+        titles={
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "One title per file, in the same order",
+        },
+        user_id={"type": "integer", "description": "User ID for subscription"},
+        files={
+            "type": "array",
+            "items": {"type": "string", "format": "binary"},
+            "description": "Files to upload",
+        },
+    ),
+)
+async def save_files_batch(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    background_tasks: BackgroundTasks,
+    request: Request,
+) -> BatchSaveResponse:
+    """
+    Save many files and subscribe the user to all their topics.
+
+    **Business Logic:**
+    1. The multipart body is parsed as it is received: each file is
+       validated and streamed into the blob store as its part arrives, and
+       invalid content is rejected without reading the rest of that part
+       into storage.
+    2. In one transaction: blob references are upserted with one statement,
+       all `File` rows are created with one multi-row `INSERT ... RETURNING`,
+       and all subscriptions and extraction jobs are inserted with one
+       statement each.
+
+    **Returns:** Per-file outcome. Files rejected by validation or while
+    writing are reported as failed; the others are saved together.
+    """
+    fields: dict[str, list[str]] = {}
+    results: list[BatchSaveItem] = []
+    received: list[tuple[int, str, StoredFile]] = []
     try:
-        # Save file to disk
-        location_url = await FileService.save_file_to_disk(
-            file_content=file_content,
-            topic=topic,
-            file_extension=file_format,
+        stream = MultipartStream(request.stream(), request.headers.get("content-type"))
+        async for part in stream.parts():
+            if part.filename is None:
+                fields.setdefault(part.name, []).append(await part.text(MAX_FORM_FIELD_SIZE))
+                continue
+            if part.name != "files":
+                continue
+
+            index = len(results)
+            results.append(BatchSaveItem(filename=part.filename, status="failed"))
+            # Invalid items never touch the disk (titles are checked here if sent first)
+            try:
+                titles = fields.get("titles", [])
+                if index < len(titles):
+                    _validate_title(titles[index])
+                file_format = _validate_file_name(part.filename)
+            except HTTPException as e:
+                results[index].error = e.detail
+                count_upload("unknown", "rejected")
+                continue
+
+            try:
+                received.append((index, file_format, await _store_part(part, file_format)))
+            except InvalidFormError:
+                raise
+            except UploadRejectedError as e:
+                results[index].error = str(e)
+                count_upload(file_format, "rejected")
+            except Exception as e:
+                results[index].error = f"Failed to save file: {str(e)}"
+                count_upload(file_format, "failed")
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+
+    if not results:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Missing form field 'files'",
         )
+    titles = fields.get("titles", [])
+    if len(titles) != len(results):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Expected one title per file, got {len(titles)} titles for {len(results)} files",
+        )
+    user_id = _user_id_field(fields, request)
+
+    stored: list[tuple[int, str, str, StoredFile]] = []
+    for index, file_format, stored_file in received:
+        try:
+            topic = _validate_title(titles[index])
+        except HTTPException as e:
+            results[index].error = e.detail
+            count_upload(file_format, "rejected")
+            continue
+        stored.append((index, topic, file_format, stored_file))
+
+    if stored:
+        try:
+            await BlobService.acquire_many(
+                db=db,
+                blobs=[(s.checksum, s.location_url, s.size) for _, _, _, s in stored],
+            )
+            file_records = await FileService.create_file_records(
+                db=db,
+                records=[
+                    {
+                        "location_url": s.location_url,
+                        "checksum": s.checksum,
+                        "topic": topic,
+                        "size": s.size,
+                        "format": file_format,
+                    }
+                    for _, topic, file_format, s in stored
+                ],
+            )
+            await UserService.subscribe_user_to_topics(
+                db=db,
+                user_id=user_id,
+                topics=[file_record.topic for file_record in file_records],
+            )
+            job_ids = await ExtractionService.enqueue(
+                db, [file_record.id for file_record in file_records]
+            )
+            with SAVE_STAGE_SECONDS.time(stage="commit"):
+                await db.commit()
+
+        except ValueError as e:
+            await db.rollback()
+            for _, _, file_format, _ in stored:
+                count_upload(file_format, "rejected")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e),
+            ) from e
+        except Exception as e:
+            await db.rollback()
+            for _, _, file_format, _ in stored:
+                count_upload(file_format, "failed")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save files: {str(e)}",
+            ) from e
 
-        # Create file record in database
-        file_record = await FileService.create_file_record(
-            db=db,
-            location_url=location_url,
-            topic=topic,
-            size=len(file_content),
-            file_format=file_format,
+        outbox_worker.dispatch(background_tasks, job_ids)
+
+        for (index, _, file_format, stored_file), file_record in zip(stored, file_records):
+            count_upload(file_format, "saved", stored_file.size)
+            results[index] = BatchSaveItem(
+                filename=results[index].filename,
+                status="saved",
+                topic=file_record.topic,
+                file_id=file_record.id,
+            )
+
+    saved = sum(1 for result in results if result.status == "saved")
+    return BatchSaveResponse(saved=saved, failed=len(results) - saved, results=results)
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_files(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    q: Annotated[str, Query(min_length=1, max_length=500, description="Search query")],
+    offset: Annotated[int, Query(ge=0, description="Results to skip")] = 0,
+    limit: Annotated[int, Query(ge=1, le=MAX_SEARCH_LIMIT, description="Results to return")] = 20,
+) -> SearchResponse:
+    """
+    Search the content of uploaded books.
+
+    Supports web search syntax: `"exact phrase"`, `or`, and `-excluded`.
+    Results are pages, best match first, each with highlighted fragments
+    (`<mark>`). Only the best `SEARCH_MAX_CANDIDATES` matches can be paged
+    through.
+    """
+    if offset + limit > settings.SEARCH_MAX_CANDIDATES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Only the first {settings.SEARCH_MAX_CANDIDATES} results can be fetched",
         )
 
-        # Subscribe user to topic
-        await UserService.subscribe_user_to_topic(
-            db=db,
-            user_id=user_id,
-            topic=topic,
+    # One extra row tells whether there is a next page
+    rows = await SearchService.search_pages(db, q, offset=offset, limit=limit + 1)
+    next_offset = offset + limit if len(rows) > limit else None
+    return SearchResponse(
+        query=q,
+        items=[SearchHit.model_validate(row) for row in rows[:limit]],
+        next_offset=next_offset,
+    )
+
+
+@router.get("/{file_id}/extraction", response_model=ExtractionStatusResponse)
+async def get_extraction_status(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    file_id: int,
+) -> ExtractionStatusResponse:
+    """Get the status of a file's chapter/page extraction."""
+    file_record = await FileService.get_file(db, file_id)
+    if file_record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"File with id {file_id} not found",
         )
+    return ExtractionStatusResponse.model_validate(file_record)
 
-        # Commit transaction
-        await db.commit()
 
-        # Return topic string
-        return file_record.topic
+@router.post(
+    "/{file_id}/extraction",
+    response_model=ExtractionStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def retry_extraction(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    background_tasks: BackgroundTasks,
+    file_id: int,
+) -> ExtractionStatusResponse:
+    """
+    Run a file's chapter/page extraction again, with a fresh attempt budget.
 
+    Rejected with 409 while the extraction is running.
+    """
+    try:
+        file_record = await ExtractionService.requeue(db, file_id)
+        job_ids = await ExtractionService.enqueue(db, [file_record.id])
+        await db.commit()
     except ValueError as e:
         await db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except ExtractionInProgressError as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+
+    outbox_worker.dispatch(background_tasks, job_ids)
+    return ExtractionStatusResponse.model_validate(file_record)
+
+
+@router.get("/{file_id}/pages", response_model=FilePagesResponse)
+async def get_file_pages(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    file_id: int,
+    start: Annotated[int, Query(alias="from", ge=0, description="First page (0-based)")] = 0,
+    stop: Annotated[int | None, Query(alias="to", ge=0, description="End page (exclusive)")] = None,
+) -> FilePagesResponse:
+    """
+    Get a range of a file's pages, `from` inclusive to `to` exclusive.
+
+    At most 100 pages per request; `to` defaults to `from + 10`.
+    """
+    return await _get_page_range(db, file_id, PAGE, start, stop)
+
+
+@router.get("/{file_id}/chapters", response_model=FilePagesResponse)
+async def get_file_chapters(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    file_id: int,
+    start: Annotated[int, Query(alias="from", ge=0, description="First chapter (0-based)")] = 0,
+    stop: Annotated[
+        int | None, Query(alias="to", ge=0, description="End chapter (exclusive)")
+    ] = None,
+) -> FilePagesResponse:
+    """
+    Get a range of a file's chapters, `from` inclusive to `to` exclusive.
+
+    At most 100 chapters per request; `to` defaults to `from + 10`.
+    """
+    return await _get_page_range(db, file_id, CHAPTER, start, stop)
+
+
+@router.get("/{file_id}/pages/{index}", response_class=Response)
+async def get_file_page(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    file_id: int,
+    index: int,
+) -> Response:
+    """
+    Get one page (0-based) of a file as text.
+
+    For text formats the page is sliced out of the stored file through its
+    byte-offset page index, without reading the rest of the book. Other
+    formats are served from the extracted pages. `X-Total-Count` gives the
+    number of pages.
+    """
+    return await _get_page(db, file_id, PAGE, index)
+
+
+@router.get("/{file_id}/chapters/{index}", response_class=Response)
+async def get_file_chapter(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    file_id: int,
+    index: int,
+) -> Response:
+    """Get one chapter (0-based) of a file as text (see `GET /files/{id}/pages/{index}`)."""
+    return await _get_page(db, file_id, CHAPTER, index)
+
+
+async def _get_page(db: AsyncSession, file_id: int, kind: str, index: int) -> Response:
+    file_record = await FileService.get_file(db, file_id)
+    if file_record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"File with id {file_id} not found",
+        )
+    headers = {"Cache-Control": f"public, max-age={settings.CONTENT_CACHE_MAX_AGE}"}
+
+    # Text formats: slice the stored bytes through the on-disk index
+    blob_path = Path(file_record.location_url)
+    try:
+        span = await storage_io.run(
+            page_index.lookup,
+            page_index.index_path(blob_path),
+            kind,
+            index,
+            settings.EXTRACTION_PAGE_SIZE,
+        )
+        if span is not None:
+            content = await storage_io.run(page_index.read_span, blob_path, span.start, span.end)
+            headers["X-Total-Count"] = str(span.total)
+            return Response(
+                content=content,
+                media_type=FileService.CONTENT_TYPES.get(
+                    file_record.format, "text/plain; charset=utf-8"
+                ),
+                headers=headers,
+            )
+    except (IndexError, FileNotFoundError) as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e),
+            detail=f"No {kind} {index} in file {file_id}",
         ) from e
-    except Exception as e:
-        await db.rollback()
+
+    # Other formats (or no index yet): the extracted text
+    pages = await FileService.get_pages(db, file_id, kind, index, index + 1)
+    if not pages:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No {kind} {index} in file {file_id}",
+        )
+    total = file_record.page_count if kind == PAGE else file_record.chapter_count
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    return Response(
+        content=pages[0].text or "",
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
+    )
+
+
+async def _get_page_range(
+    db: AsyncSession, file_id: int, kind: str, start: int, stop: int | None
+) -> FilePagesResponse:
+    if stop is None:
+        stop = start + 10
+    if stop < start or stop - start > MAX_PAGE_RANGE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"'to' must be between 'from' and 'from' + {MAX_PAGE_RANGE}",
+        )
+
+    file_record = await FileService.get_file(db, file_id)
+    if file_record is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to save file: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"File with id {file_id} not found",
+        )
+
+    pages = await FileService.get_pages(db, file_id, kind, start, stop)
+    return FilePagesResponse(
+        file_id=file_id,
+        total=file_record.page_count if kind == PAGE else file_record.chapter_count,
+        items=[FilePageItem.model_validate(page) for page in pages],
+    )
+
+
+@router.api_route("/{file_id}/content", methods=["GET", "HEAD"], response_class=FileResponse)
+async def get_file_content(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    file_id: int,
+    request: Request,
+) -> Response:
+    """
+    Download a file's content.
+
+    Streamed from disk without loading it into memory. Supports `Range`
+    (206 partial content) and `If-Range`, and conditional requests:
+    `If-None-Match` against the `ETag` (the content's SHA-256) and
+    `If-Modified-Since` against `Last-Modified` return 304. Both depend
+    on the content only: a file's content never changes once it is saved,
+    so `Last-Modified` is its creation time, not `updated_at` (which moves
+    with extraction).
+    """
+    file_record = await FileService.get_file(db, file_id)
+    if file_record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"File with id {file_id} not found",
+        )
+
+    headers = {
+        "Last-Modified": formatdate(
+            file_record.created_at.replace(tzinfo=UTC).timestamp(), usegmt=True
+        ),
+        "Cache-Control": f"public, max-age={settings.CONTENT_CACHE_MAX_AGE}",
+    }
+    if file_record.checksum:
+        headers["ETag"] = f'"{file_record.checksum}"'
+
+    if _not_modified(request, headers.get("ETag"), file_record.created_at):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        stat_result = await storage_io.run(os.stat, file_record.location_url)
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Content of file {file_id} not found",
         ) from e
+
+    return FileResponse(
+        Path(file_record.location_url),
+        headers=headers,
+        media_type=FileService.CONTENT_TYPES.get(file_record.format, "application/octet-stream"),
+        filename=f"{file_record.topic}.{file_record.format}",
+        stat_result=stat_result,
+        content_disposition_type="inline",
+    )
+
+
+def _not_modified(request: Request, etag: str | None, last_modified: datetime) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since (RFC 9110 section 13.2.2)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        # Weak comparison: W/"x" matches "x"
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is not None:
+            since = since.astimezone(UTC).replace(tzinfo=None)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
@@ -0,0 +1,70 @@
+"""Topic API endpoints."""
+
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import AsyncSessionLocal, get_db
+from app.db.schemas.topic import TopicSubscribersResponse
+from app.services.user_service import UserService
+
+router = APIRouter(prefix="/topics", tags=["topics"])
+
+
+@router.get("/{topic}/subscribers", response_model=TopicSubscribersResponse)
+async def list_topic_subscribers(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    topic: str,
+    after: Annotated[int | None, Query(description="Return user IDs greater than this")] = None,
+    limit: Annotated[int, Query(ge=1, le=10000)] = 1000,
+) -> TopicSubscribersResponse:
+    """
+    Get one page of a topic's subscribers, ordered by user ID.
+
+    Pass the returned `next_after` as `after` to fetch the next page.
+    """
+    user_ids = await UserService.get_topic_subscribers(
+        db=db,
+        topic=topic,
+        after_user_id=after,
+        limit=limit,
+    )
+    next_after = user_ids[-1] if len(user_ids) == limit else None
+    return TopicSubscribersResponse(topic=topic, user_ids=user_ids, next_after=next_after)
+
+
+@router.get("/{topic}/subscribers/stream")
+async def stream_topic_subscribers(topic: str) -> StreamingResponse:
+    """
+    Stream all of a topic's subscriber IDs, one per line, in ascending order.
+
+    Intended for notification fan-out: memory stays bounded by one batch
+    however many users follow the topic.
+    """
+    return StreamingResponse(
+        _iter_subscriber_lines(topic, settings.SUBSCRIBER_STREAM_BATCH_SIZE),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _iter_subscriber_lines(topic: str, batch_size: int) -> AsyncIterator[str]:
+    # Use a short-lived session per batch, so a slow client does not hold a
+    # pooled connection (or an open snapshot) for the whole stream
+    after_user_id = None
+    while True:
+        async with AsyncSessionLocal() as db:
+            user_ids = await UserService.get_topic_subscribers(
+                db=db,
+                topic=topic,
+                after_user_id=after_user_id,
+                limit=batch_size,
+            )
+        if user_ids:
+            yield "".join(f"{user_id}\n" for user_id in user_ids)
+        if len(user_ids) < batch_size:
+            return
+        after_user_id = user_ids[-1]
@@ -0,0 +1,173 @@
+"""Resumable upload API endpoints."""
+
+from typing import Annotated
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.admission import USER_ID_HEADER, admitted_user_id
+from app.core.metrics import SAVE_STAGE_SECONDS, count_upload
+from app.db import get_db
+from app.db.schemas.upload import UploadSessionCreate, UploadSessionResponse
+from app.services import outbox_worker
+from app.services.exceptions import UploadRejectedError
+from app.services.extraction_service import ExtractionService
+from app.services.file_service import FileService
+from app.services.upload_service import UploadService
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+
+@router.post("", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    payload: UploadSessionCreate,
+    response: Response,
+) -> UploadSessionResponse:
+    """
+    Start a resumable upload.
+
+    Returns the session, whose `id` is used for the chunk, offset and
+    finalize requests.
+    """
+    # Validation: Check for empty title
+    if not payload.title.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Title cannot be empty",
+        )
+
+    file_format = FileService.get_file_extension(payload.filename)
+    if file_format not in FileService.ALLOWED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file format. Allowed formats: {', '.join(FileService.ALLOWED_FORMATS)}",
+        )
+
+    try:
+        upload_session = await UploadService.create_session(
+            db=db,
+            user_id=payload.user_id,
+            topic=FileService.normalize_topic(payload.title),
+            filename=payload.filename,
+            file_format=file_format,
+            total_size=payload.total_size,
+        )
+        await db.commit()
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except UploadRejectedError as e:
+        await db.rollback()
+        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+
+    response.headers["Upload-Offset"] = "0"
+    return UploadSessionResponse.model_validate(upload_session)
+
+
+@router.get("/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    session_id: str,
+    response: Response,
+) -> UploadSessionResponse:
+    """Get an upload session, including the offset to resume from."""
+    try:
+        upload_session = await UploadService.get_session(db, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+
+    response.headers["Upload-Offset"] = str(upload_session.bytes_received)
+    return UploadSessionResponse.model_validate(upload_session)
+
+
+@router.put("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    session_id: str,
+    request: Request,
+    offset: Annotated[int, Query(ge=0, description="Byte offset of this chunk")],
+) -> Response:
+    """
+    Upload a chunk of raw bytes at the given offset.
+
+    The offset must not be past the current offset (see `Upload-Offset`).
+    The new offset is returned in the `Upload-Offset` header. With an
+    `X-User-Id` header, it must be the session's user.
+    """
+    try:
+        upload_session = await UploadService.get_session(db, session_id, lock="share")
+        admitted = admitted_user_id(request)
+        if admitted is not None and admitted != str(upload_session.user_id):
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Upload session does not belong to the {USER_ID_HEADER} user",
+            )
+        new_offset = await UploadService.write_chunk(
+            db=db,
+            upload_session=upload_session,
+            offset=offset,
+            chunks=request.stream(),
+        )
+        await db.commit()
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except UploadRejectedError as e:
+        await db.rollback()
+        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT, headers={"Upload-Offset": str(new_offset)}
+    )
+
+
+@router.post("/{session_id}/finalize", response_model=str, status_code=status.HTTP_201_CREATED)
+async def finalize_upload(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    background_tasks: BackgroundTasks,
+    session_id: str,
+) -> str:
+    """
+    Complete an upload: save the file and subscribe the user to the topic.
+
+    **Returns:** Topic string (normalized title)
+    """
+    file_format = "unknown"
+    try:
+        upload_session = await UploadService.get_session(db, session_id, lock="update")
+        file_format = upload_session.format
+        file_record = await UploadService.finalize(db, upload_session)
+        job_ids = await ExtractionService.enqueue(db, [file_record.id])
+        with SAVE_STAGE_SECONDS.time(stage="commit"):
+            await db.commit()
+        await UploadService.discard_partial(upload_session)
+        count_upload(file_format, "saved", file_record.size)
+        outbox_worker.dispatch(background_tasks, job_ids)
+        return file_record.topic
+
+    except ValueError as e:
+        await db.rollback()
+        count_upload(file_format, "rejected")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except UploadRejectedError as e:
+        await db.rollback()
+        count_upload(file_format, "rejected")
+        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+    except Exception as e:
+        await db.rollback()
+        count_upload(file_format, "failed")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save file: {str(e)}",
+        ) from e
@@ -0,0 +1,250 @@
+"""Admission control of upload requests: size, global and per-user in-flight limits."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import UPLOAD_ADMISSION_REJECTED_TOTAL
+
+USER_ID_HEADER = "X-User-Id"
+
+# Request state key of the X-User-Id an upload was admitted under
+ADMITTED_USER_ID = "admitted_user_id"
+
+
+@dataclass
+class InFlight:
+    """Upload requests being received and the body bytes they declared."""
+
+    uploads: int = 0
+    bytes: int = 0
+
+    def admits(self, size: int, max_uploads: int, max_bytes: int) -> str | None:
+        """Why one more request of size bytes is over the limits, or None if it fits."""
+        if self.uploads >= max_uploads:
+            return "concurrency"
+        # A request larger than the whole byte budget still gets in when it is alone
+        if self.uploads and self.bytes + size > max_bytes:
+            return "bytes"
+        return None
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when an upload request is over an in-flight limit."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Too many uploads in progress ({reason.replace('_', ' ')} limit)")
+        self.reason = reason
+
+
+class RequestBodyTooLargeError(Exception):
+    """Raised when an admitted request's body grows past MAX_UPLOAD_REQUEST_SIZE."""
+
+
+class UploadAdmission:
+    """
+    In-flight upload requests of this process, in total and per user.
+
+    Limits are read from settings on every admission, so they can be
+    changed at runtime. All calls happen on the event loop thread.
+    """
+
+    def __init__(self) -> None:
+        self.total = InFlight()
+        self.users: dict[str, InFlight] = {}
+
+    def acquire(self, user: str, size: int) -> None:
+        """
+        Count a request of size body bytes as in flight.
+
+        Raises:
+            AdmissionRejectedError: if the request is over a global or per-user limit
+        """
+        in_flight = self.users.get(user) or InFlight()
+        reason = self.total.admits(
+            size, settings.UPLOAD_MAX_CONCURRENT, settings.UPLOAD_MAX_INFLIGHT_BYTES
+        )
+        if reason is None:
+            reason = in_flight.admits(
+                size,
+                settings.UPLOAD_MAX_CONCURRENT_PER_USER,
+                settings.UPLOAD_MAX_INFLIGHT_BYTES_PER_USER,
+            )
+            if reason is not None:
+                reason = f"user_{reason}"
+        if reason is not None:
+            raise AdmissionRejectedError(reason)
+
+        self.users[user] = in_flight
+        for counts in (self.total, in_flight):
+            counts.uploads += 1
+            counts.bytes += size
+
+    def release(self, user: str, size: int) -> None:
+        """Count an admitted request as finished."""
+        in_flight = self.users[user]
+        for counts in (self.total, in_flight):
+            counts.uploads -= 1
+            counts.bytes -= size
+        if not in_flight.uploads:
+            del self.users[user]
+
+    def stats(self) -> dict[str, Any]:
+        """In-flight uploads and bytes, in total and for the busiest users."""
+        busiest = sorted(self.users.items(), key=lambda item: item[1].uploads, reverse=True)
+        return {
+            "uploads": self.total.uploads,
+            "bytes": self.total.bytes,
+            "users": len(self.users),
+            "busiest_users": [
+                {"user": user, "uploads": counts.uploads, "bytes": counts.bytes}
+                for user, counts in busiest[:10]
+            ],
+        }
+
+    def clear(self) -> None:
+        """Forget all in-flight requests."""
+        self.total = InFlight()
+        self.users.clear()
+
+
+def client_address(scope: Scope) -> str:
+    """
+    The request's client address.
+
+    With UPLOAD_CLIENT_ADDRESS_HEADER set (e.g. X-Forwarded-For), it is the
+    last address of that header, the one added by the trusted proxy in
+    front of the API; otherwise the address of the connection.
+    """
+    if settings.UPLOAD_CLIENT_ADDRESS_HEADER:
+        value = dict(scope["headers"]).get(settings.UPLOAD_CLIENT_ADDRESS_HEADER.lower().encode())
+        if value and value.strip():
+            return value.decode("latin-1").split(",")[-1].strip()
+    return scope["client"][0] if scope.get("client") else "unknown"
+
+
+def admitted_user_id(request: Request) -> str | None:
+    """The X-User-Id an upload request was admitted under, if any."""
+    return getattr(request.state, ADMITTED_USER_ID, None)
+
+
+class UploadAdmissionMiddleware:
+    """
+    Admit upload requests before their body is read.
+
+    The declared Content-Length is checked against MAX_UPLOAD_REQUEST_SIZE
+    (413), then the request is counted against the global and per-user
+    in-flight limits (429 with Retry-After). A request without
+    Content-Length counts as MAX_UPLOAD_REQUEST_SIZE bytes, and any body
+    (chunked or not) is cut off with 413 once it has grown past that size.
+    The user is the X-User-Id header, because the user_id form field is
+    only known once the body has been received; the endpoints refuse a
+    user_id other than the admitted one. Without the header, the user is
+    the client address (see client_address). Other requests pass straight
+    through.
+    """
+
+    def __init__(self, app: ASGIApp, admission: UploadAdmission) -> None:
+        self.app = app
+        self.admission = admission
+        prefix = re.escape(settings.API_V1_PREFIX)
+        self._routes = {
+            "POST": re.compile(rf"{prefix}/files/save(?:-batch)?"),
+            "PUT": re.compile(rf"{prefix}/uploads/[^/]+"),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = self._routes.get(scope.get("method", "")) if scope["type"] == "http" else None
+        if route is None or not route.fullmatch(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        try:
+            size = int(headers[b"content-length"])
+        except (KeyError, ValueError):
+            size = settings.MAX_UPLOAD_REQUEST_SIZE
+        if size > settings.MAX_UPLOAD_REQUEST_SIZE:
+            await self._too_large(scope, receive, send)
+            return
+
+        user_id = headers.get(USER_ID_HEADER.lower().encode())
+        if user_id:
+            user = f"user:{user_id.decode('latin-1')}"
+            scope.setdefault("state", {})[ADMITTED_USER_ID] = user_id.decode("latin-1")
+        else:
+            user = f"client:{client_address(scope)}"
+
+        try:
+            self.admission.acquire(user, size)
+        except AdmissionRejectedError as e:
+            UPLOAD_ADMISSION_REJECTED_TOTAL.inc(reason=e.reason)
+            response = JSONResponse(
+                {"detail": str(e)},
+                status_code=429,
+                headers={"Retry-After": str(settings.UPLOAD_RETRY_AFTER), "Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self._call_limited(scope, receive, send)
+        finally:
+            self.admission.release(user, size)
+
+    async def _call_limited(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the app, refusing the body once it grows past MAX_UPLOAD_REQUEST_SIZE."""
+        received = 0
+        too_large = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, too_large
+            if too_large:
+                raise RequestBodyTooLargeError()
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > settings.MAX_UPLOAD_REQUEST_SIZE:
+                    too_large = True
+                    raise RequestBodyTooLargeError()
+            return message
+
+        async def checked_send(message: Message) -> None:
+            nonlocal response_started
+            # Whatever the app answers to a body it could not finish reading, the client gets 413
+            if too_large and not response_started:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, checked_send)
+        except Exception:
+            if not too_large or response_started:
+                raise
+        if too_large and not response_started:
+            await self._too_large(scope, receive, send)
+
+    async def _too_large(self, scope: Scope, receive: Receive, send: Send) -> None:
+        UPLOAD_ADMISSION_REJECTED_TOTAL.inc(reason="too_large")
+        response = JSONResponse(
+            {
+                "detail": f"Request body exceeds the maximum size of "
+                f"{settings.MAX_UPLOAD_REQUEST_SIZE} bytes"
+            },
+            status_code=413,
+            headers={"Connection": "close"},
+        )
+        await response(scope, receive, send)
+
+
+# Global upload admission state of this process
+upload_admission = UploadAdmission()
@@ -0,0 +1,345 @@
+"""In-process metrics registry with Prometheus text exposition."""
+
+from __future__ import annotations
+
+import abc
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+# Default histogram buckets (seconds), from a fast insert to a slow large upload
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class Metric(abc.ABC):
+    """A named metric family with fixed label names."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abc.abstractmethod
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-serializable state, mergeable with snapshots of other processes."""
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Add a non-negative amount."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Current value for a label set."""
+        return self._values.get(self._key(labels), 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            samples = [[list(key), value] for key, value in self._values.items()]
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets per label set."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last is +Inf), sum]
+        self._values: dict[tuple[str, ...], list[Any]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the block in seconds (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        """Number of observations for a label set."""
+        state = self._values.get(self._key(labels))
+        return 0 if state is None else sum(state[0])
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            samples = [
+                [list(key), {"counts": list(counts), "sum": total}]
+                for key, (counts, total) in self._values.items()
+            ]
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "buckets": list(self.buckets),
+            "samples": samples,
+        }
+
+
+class Stopwatch:
+    """Accumulate the time spent in interleaved sections of one operation."""
+
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+
+    def __enter__(self) -> Stopwatch:
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.elapsed += time.perf_counter() - self._started
+
+    async def iterate(self, source: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """Yield from an async iterator, timing only the waits for its items."""
+        iterator = source.__aiter__()
+        while True:
+            with self:
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+            yield item
+
+
+class MetricsRegistry:
+    """
+    Metrics of this process, exposed in the Prometheus text format.
+
+    With several worker processes, each one writes its snapshot to a shared
+    directory (write_snapshot) and any worker renders the sum of all of them
+    (render_all), so a scrape sees the whole server whichever worker answers.
+    Snapshots of exited workers are kept, so counters never go backwards;
+    use a fresh directory per deployment.
+    """
+
+    def __init__(self, prefix: str = "") -> None:
+        self.prefix = prefix
+        self._metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        """Register a counter (name gets the registry prefix)."""
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Register a histogram (name gets the registry prefix)."""
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> dict[str, Any]:
+        """State of every metric of this process."""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render(self) -> str:
+        """This process's metrics in the Prometheus text format."""
+        return render_snapshots([self.snapshot()])
+
+    def write_snapshot(self, directory: Path) -> None:
+        """Atomically write this process's snapshot to directory/<pid>.json (blocking)."""
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_name, directory / f"{os.getpid()}.json")
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def render_all(self, directory: Path) -> str:
+        """
+        Metrics of every process that wrote a snapshot to directory (blocking).
+
+        This process is rendered from memory, so its values are current;
+        other processes are as recent as their last snapshot.
+        """
+        own = f"{os.getpid()}.json"
+        snapshots = [self.snapshot()]
+        for path in sorted(directory.glob("*.json")):
+            if path.name == own:
+                continue
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                # Being replaced or unreadable; it is picked up by the next scrape
+                continue
+        return render_snapshots(snapshots)
+
+
+def merge_snapshots(snapshots: list[dict[str, Any]]) -> dict[str, Any]:
+    """Sum the samples of several processes' snapshots."""
+    merged: dict[str, Any] = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = {**family, "samples": {}}
+            for labels, value in family["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if family["type"] == "counter":
+                    target["samples"][key] = (current or 0) + value
+                elif current is None:
+                    target["samples"][key] = {"counts": list(value["counts"]), "sum": value["sum"]}
+                else:
+                    current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                    current["sum"] += value["sum"]
+    return merged
+
+
+def render_snapshots(snapshots: list[dict[str, Any]]) -> str:
+    """Render the sum of snapshots in the Prometheus text exposition format (0.0.4)."""
+    lines: list[str] = []
+    for name, family in sorted(merge_snapshots(snapshots).items()):
+        lines.append(f"# HELP {name} {_escape_help(family['help'])}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        labelnames = family["labelnames"]
+        for key, value in sorted(family["samples"].items()):
+            labels = list(zip(labelnames, key))
+            if family["type"] == "counter":
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip([*family["buckets"], float("inf")], value["counts"]):
+                cumulative += count
+                le = [("le", "+Inf" if bound == float("inf") else _number(bound))]
+                lines.append(f"{name}_bucket{_labels(labels + le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+# Global registry
+registry = MetricsRegistry(prefix="bookgram_")
+
+# Save pipeline
+SAVE_STAGE_SECONDS = registry.histogram(
+    "save_stage_seconds",
+    "Time spent in each stage of saving an upload "
+    "(read, write, validate, place, page_index, blob_acquire, topic, insert, subscribe, commit)",
+    ("stage",),
+)
+SAVE_SECONDS = registry.histogram(
+    "save_seconds", "End-to-end time of POST /files/save by outcome", ("outcome",)
+)
+UPLOADS_TOTAL = registry.counter(
+    "uploads_total", "Uploaded files by content format and outcome", ("format", "outcome")
+)
+INGESTED_BYTES_TOTAL = registry.counter(
+    "ingested_bytes_total", "Content bytes of saved uploads (after decompression)", ("format",)
+)
+UPLOAD_ADMISSION_REJECTED_TOTAL = registry.counter(
+    "upload_admission_rejected_total",
+    "Upload requests refused before their body was read, by reason",
+    ("reason",),
+)
+
+# Outbox jobs
+OUTBOX_JOBS_TOTAL = registry.counter(
+    "outbox_jobs_total", "Outbox job attempts by kind and outcome", ("kind", "outcome")
+)
+OUTBOX_JOB_SECONDS = registry.histogram(
+    "outbox_job_seconds", "Time spent running an outbox job attempt", ("kind",)
+)
+
+
+def count_upload(file_format: str, outcome: str, size: int = 0) -> None:
+    """Count an upload by content format and outcome (saved, rejected or failed)."""
+    UPLOADS_TOTAL.inc(format=file_format, outcome=outcome)
+    if outcome == "saved":
+        INGESTED_BYTES_TOTAL.inc(size, format=file_format)
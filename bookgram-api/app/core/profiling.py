@@ -0,0 +1,265 @@
+"""On-demand statistical profiling of single requests."""
+
+from __future__ import annotations
+
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from types import FrameType
+from typing import Any
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Root frame of samples taken while the request was not running (awaiting I/O or
+# waiting for other tasks on the event loop)
+AWAITING = ("(awaiting)", "", 0)
+
+Frame = tuple[str, str, int]
+
+
+@dataclass
+class Profile:
+    """Sampled call stacks of one request."""
+
+    id: str
+    method: str
+    path: str
+    started_at: datetime
+    interval: float
+    duration: float = 0.0
+    status_code: int | None = None
+    trigger: str = ""
+    stacks: Counter[tuple[Frame, ...]] = field(default_factory=Counter)
+
+    @property
+    def samples(self) -> int:
+        """Number of samples taken."""
+        return sum(self.stacks.values())
+
+    def summary(self) -> dict[str, Any]:
+        """Metadata without the stacks."""
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 2),
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+        }
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed stack format (flamegraph.pl, speedscope, ...)."""
+        lines = [
+            ";".join(_frame_label(frame) for frame in stack) + f" {count}"
+            for stack, count in sorted(self.stacks.items())
+        ]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict[str, Any]:
+        """Speedscope file format (sampled profile, weights in seconds)."""
+        frames: dict[Frame, int] = {}
+        samples = []
+        weights = []
+        for stack, count in self.stacks.items():
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+            weights.append(count * self.interval)
+        name = f"{self.method} {self.path}"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "bookgram",
+            "name": name,
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": function, "file": file, "line": line} if file else {"name": function}
+                    for function, file, line in frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+class ProfileStore:
+    """Ring buffer of the most recent profiles of this process."""
+
+    def __init__(self, max_profiles: int) -> None:
+        self.max_profiles = max_profiles
+        self._profiles: OrderedDict[str, Profile] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile) -> None:
+        """Store a profile, dropping the oldest beyond max_profiles."""
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Profile | None:
+        """A stored profile by ID."""
+        return self._profiles.get(profile_id)
+
+    def list(self) -> list[Profile]:
+        """Stored profiles, newest first."""
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+    def clear(self) -> None:
+        """Drop all profiles."""
+        with self._lock:
+            self._profiles.clear()
+
+
+class StackSampler:
+    """
+    Sample the call stack of one request from a background thread.
+
+    Every interval the stack of the event loop thread is captured. Only the
+    frames above the request's anchor frame (the middleware call) belong to
+    the request; when the anchor is not on the stack the request was not
+    running and the sample is counted as awaiting.
+    """
+
+    def __init__(self, profile: Profile, anchor: FrameType) -> None:
+        self.profile = profile
+        self.anchor = anchor
+        self.thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.profile.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        """Record the current stack of the event loop thread."""
+        frame = sys._current_frames().get(self.thread_id)
+        stack: list[Frame] = []
+        while frame is not None and frame is not self.anchor:
+            code = frame.f_code
+            # co_qualname is Python 3.11+
+            name = getattr(code, "co_qualname", code.co_name)
+            stack.append((name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        key = tuple(reversed(stack)) if frame is self.anchor else (AWAITING,)
+        self.profile.stacks[key] += 1
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests on demand.
+
+    A request is profiled when it carries the X-Profile header with the
+    configured PROFILING_TOKEN, or at random with PROFILING_SAMPLE_RATE.
+    The profile is kept in the profile store and its ID returned in the
+    X-Profile-Id response header. Other requests only pay for the trigger
+    check; at most PROFILING_MAX_CONCURRENT requests are sampled at once.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore) -> None:
+        self.app = app
+        self.store = store
+        self._active = 0
+
+    def _trigger(self, scope: Scope) -> str | None:
+        token = settings.PROFILING_TOKEN
+        if token:
+            header = PROFILE_HEADER.lower().encode()
+            for name, value in scope["headers"]:
+                if name == header and hmac.compare_digest(value, token.encode()):
+                    return "header"
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate > 0 and random.random() < rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        if trigger is None or self._active >= settings.PROFILING_MAX_CONCURRENT:
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(
+            id=uuid.uuid4().hex,
+            method=scope["method"],
+            path=scope["path"],
+            started_at=datetime.now(UTC),
+            interval=settings.PROFILING_INTERVAL,
+            trigger=trigger,
+        )
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile.id
+            await send(message)
+
+        sampler = StackSampler(profile, sys._getframe())
+        self._active += 1
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            self._active -= 1
+            profile.duration = time.perf_counter() - started
+            self.store.add(profile)
+
+
+def _frame_label(frame: Frame) -> str:
+    function, file, line = frame
+    if not file:
+        return function
+    # Collapsed stacks are ';'-separated, one stack per line
+    label = f"{function} ({_short_path(file)}:{line})"
+    return label.replace(";", ":").replace("\n", " ")
+
+
+def _short_path(path: str) -> str:
+    """Path relative to the working directory or site-packages, when inside them."""
+    for root in (os.getcwd(), *(p for p in sys.path if p.endswith("site-packages"))):
+        if path.startswith(root + os.sep):
+            return path[len(root) + 1 :]
+    return path
+
+
+# Global profile store of this process
+profile_store = ProfileStore(settings.PROFILING_MAX_PROFILES)
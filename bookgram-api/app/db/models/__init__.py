@@ -1,6 +1,21 @@
 """Database models."""
 
+from app.db.models.blob import Blob
 from app.db.models.file import File
+from app.db.models.file_page import FilePage
+from app.db.models.outbox import OutboxJob
+from app.db.models.subscription import UserTopicSubscription
+from app.db.models.topic import Topic
+from app.db.models.upload_session import UploadSession
 from app.db.models.user import User
 
-__all__ = ["File", "User"]
+__all__ = [
+    "Blob",
+    "File",
+    "FilePage",
+    "OutboxJob",
+    "Topic",
+    "UploadSession",
+    "User",
+    "UserTopicSubscription",
+]
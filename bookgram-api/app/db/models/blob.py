@@ -0,0 +1,26 @@
+"""Blob database model."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base, utcnow
+
+
+class Blob(Base):
+    """Content-addressed stored file, shared by every File with the same content."""
+
+    __tablename__ = "blobs"
+
+    checksum: Mapped[str] = mapped_column(String(64), primary_key=True)
+    location_url: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    refcount: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"<Blob(checksum='{self.checksum}', refcount={self.refcount})>"
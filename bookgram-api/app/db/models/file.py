@@ -2,30 +2,49 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime
+from datetime import datetime
 
-from sqlalchemy import DateTime, Integer, String, Text
-from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, select
+from sqlalchemy.orm import Mapped, column_property, mapped_column
 
-from app.db.session import Base
+from app.db.models.topic import Topic
+from app.db.session import Base, utcnow
 
 
 class File(Base):
     """File entity model for storing uploaded files metadata."""
 
     __tablename__ = "files"
+    # A topic's files newest first (FileService.get_file_by_topic)
+    __table_args__ = (Index("ix_files_topic_id_id", "topic_id", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    location_url: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
-    topic: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    location_url: Mapped[str] = mapped_column(String(512), nullable=False, index=True)
+    checksum: Mapped[str | None] = mapped_column(
+        String(64), ForeignKey("blobs.checksum"), nullable=True, index=True
+    )
+    topic_id: Mapped[int] = mapped_column(ForeignKey("topics.id"), nullable=False)
     size: Mapped[int] = mapped_column(Integer, nullable=False)
     format: Mapped[str] = mapped_column(String(50), nullable=False)
-    chapters: Mapped[list[str] | None] = mapped_column(ARRAY(Text), nullable=True, default=None)
-    pages: Mapped[list[str] | None] = mapped_column(ARRAY(Text), nullable=True, default=None)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+    # Chapter and page content lives in file_pages; only the counts are kept here
+    chapter_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    page_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Chapter/page extraction job: pending, processing, completed or failed
+    extraction_status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default="pending", server_default="pending"
+    )
+    extraction_attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    extraction_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC), nullable=False
+        DateTime, default=utcnow, onupdate=utcnow, nullable=False
+    )
+
+    # Topic name, read through a primary key lookup in topics; not set by INSERT ... RETURNING
+    topic: Mapped[str] = column_property(
+        select(Topic.name).where(Topic.id == topic_id).correlate_except(Topic).scalar_subquery()
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,69 @@
+"""File page database model."""
+
+from __future__ import annotations
+
+from sqlalchemy import DDL, BigInteger, ForeignKey, Index, Integer, String, Text, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+PAGE = "page"
+CHAPTER = "chapter"
+
+# Text search configuration of the search vector (and of queries against it)
+SEARCH_CONFIG = "english"
+
+
+class FilePage(Base):
+    """A page or chapter of an extracted file, addressable by index."""
+
+    __tablename__ = "file_pages"
+
+    file_id: Mapped[int] = mapped_column(
+        ForeignKey("files.id", ondelete="CASCADE"), primary_key=True
+    )
+    # PAGE or CHAPTER
+    kind: Mapped[str] = mapped_column(String(10), primary_key=True)
+    page_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Byte range in the stored file (text formats only)
+    byte_offset: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    byte_length: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Full-text search vector, set by the file_pages_search_vector trigger on
+    # insert and on text changes (pages only: chapters hold the same text).
+    # Deferred, so it is never loaded by default.
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, nullable=True, deferred=True)
+
+    __table_args__ = (
+        # Not partial: chapters have no vector, and queries need no kind predicate
+        # (a bound kind parameter would keep generic plans off a partial index)
+        Index("ix_file_pages_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"<FilePage(file_id={self.file_id}, kind='{self.kind}', page_index={self.page_index})>"
+        )
+
+
+# A trigger rather than a generated column: a stored generated column cannot be
+# added to an existing table without rewriting it (see migration 008)
+SEARCH_VECTOR_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION file_pages_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := CASE WHEN NEW.kind = '{PAGE}'
+        THEN to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(NEW.text, '')) END;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+SEARCH_VECTOR_TRIGGER = """
+CREATE TRIGGER file_pages_search_vector
+BEFORE INSERT OR UPDATE OF kind, text ON file_pages
+FOR EACH ROW EXECUTE FUNCTION file_pages_search_vector()
+"""
+
+event.listen(FilePage.__table__, "after_create", DDL(SEARCH_VECTOR_FUNCTION))
+event.listen(FilePage.__table__, "after_create", DDL(SEARCH_VECTOR_TRIGGER))
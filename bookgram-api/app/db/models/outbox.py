@@ -0,0 +1,53 @@
+"""Outbox job database model."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base, utcnow
+
+JOB_PENDING = "pending"
+JOB_PROCESSING = "processing"
+# Failed for good (permanent error or attempts exhausted); kept for inspection
+JOB_DEAD = "dead"
+
+
+class OutboxJob(Base):
+    """
+    Follow-up work, written in the same transaction as the change that needs it.
+
+    Completed jobs are deleted, so the table only holds outstanding and dead
+    jobs.
+    """
+
+    __tablename__ = "outbox_jobs"
+    # Claim order: pending jobs by due time (also finds expired leases by status)
+    __table_args__ = (Index("ix_outbox_jobs_status_available_at", "status", "available_at"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    # Handler to run, e.g. "extract_file"
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    # JOB_PENDING, JOB_PROCESSING or JOB_DEAD
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default=JOB_PENDING, server_default=JOB_PENDING
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Not claimed before this time (retry backoff)
+    available_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, nullable=False)
+    # A processing job is claimed again once its lease expires (its worker died)
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, onupdate=utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"<OutboxJob(id={self.id}, kind='{self.kind}', status='{self.status}')>"
@@ -0,0 +1,28 @@
+"""User topic subscription database model."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base, utcnow
+
+
+class UserTopicSubscription(Base):
+    """A user following a topic (one row per user and topic)."""
+
+    __tablename__ = "user_topic_subscriptions"
+    # Reverse lookup (topic -> users), ordered by user_id for keyset pagination
+    __table_args__ = (Index("ix_user_topic_subscriptions_topic_id_user_id", "topic_id", "user_id"),)
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    topic_id: Mapped[int] = mapped_column(ForeignKey("topics.id"), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"<UserTopicSubscription(user_id={self.user_id}, topic_id={self.topic_id})>"
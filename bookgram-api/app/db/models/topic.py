@@ -0,0 +1,24 @@
+"""Topic database model."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base, utcnow
+
+
+class Topic(Base):
+    """A normalized topic; files and subscriptions reference it by ID."""
+
+    __tablename__ = "topics"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"<Topic(id={self.id}, name='{self.name}')>"
@@ -0,0 +1,106 @@
+"""Connection pool with checkout wait-time telemetry."""
+
+from __future__ import annotations
+
+import bisect
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, PoolProxiedConnection, QueuePool
+
+# Upper bounds (seconds) of the checkout wait-time histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PoolWaitStats:
+    """Histogram of how long checkouts waited for a usable connection."""
+
+    def __init__(self, buckets: tuple[float, ...] = WAIT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+
+    def observe(self, seconds: float) -> None:
+        """Record one checkout."""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Cumulative bucket counts (le = upper bound, like Prometheus) and totals."""
+        cumulative = 0
+        buckets = []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            cumulative += count
+            buckets.append({"le": "+Inf" if bound == float("inf") else bound, "count": cumulative})
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.total, 6),
+            "max_seconds": round(self.max, 6),
+            "timeouts": self.timeouts,
+            "buckets": buckets,
+        }
+
+
+class TimedPoolMixin:
+    """
+    Time every checkout of a pool.
+
+    The wait covers queueing for a free connection, opening a new one in
+    overflow and the pre-ping, i.e. everything a request spends before it
+    can send its first statement. Checkouts that give up after pool_timeout
+    are counted as timeouts.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def connect(self) -> PoolProxiedConnection:
+        """Check out a connection, recording how long it took."""
+        stats = self.wait_stats
+        started = time.perf_counter()
+        try:
+            connection = super().connect()  # type: ignore[misc]
+        except exc.TimeoutError:
+            stats.timeouts += 1
+            stats.observe(time.perf_counter() - started)
+            raise
+        stats.observe(time.perf_counter() - started)
+        return connection
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    """The asyncio engine's default queue pool, with checkout timing."""
+
+
+def pool_status(pool: Pool) -> dict[str, Any]:
+    """
+    Current occupancy of a pool and its checkout wait histogram.
+
+    Args:
+        pool: The engine's pool (``engine.sync_engine.pool``)
+
+    Returns:
+        JSON-serializable pool statistics
+    """
+    status: dict[str, Any] = {"class": type(pool).__name__}
+    # Only queue pools have a fixed size and overflow
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            timeout_seconds=pool.timeout(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            # Connections beyond size; negative while fewer than size are open
+            overflow=pool.overflow(),
+        )
+    stats = getattr(pool, "wait_stats", None)
+    status["checkout_wait"] = (stats or PoolWaitStats()).as_dict()
+    return status
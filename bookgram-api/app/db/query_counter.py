@@ -0,0 +1,88 @@
+"""Per-request database round-trip counting."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+QUERY_COUNT_HEADER = "X-DB-Queries"
+
+
+@dataclass
+class QueryCounter:
+    """Statements executed while the counter is active."""
+
+    count: int = 0
+    statements: list[str] = field(default_factory=list)
+
+
+_current_counter: ContextVar[QueryCounter | None] = ContextVar("query_counter", default=None)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Count the statements executed in the current context.
+
+    Tasks started inside the block share the counter, so statements run by
+    concurrent work within a request are included.
+
+    Yields:
+        QueryCounter updated as statements execute
+    """
+    counter = QueryCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count every statement the engine sends to the database."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.count += 1
+        counter.statements.append(statement)
+
+
+class QueryCountMiddleware:
+    """
+    Count the database round trips of each HTTP request.
+
+    The count is reported in the X-DB-Queries response header, covering the
+    statements executed before the response started.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as counter:
+
+            async def send_with_count(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers[QUERY_COUNT_HEADER] = str(counter.count)
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
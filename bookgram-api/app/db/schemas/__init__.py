@@ -1,5 +1,24 @@
 """Pydantic schemas."""
 
-from app.db.schemas.file import FileResponse
+from app.db.schemas.file import (
+    BatchSaveItem,
+    BatchSaveResponse,
+    ExtractionStatusResponse,
+    FilePageItem,
+    FilePagesResponse,
+    FileResponse,
+)
+from app.db.schemas.topic import TopicSubscribersResponse
+from app.db.schemas.upload import UploadSessionCreate, UploadSessionResponse
 
-__all__ = ["FileResponse"]
+__all__ = [
+    "BatchSaveItem",
+    "BatchSaveResponse",
+    "ExtractionStatusResponse",
+    "FilePageItem",
+    "FilePagesResponse",
+    "FileResponse",
+    "TopicSubscribersResponse",
+    "UploadSessionCreate",
+    "UploadSessionResponse",
+]
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class FileResponse(BaseModel):
@@ -14,10 +15,84 @@ class FileResponse(BaseModel):
 
     id: int
     location_url: str
+    checksum: str | None = None
     topic: str
     size: int
     format: str
-    chapters: list[str] | None = None
-    pages: list[str] | None = None
+    chapter_count: int | None = None
+    page_count: int | None = None
     created_at: datetime
     updated_at: datetime
+
+
+class BatchSaveItem(BaseModel):
+    """Outcome of one file in a batch upload."""
+
+    filename: str | None
+    status: Literal["saved", "failed"]
+    topic: str | None = None
+    file_id: int | None = None
+    error: str | None = None
+
+
+class BatchSaveResponse(BaseModel):
+    """Schema for batch upload response."""
+
+    saved: int
+    failed: int
+    results: list[BatchSaveItem]
+
+
+class ExtractionStatusResponse(BaseModel):
+    """Status of a file's chapter/page extraction job."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    file_id: int = Field(validation_alias="id")
+    status: str = Field(validation_alias="extraction_status")
+    attempts: int = Field(validation_alias="extraction_attempts")
+    error: str | None = Field(default=None, validation_alias="extraction_error")
+
+
+class FilePageItem(BaseModel):
+    """One page or chapter of a file."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    index: int = Field(validation_alias="page_index")
+    byte_offset: int | None = None
+    byte_length: int | None = None
+    text: str | None = None
+
+
+class FilePagesResponse(BaseModel):
+    """A range of a file's pages or chapters."""
+
+    file_id: int
+    total: int | None = Field(
+        default=None, description="Number of pages/chapters; null until extraction completes"
+    )
+    items: list[FilePageItem]
+
+
+class SearchHit(BaseModel):
+    """A page matching a search query."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    file_id: int
+    topic: str
+    page_index: int
+    rank: float
+    snippet: str = Field(description="Matching fragments, terms wrapped in <mark></mark>")
+
+
+class SearchResponse(BaseModel):
+    """One page of search results, best match first."""
+
+    query: str
+    items: list[SearchHit]
+    next_offset: int | None = Field(
+        default=None,
+        description="Pass as `offset` to fetch the next results; null on the last page",
+    )
@@ -0,0 +1,16 @@
+"""Topic Pydantic schemas."""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class TopicSubscribersResponse(BaseModel):
+    """One page of a topic's subscribers, ordered by user ID."""
+
+    topic: str
+    user_ids: list[int]
+    next_after: int | None = Field(
+        default=None,
+        description="Pass as `after` to fetch the next page; null on the last page",
+    )
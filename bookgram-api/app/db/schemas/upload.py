@@ -0,0 +1,34 @@
+"""Upload session Pydantic schemas."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class UploadSessionCreate(BaseModel):
+    """Schema for creating a resumable upload session."""
+
+    title: str = Field(..., description="Title for the file (will be normalized as topic)")
+    user_id: int = Field(..., description="User ID for subscription")
+    filename: str = Field(..., description="Original file name, used for the format")
+    total_size: int | None = Field(
+        default=None, gt=0, description="Declared size in bytes, if known"
+    )
+
+
+class UploadSessionResponse(BaseModel):
+    """Schema for upload session response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    topic: str
+    format: str
+    total_size: int | None = None
+    bytes_received: int
+    status: str
+    file_id: int | None = None
+    created_at: datetime
+    updated_at: datetime
@@ -1,18 +1,28 @@
 """Database session management with SQLAlchemy 2.0 async engine."""
 
 from collections.abc import AsyncGenerator
+from datetime import UTC, datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
+from app.db.pool import TimedAsyncQueuePool
+from app.db.query_counter import instrument_engine
 
 # Create async engine
 engine = create_async_engine(
     settings.database_url_str,
     echo=settings.DEBUG,
     future=True,
+    poolclass=TimedAsyncQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
 )
+instrument_engine(engine.sync_engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -27,6 +37,11 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime (columns are TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting async database session."""
     async with AsyncSessionLocal() as session:
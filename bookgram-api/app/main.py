@@ -6,9 +6,20 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import health, v1
+from app.api import health, internal, metrics, v1
+from app.core.admission import UploadAdmissionMiddleware, upload_admission
 from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware, profile_store
 from app.db import Base, engine
+from app.db.query_counter import QueryCountMiddleware
+from app.services.extraction import extraction_pool
+from app.services.metrics_export import metrics_exporter
+from app.services.outbox_worker import JOB_HANDLERS, OutboxWorker
+from app.services.readiness import readiness_monitor
+from app.services.storage import storage_io
+
+# Seconds the API waits at shutdown for outbox jobs it is running
+OUTBOX_SHUTDOWN_TIMEOUT = 10.0
 
 
 @asynccontextmanager
@@ -26,14 +37,47 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         print(f"⚠️  Database not available: {e}")
         print("🚀 App will start without database connection")
 
+    # Startup: Refresh the /readyz status in the background
+    readiness_monitor.start()
+
+    # Startup: Share this worker's metrics with the other workers
+    metrics_exporter.start()
+
+    # Startup: Poll the outbox for retries and jobs left behind, unless a worker runs them
+    outbox_poller = None
+    if settings.OUTBOX_INLINE:
+        outbox_poller = OutboxWorker(
+            handlers=JOB_HANDLERS,
+            concurrency=settings.OUTBOX_CONCURRENCY,
+            batch_size=settings.OUTBOX_BATCH_SIZE,
+            poll_interval=settings.OUTBOX_POLL_INTERVAL,
+        )
+        outbox_poller.start()
+
     yield
 
+    # Shutdown: Stop claiming outbox jobs; unfinished ones are claimed again later
+    if outbox_poller is not None:
+        await outbox_poller.shutdown(timeout=OUTBOX_SHUTDOWN_TIMEOUT)
+
+    # Shutdown: Stop readiness checks
+    await readiness_monitor.stop()
+
+    # Shutdown: Write the final metrics snapshot (before the storage pool stops)
+    await metrics_exporter.stop()
+
     # Shutdown: Close database connections
     try:
         await engine.dispose()
     except Exception:
         pass
 
+    # Shutdown: Wait for in-flight disk writes
+    storage_io.shutdown()
+
+    # Shutdown: Stop extraction worker processes
+    extraction_pool.shutdown()
+
 
 def create_application() -> FastAPI:
     """Application factory."""
@@ -44,6 +88,10 @@ def create_application() -> FastAPI:
         lifespan=lifespan,
     )
 
+    # Refuse upload requests over the size and in-flight limits before reading them
+    # (added first, so CORS headers are set on its responses)
+    app.add_middleware(UploadAdmissionMiddleware, admission=upload_admission)
+
     # CORS middleware
     if settings.ALLOWED_HOSTS:
         app.add_middleware(
@@ -54,8 +102,18 @@ def create_application() -> FastAPI:
             allow_headers=["*"],
         )
 
+    # Report DB round trips per request (X-DB-Queries header)
+    if settings.DEBUG:
+        app.add_middleware(QueryCountMiddleware)
+
+    # Profile requests on demand (X-Profile header or PROFILING_SAMPLE_RATE)
+    app.add_middleware(ProfilingMiddleware, store=profile_store)
+
     # Include routers
     app.include_router(health.router, tags=["health"])
+    app.include_router(internal.router)
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics.router)
     app.include_router(v1.router, prefix=settings.API_V1_PREFIX)
 
     return app
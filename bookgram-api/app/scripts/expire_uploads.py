@@ -0,0 +1,136 @@
+"""
+Expire abandoned resumable upload sessions and remove their partial files.
+
+Sessions that have not received a chunk for ``UPLOAD_SESSION_TTL`` seconds
+are marked ``expired`` in batches; once a batch has committed, their
+partial files (``uploads/.partial/<id>``) are unlinked. Sessions with a
+chunk write or a finalize in progress are skipped.
+
+Partial files older than the TTL without an active session (left by a
+session whose row was never committed, or whose file could not be removed
+after finalize) are removed as well.
+
+Usage (from the bookgram-api directory):
+    python -m app.scripts.expire_uploads --batch-size 500
+    python -m app.scripts.expire_uploads --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db import AsyncSessionLocal, engine
+from app.db.models.upload_session import UploadSession
+from app.services.file_service import FileService
+from app.services.storage import storage_io
+from app.services.upload_service import UploadService
+
+
+@dataclass
+class ExpiryStats:
+    """Counters reported at the end of a run."""
+
+    expired: int = 0
+    stray_files: int = 0
+
+
+def scan_partials(directory: Path, cutoff: float) -> dict[str, list[Path]]:
+    """Partial files last modified before cutoff, by session ID."""
+    stale: dict[str, list[Path]] = {}
+    if not directory.is_dir():
+        return stale
+    for entry in os.scandir(directory):
+        try:
+            if not entry.is_file() or entry.stat().st_mtime > cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        session_id = entry.name.removesuffix(".blob")
+        stale.setdefault(session_id, []).append(Path(entry.path))
+    return stale
+
+
+async def expire_sessions(batch_size: int, stats: ExpiryStats, dry_run: bool = False) -> None:
+    """Expire stale sessions batch by batch, removing partial files after each commit."""
+    while True:
+        async with AsyncSessionLocal() as db:
+            expired = await UploadService.expire_sessions(db, batch_size)
+            if dry_run:
+                await db.rollback()
+            else:
+                await db.commit()
+
+        stats.expired += len(expired)
+        if dry_run:
+            return
+        for session_id in expired:
+            await UploadService.remove_partial(session_id)
+        if len(expired) < batch_size:
+            return
+
+
+async def remove_stray_partials(batch_size: int, stats: ExpiryStats, dry_run: bool = False) -> None:
+    """Remove partial files older than the TTL that belong to no active session."""
+    cutoff = time.time() - settings.UPLOAD_SESSION_TTL
+    directory = FileService.UPLOAD_DIR / UploadService.PARTIAL_DIR_NAME
+    stale = await storage_io.run(scan_partials, directory, cutoff)
+    session_ids = sorted(stale)
+
+    for start in range(0, len(session_ids), batch_size):
+        batch = session_ids[start : start + batch_size]
+        async with AsyncSessionLocal() as db:
+            active = set(
+                await db.scalars(
+                    select(UploadSession.id).where(
+                        UploadSession.id.in_(batch), UploadSession.status == "active"
+                    )
+                )
+            )
+        for session_id in batch:
+            if session_id in active:
+                continue
+            for path in stale[session_id]:
+                if not dry_run:
+                    await storage_io.unlink(path)
+                stats.stray_files += 1
+
+
+async def expire(batch_size: int, dry_run: bool = False) -> ExpiryStats:
+    """Expire stale sessions, then remove stray partial files."""
+    stats = ExpiryStats()
+    await expire_sessions(batch_size, stats, dry_run=dry_run)
+    await remove_stray_partials(batch_size, stats, dry_run=dry_run)
+    return stats
+
+
+async def _main(batch_size: int, dry_run: bool) -> None:
+    try:
+        stats = await expire(batch_size=batch_size, dry_run=dry_run)
+        print(f"done: {stats}")
+    finally:
+        await engine.dispose()
+        storage_io.shutdown()
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="sessions per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be expired")
+    args = parser.parse_args()
+
+    asyncio.run(_main(batch_size=args.batch_size, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Migrate stored files into the hash-sharded upload layout.
+
+Moves legacy files (``uploads/{topic}.{ext}``) and flat blobs
+(``uploads/<sha256>``) to ``uploads/ab/cd/<sha256>`` and rewrites
+``files.location_url`` in batches while the API keeps serving traffic:
+
+1. Each file is hard-linked to its sharded path, so old and new paths stay
+   valid while the batch is in flight.
+2. The batch's ``files`` and ``blobs`` rows are updated and committed.
+3. Only then are the old paths unlinked.
+
+Legacy rows without a checksum are hashed and registered in ``blobs``.
+The script is idempotent and can be stopped and re-run at any time.
+
+Usage (from the bookgram-api directory):
+    python -m app.scripts.shard_uploads --batch-size 500
+    python -m app.scripts.shard_uploads --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import shutil
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Row, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import AsyncSessionLocal, engine
+from app.db.models.blob import Blob
+from app.db.models.file import File
+from app.services.file_service import FileService
+from app.services.storage import storage_io
+
+
+@dataclass
+class MigrationStats:
+    """Counters reported at the end of a migration run."""
+
+    scanned: int = 0
+    migrated: int = 0
+    already_sharded: int = 0
+    missing: int = 0
+
+
+async def relocate(src: Path, checksum: str | None) -> tuple[str, Path]:
+    """
+    Link a stored file into its sharded blob path.
+
+    Args:
+        src: Current location of the file
+        checksum: Known SHA-256 of the content, or None for legacy files
+
+    Returns:
+        Checksum and sharded blob path
+    """
+    if checksum is None:
+        checksum = await FileService.hash_file(src)
+
+    dst = FileService.blob_path(checksum)
+    if not await storage_io.run(dst.exists):
+        await storage_io.mkdir(dst.parent)
+        await storage_io.run(_link_or_copy, src, dst)
+    return checksum, dst
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        return
+    except OSError:
+        # Different filesystem or no hard link support: copy, then rename into place
+        tmp = dst.with_name(f".{dst.name}.part")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+
+
+async def migrate_batch(
+    db: AsyncSession,
+    rows: Sequence[Row[int, str, str | None, int]],
+    stats: MigrationStats,
+    dry_run: bool = False,
+) -> list[Path]:
+    """
+    Migrate one batch of file rows.
+
+    Returns:
+        Old paths that can be removed once the batch has committed
+    """
+    file_updates: list[dict[str, Any]] = []
+    new_blobs: dict[str, dict[str, Any]] = {}
+    moved_blobs: dict[str, str] = {}
+    stale_paths: list[Path] = []
+
+    for file_id, location_url, checksum, size in rows:
+        stats.scanned += 1
+        src = Path(location_url)
+        dst = FileService.blob_path(checksum) if checksum is not None else None
+
+        if src == dst:
+            stats.already_sharded += 1
+            continue
+
+        if dst is not None and await storage_io.run(dst.exists):
+            # Content already linked into place by an earlier row
+            new_checksum = checksum
+        elif await storage_io.run(src.exists):
+            if dry_run:
+                stats.migrated += 1
+                continue
+            new_checksum, dst = await relocate(src, checksum)
+        else:
+            stats.missing += 1
+            continue
+
+        if dry_run:
+            stats.migrated += 1
+            continue
+
+        # dst is only known up front when the row has a checksum
+        assert new_checksum is not None
+        file_updates.append({"id": file_id, "location_url": str(dst), "checksum": new_checksum})
+        if checksum is None:
+            blob = new_blobs.setdefault(
+                new_checksum,
+                {"checksum": new_checksum, "location_url": str(dst), "size": size, "refcount": 0},
+            )
+            blob["refcount"] += 1
+        else:
+            moved_blobs[new_checksum] = str(dst)
+        stale_paths.append(src)
+        stats.migrated += 1
+
+    if file_updates:
+        if new_blobs:
+            stmt = insert(Blob).values(list(new_blobs.values()))
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[Blob.checksum],
+                    set_={
+                        "refcount": Blob.refcount + stmt.excluded.refcount,
+                        "location_url": stmt.excluded.location_url,
+                    },
+                )
+            )
+        if moved_blobs:
+            await db.execute(
+                update(Blob),
+                [{"checksum": c, "location_url": url} for c, url in moved_blobs.items()],
+            )
+        await db.execute(update(File), file_updates)
+        await db.commit()
+
+    return stale_paths
+
+
+async def migrate(batch_size: int, dry_run: bool = False) -> MigrationStats:
+    """Walk the files table in id order and migrate every row."""
+    stats = MigrationStats()
+    last_id = 0
+
+    while True:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(File.id, File.location_url, File.checksum, File.size)
+                .where(File.id > last_id)
+                .order_by(File.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            stale_paths = await migrate_batch(db, rows, stats, dry_run=dry_run)
+            last_id = rows[-1][0]
+
+        # Old paths are removed only after the new locations are committed
+        for path in stale_paths:
+            await storage_io.unlink(path)
+
+        print(f"migrated up to files.id={last_id}: {stats}")
+
+    return stats
+
+
+async def _main(batch_size: int, dry_run: bool) -> None:
+    try:
+        stats = await migrate(batch_size=batch_size, dry_run=dry_run)
+        print(f"done: {stats}")
+    finally:
+        await engine.dispose()
+        storage_io.shutdown()
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be migrated")
+    args = parser.parse_args()
+
+    asyncio.run(_main(batch_size=args.batch_size, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
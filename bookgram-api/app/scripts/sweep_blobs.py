@@ -0,0 +1,158 @@
+"""
+Remove blob files that have no ``blobs`` row.
+
+Saves place a blob file before their transaction commits, so a save that
+fails or rolls back after that point leaves the file behind without a row
+(see FileService.place_blob). This script walks the sharded blob layout
+(``uploads/ab/cd/<sha256>``), looks the checksums up in ``blobs`` in
+batches and unlinks the files (and their page index) that no row refers to.
+
+Files changed less than ``--min-age`` seconds ago are left alone: they may
+belong to a save that has not committed yet. A save that deduplicates
+against an existing blob touches it first, and the age is checked again
+right before unlinking.
+
+Usage (from the bookgram-api directory):
+    python -m app.scripts.sweep_blobs --min-age 3600
+    python -m app.scripts.sweep_blobs --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.db import AsyncSessionLocal, engine
+from app.db.models.blob import Blob
+from app.services.file_service import FileService
+from app.services.page_index import index_path
+from app.services.storage import storage_io
+
+CHECKSUM_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+# A blob file found on disk: checksum, path and size in bytes
+Candidate = tuple[str, Path, int]
+
+
+@dataclass
+class SweepStats:
+    """Counters reported at the end of a sweep."""
+
+    scanned: int = 0
+    referenced: int = 0
+    recent: int = 0
+    removed: int = 0
+    removed_bytes: int = 0
+
+
+def _changed_at(stat: os.stat_result) -> float:
+    # ctime also moves on rename, link and utime, unlike mtime
+    return max(stat.st_mtime, stat.st_ctime)
+
+
+def scan(root: Path, cutoff: float, stats: SweepStats) -> list[Candidate]:
+    """
+    Blob files under root last changed before cutoff.
+
+    Only files at their sharded blob path are considered; temporary
+    files, page indexes and anything else in the upload directory are not.
+    """
+    candidates: list[Candidate] = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath, name)
+            if not CHECKSUM_PATTERN.fullmatch(name) or FileService.blob_path(name) != path:
+                continue
+            stats.scanned += 1
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if _changed_at(stat) > cutoff:
+                stats.recent += 1
+                continue
+            candidates.append((name, path, stat.st_size))
+    return candidates
+
+
+async def sweep_batch(
+    candidates: list[Candidate], cutoff: float, stats: SweepStats, dry_run: bool = False
+) -> None:
+    """Unlink the candidates that have no blobs row."""
+    async with AsyncSessionLocal() as db:
+        referenced = set(
+            await db.scalars(
+                select(Blob.checksum).where(Blob.checksum.in_([c for c, _, _ in candidates]))
+            )
+        )
+
+    for checksum, path, size in candidates:
+        if checksum in referenced:
+            stats.referenced += 1
+            continue
+        if not dry_run:
+            # Touched by a save that deduplicated against it since the scan
+            try:
+                stat = await storage_io.run(path.stat)
+            except FileNotFoundError:
+                continue
+            if _changed_at(stat) > cutoff:
+                stats.recent += 1
+                continue
+            await storage_io.unlink(path)
+            await storage_io.unlink(index_path(path))
+        stats.removed += 1
+        stats.removed_bytes += size
+
+
+async def sweep(batch_size: int, min_age: float, dry_run: bool = False) -> SweepStats:
+    """Scan the upload directory and remove the blob files without a row."""
+    stats = SweepStats()
+    cutoff = time.time() - min_age
+    root = FileService.UPLOAD_DIR
+    if not await storage_io.run(root.is_dir):
+        return stats
+
+    shards = sorted(await storage_io.run(lambda: [p for p in root.iterdir() if p.is_dir()]))
+    for shard in shards:
+        candidates = await storage_io.run(scan, shard, cutoff, stats)
+        for start in range(0, len(candidates), batch_size):
+            await sweep_batch(candidates[start : start + batch_size], cutoff, stats, dry_run)
+        print(f"swept {shard.name}/: {stats}")
+
+    return stats
+
+
+async def _main(batch_size: int, min_age: float, dry_run: bool) -> None:
+    try:
+        stats = await sweep(batch_size=batch_size, min_age=min_age, dry_run=dry_run)
+        print(f"done: {stats}")
+    finally:
+        await engine.dispose()
+        storage_io.shutdown()
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="checksums per query")
+    parser.add_argument(
+        "--min-age", type=float, default=3600, help="seconds since a file last changed"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="report what would be removed")
+    args = parser.parse_args()
+
+    asyncio.run(_main(batch_size=args.batch_size, min_age=args.min_age, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """Business logic services."""
 
+from app.services.blob_service import BlobService
 from app.services.file_service import FileService
 from app.services.user_service import UserService
 
-__all__ = ["FileService", "UserService"]
+__all__ = ["BlobService", "FileService", "UserService"]
@@ -0,0 +1,111 @@
+"""Blob service for reference-counted, content-addressed storage."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import SAVE_STAGE_SECONDS
+from app.db.models.blob import Blob
+
+
+class BlobService:
+    """Service for blob-related operations."""
+
+    @staticmethod
+    async def acquire(
+        db: AsyncSession,
+        checksum: str,
+        location_url: str,
+        size: int,
+    ) -> int:
+        """
+        Register a reference to a blob, creating the blob row if needed.
+
+        Args:
+            db: Database session
+            checksum: SHA-256 hex digest of the content
+            location_url: Path to the blob on disk
+            size: Blob size in bytes
+
+        Returns:
+            Reference count after this acquisition (1 for a new blob)
+        """
+        stmt = (
+            insert(Blob)
+            .values(checksum=checksum, location_url=location_url, size=size, refcount=1)
+            .on_conflict_do_update(
+                index_elements=[Blob.checksum],
+                set_={"refcount": Blob.refcount + 1},
+            )
+            .returning(Blob.refcount)
+        )
+        with SAVE_STAGE_SECONDS.time(stage="blob_acquire"):
+            result = await db.execute(stmt)
+        return result.scalar_one()
+
+    @staticmethod
+    async def acquire_many(db: AsyncSession, blobs: list[tuple[str, str, int]]) -> None:
+        """
+        Register one reference per entry with a single upsert.
+
+        Duplicate checksums are folded into one row whose refcount is
+        incremented by the number of occurrences. Rows are upserted (and
+        locked) in checksum order, so concurrent batches sharing blobs
+        cannot deadlock.
+
+        Args:
+            db: Database session
+            blobs: (checksum, location_url, size) per referencing file
+        """
+        rows: dict[str, dict[str, Any]] = {}
+        for checksum, location_url, size in blobs:
+            row = rows.setdefault(
+                checksum,
+                {"checksum": checksum, "location_url": location_url, "size": size, "refcount": 0},
+            )
+            row["refcount"] += 1
+        if not rows:
+            return
+
+        stmt = insert(Blob).values([rows[checksum] for checksum in sorted(rows)])
+        with SAVE_STAGE_SECONDS.time(stage="blob_acquire"):
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[Blob.checksum],
+                    set_={"refcount": Blob.refcount + stmt.excluded.refcount},
+                )
+            )
+
+    @staticmethod
+    async def release(db: AsyncSession, checksum: str) -> int:
+        """
+        Drop a reference to a blob, deleting the row when none remain.
+
+        The caller is responsible for removing the blob from disk once the
+        transaction has committed and the returned count is 0.
+
+        Args:
+            db: Database session
+            checksum: SHA-256 hex digest of the content
+
+        Returns:
+            Remaining reference count (0 if the blob row was deleted)
+        """
+        result = await db.execute(
+            update(Blob)
+            .where(Blob.checksum == checksum)
+            .values(refcount=Blob.refcount - 1)
+            .returning(Blob.refcount)
+        )
+        refcount = result.scalar_one_or_none()
+        if refcount is None:
+            raise ValueError(f"Blob {checksum} not found")
+
+        if refcount <= 0:
+            await db.execute(delete(Blob).where(Blob.checksum == checksum))
+            return 0
+        return refcount
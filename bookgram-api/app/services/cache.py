@@ -0,0 +1,244 @@
+"""In-process metadata caches with LRU eviction, TTL and commit-time invalidation."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import asdict, dataclass
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+T = TypeVar("T")
+
+# Session.info key of the (cache, key) pairs to invalidate when the session commits
+_PENDING_INVALIDATIONS = "metadata_cache_invalidations"
+
+
+@dataclass
+class CacheStats:
+    """Counters of a cache since it was created or cleared."""
+
+    hits: int = 0
+    misses: int = 0
+    # Lookups that waited for another coroutine's load of the same key
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Counters as a plain dict."""
+        return asdict(self)
+
+
+@dataclass
+class _Load:
+    """A load in progress; its result is not stored if the key is invalidated meanwhile."""
+
+    future: asyncio.Future[Any]
+    stale: bool = False
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+
+
+class MetadataCache(Generic[K, V]):
+    """
+    Bounded LRU cache with a TTL and single-flight loading.
+
+    Meant for small, hot, rarely changing rows (a topic's latest file, a
+    user). Entries expire after ttl seconds and the least recently used
+    entry is evicted beyond max_entries. Concurrent misses for the same key
+    share one load, so a cold key costs a single query however many
+    requests ask for it at once. Missing rows (None) are cached too.
+
+    Writers invalidate keys with invalidate_on_commit(); the entry is
+    dropped once the transaction commits, and a load that was running at
+    that moment does not store its (possibly older) result. The cache is
+    per process: other workers only see a change once their entry expires.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: OrderedDict[K, _Entry] = OrderedDict()
+        self._loads: dict[K, _Load] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether values are cached at all (a zero TTL or size disables caching)."""
+        return self.ttl > 0 and self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(self, key: K, loader: Callable[[], Awaitable[V]]) -> V:
+        """
+        Get the cached value for a key, loading it on a miss.
+
+        Args:
+            key: Cache key
+            loader: Called at most once per miss, by the first coroutine asking
+                for the key; later callers wait for its result
+
+        Returns:
+            The cached or freshly loaded value
+
+        Raises:
+            Exception: Whatever the loader raised (nothing is cached then)
+        """
+        if not self.enabled:
+            return await loader()
+
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return entry.value
+                del self._entries[key]
+                self.stats.expirations += 1
+
+            load = self._loads.get(key)
+            if load is None:
+                break
+            self.stats.coalesced += 1
+            try:
+                return await asyncio.shield(load.future)
+            except asyncio.CancelledError:
+                # Retry if the loading coroutine was cancelled rather than this one
+                if not load.future.cancelled():
+                    raise
+
+        self.stats.misses += 1
+        load = _Load(asyncio.get_running_loop().create_future())
+        self._loads[key] = load
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            load.future.cancel()
+            raise
+        except BaseException as e:
+            load.future.set_exception(e)
+            # Mark retrieved: there may be no waiters
+            load.future.exception()
+            raise
+        else:
+            load.future.set_result(value)
+            if not load.stale:
+                self._store(key, value)
+            return value
+        finally:
+            del self._loads[key]
+
+    def peek(self, key: K) -> V | None:
+        """Get the cached value for a key without loading it (None on a miss)."""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= self.clock():
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry.value
+
+    def put(self, key: K, value: V) -> None:
+        """Cache a value loaded by the caller."""
+        if self.enabled:
+            self._store(key, value)
+
+    def _store(self, key: K, value: V) -> None:
+        self._entries[key] = _Entry(value, self.clock() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """Drop a key now, and keep a load already running for it from storing its result."""
+        if self._entries.pop(key, None) is not None:
+            self.stats.invalidations += 1
+        load = self._loads.get(key)
+        if load is not None:
+            load.stale = True
+
+    def invalidate_on_commit(self, db: AsyncSession, key: K) -> None:
+        """Drop a key once the session's transaction commits (nothing happens on rollback)."""
+        db.info.setdefault(_PENDING_INVALIDATIONS, set()).add((self, key))
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._entries.clear()
+        for load in self._loads.values():
+            load.stale = True
+        self.stats = CacheStats()
+
+
+def detached_copy(instance: T) -> T:
+    """
+    Copy the loaded attributes of an ORM instance into a new detached instance.
+
+    The copy belongs to no session, so it is unaffected by the loading
+    session expiring or closing and can be shared as a read-only snapshot.
+    Use ``await db.merge(copy, load=False)`` to modify it.
+    """
+    state = inspect(instance, raiseerr=True)
+    copy = state.mapper.class_manager.new_instance()
+    for attr in state.mapper.column_attrs:
+        if attr.key in state.dict:
+            set_committed_value(copy, attr.key, state.dict[attr.key])
+    make_transient_to_detached(copy)
+    return copy
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for cache, key in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        cache.invalidate(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+# Latest file per normalized topic (FileService.get_file_by_topic)
+topic_cache: MetadataCache[str, Any] = MetadataCache(
+    "topics", settings.METADATA_CACHE_MAX_ENTRIES, settings.METADATA_CACHE_TTL
+)
+# Topic IDs by name (TopicService.get_ids); a topic's ID never changes
+topic_id_cache: MetadataCache[str, int] = MetadataCache(
+    "topic_ids", settings.METADATA_CACHE_MAX_ENTRIES, settings.METADATA_CACHE_TTL
+)
+# Users by ID (UserService.get_user)
+user_cache: MetadataCache[int, Any] = MetadataCache(
+    "users", settings.METADATA_CACHE_MAX_ENTRIES, settings.METADATA_CACHE_TTL
+)
+# Topics a user is subscribed to, by user ID (UserService.get_subscribed_topics)
+subscription_cache: MetadataCache[int, Any] = MetadataCache(
+    "subscriptions", settings.METADATA_CACHE_MAX_ENTRIES, settings.METADATA_CACHE_TTL
+)
+
+metadata_caches = (topic_cache, topic_id_cache, user_cache, subscription_cache)
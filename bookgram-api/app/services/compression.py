@@ -0,0 +1,109 @@
+"""Streaming decompression of compressed uploads."""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+from collections.abc import AsyncIterator
+from typing import IO, cast
+
+from app.services.exceptions import CorruptUploadError, UnsupportedCompressionError
+from app.services.storage import storage_io
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Magic bytes identifying each supported compression format
+MAGIC_NUMBERS: dict[str, bytes] = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+# Filename suffixes that denote a compression wrapper rather than the content type
+COMPRESSION_SUFFIXES = frozenset({"gz", "gzip", "bz2", "xz", "zst", "zstd"})
+
+# Errors raised by the decompressors on truncated or invalid input
+_DECOMPRESSION_ERRORS: tuple[type[Exception], ...] = (OSError, EOFError, lzma.LZMAError)
+if zstandard is not None:
+    _DECOMPRESSION_ERRORS += (zstandard.ZstdError,)
+
+# Longest magic number, i.e. how many leading bytes detection needs
+MAGIC_LENGTH = max(len(magic) for magic in MAGIC_NUMBERS.values())
+
+
+def detect_compression(header: bytes) -> str | None:
+    """
+    Detect the compression format from the first bytes of a file.
+
+    Args:
+        header: At least MAGIC_LENGTH leading bytes (fewer for tiny files)
+
+    Returns:
+        Compression name ('gzip', 'bz2', 'xz', 'zstd') or None if uncompressed
+    """
+    for name, magic in MAGIC_NUMBERS.items():
+        if header.startswith(magic):
+            return name
+    return None
+
+
+def open_decompressor(compression: str, fileobj: IO[bytes]) -> IO[bytes]:
+    """
+    Wrap a binary file in a streaming decompressor.
+
+    Every returned reader honours ``read(n)`` as an upper bound on the number
+    of decompressed bytes produced, so memory stays bounded regardless of the
+    compression ratio.
+    """
+    if compression == "gzip":
+        # GzipFile is a BufferedIOBase, not typed as IO[bytes] like the others
+        return cast(IO[bytes], gzip.GzipFile(fileobj=fileobj, mode="rb"))
+    if compression == "bz2":
+        return bz2.BZ2File(fileobj, mode="rb")
+    if compression == "xz":
+        return lzma.LZMAFile(fileobj, mode="rb")
+    if compression == "zstd":
+        if zstandard is None:
+            raise UnsupportedCompressionError("zstd uploads require the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(
+            fileobj, read_across_frames=True, closefd=False
+        )
+    raise UnsupportedCompressionError(f"Unsupported compression format: {compression}")
+
+
+async def iter_decompressed(
+    fileobj: IO[bytes],
+    compression: str,
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    """
+    Decompress a file in bounded chunks on the storage I/O pool.
+
+    Args:
+        fileobj: Compressed binary file positioned at its start
+        compression: Compression name returned by detect_compression
+        chunk_size: Maximum number of decompressed bytes per chunk
+
+    Yields:
+        Decompressed chunks
+
+    Raises:
+        CorruptUploadError: If the compressed stream is truncated or invalid
+    """
+    reader = open_decompressor(compression, fileobj)
+    try:
+        while True:
+            try:
+                chunk = await storage_io.run(reader.read, chunk_size)
+            except _DECOMPRESSION_ERRORS as e:
+                raise CorruptUploadError(f"Compressed file is corrupted: {e}") from e
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        reader.close()
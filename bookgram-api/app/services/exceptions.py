@@ -0,0 +1,58 @@
+"""Service layer exceptions."""
+
+from __future__ import annotations
+
+
+class UploadRejectedError(Exception):
+    """Base class for uploads rejected because of their content."""
+
+    status_code: int = 400
+
+
+class EmptyUploadError(UploadRejectedError):
+    """Raised when an upload contains no data."""
+
+    def __init__(self, message: str = "File is empty or corrupted") -> None:
+        super().__init__(message)
+
+
+class CorruptUploadError(UploadRejectedError):
+    """Raised when an upload cannot be decoded."""
+
+
+class UnsupportedCompressionError(UploadRejectedError):
+    """Raised when an upload uses a compression format that cannot be read."""
+
+    status_code = 415
+
+
+class UploadTooLargeError(UploadRejectedError):
+    """Raised when the (decompressed) upload exceeds the size limit."""
+
+    status_code = 413
+
+    def __init__(self, max_size: int) -> None:
+        super().__init__(f"File exceeds the maximum size of {max_size} bytes")
+        self.max_size = max_size
+
+
+class InvalidFormError(UploadRejectedError):
+    """Raised when a multipart upload body is malformed or misses required fields."""
+
+
+class UploadConflictError(UploadRejectedError):
+    """Raised when a resumable upload request conflicts with the session state."""
+
+    status_code = 409
+
+
+class ExtractionError(Exception):
+    """Raised when a stored document cannot be parsed into chapters and pages."""
+
+
+class ExtractionInProgressError(Exception):
+    """Raised when an extraction job cannot be changed because it is running."""
+
+
+class PermanentJobError(Exception):
+    """Raised by an outbox job handler when retrying the job cannot succeed."""
@@ -0,0 +1,297 @@
+"""Chapter and page extraction from stored books, run on a process pool."""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import unquote
+
+from app.core.config import settings
+from app.db.models.file_page import CHAPTER, PAGE
+from app.services.exceptions import ExtractionError
+from app.services.page_index import build_page_index, heading_pattern, store_index
+
+try:
+    from pypdf import PdfReader
+    from pypdf.errors import PdfReadError
+except ImportError:  # pragma: no cover - optional dependency
+    PdfReader = None
+
+    class _NoPdfReadError(Exception):
+        """Stand-in for pypdf's error, never raised without pypdf."""
+
+    PdfReadError = _NoPdfReadError
+
+TEXT_FORMATS = frozenset({"txt", "md", "log"})
+
+_CONTAINER_NS = "{urn:oasis:names:tc:opendocument:xmlns:container}"
+_OPF_NS = "{http://www.idpf.org/2007/opf}"
+
+
+@dataclass(frozen=True)
+class Segment:
+    """A chapter or page: its text and, for text formats, its byte range in the file."""
+
+    text: str
+    byte_offset: int | None = None
+    byte_length: int | None = None
+
+
+@dataclass(frozen=True)
+class ExtractedDocument:
+    """Chapters and pages of a book, in reading order."""
+
+    chapters: list[Segment]
+    pages: list[Segment]
+
+
+def extract_document(path: str, file_format: str, page_size: int) -> ExtractedDocument:
+    """
+    Split a stored book into chapters and pages.
+
+    CPU-bound; meant to run in a worker process.
+
+    Args:
+        path: Path of the stored (decompressed) file
+        file_format: File extension/type
+        page_size: Maximum page length, in bytes for text formats and in
+            characters otherwise
+
+    Returns:
+        Extracted chapters and pages
+
+    Raises:
+        ExtractionError: If the document cannot be parsed (retrying will not help)
+    """
+    if file_format in TEXT_FORMATS:
+        return _extract_text(path, file_format, page_size)
+    if file_format == "epub":
+        return _extract_epub(path, page_size)
+    if file_format == "pdf":
+        return _extract_pdf(path)
+    raise ExtractionError(f"Unsupported format for extraction: {file_format}")
+
+
+def page_spans(text: str, page_size: int) -> list[tuple[int, int]]:
+    """
+    Split text into pages of at most page_size characters.
+
+    Same rules as the byte-based page index of text formats: pages break at the last paragraph break, else line break, else space in
+    the second half of the window, so words and paragraphs stay whole where
+    possible. Pages are contiguous; blank ones are dropped.
+
+    Returns:
+        (start, end) character spans, in order
+    """
+    spans: list[tuple[int, int]] = []
+    start = 0
+    while len(text) - start > page_size:
+        end = start + page_size
+        floor = start + page_size // 2
+        for separator in ("\n\n", "\n", " "):
+            cut = text.rfind(separator, floor, end)
+            if cut != -1:
+                end = cut + len(separator)
+                break
+        spans.append((start, end))
+        start = end
+    if start < len(text):
+        spans.append((start, len(text)))
+    return [(start, end) for start, end in spans if text[start:end].strip()]
+
+
+def split_pages(text: str, page_size: int) -> list[str]:
+    """Split text into pages (see page_spans)."""
+    return [text[start:end] for start, end in page_spans(text, page_size)]
+
+
+def _extract_text(path: str, file_format: str, page_size: int) -> ExtractedDocument:
+    """
+    Chapters and pages of a text file, from its byte-offset page index.
+
+    The index is also stored next to the file if it is missing (files saved
+    before indexing existed) or was built with another page size.
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    index = build_page_index(content, page_size, heading_pattern(file_format))
+    store_index(Path(path), index)
+    return ExtractedDocument(
+        chapters=[_byte_segment(content, start, end) for start, end in index.spans(CHAPTER)],
+        pages=[_byte_segment(content, start, end) for start, end in index.spans(PAGE)],
+    )
+
+
+def _byte_segment(content: bytes, start: int, end: int) -> Segment:
+    text = content[start:end].decode("utf-8", errors="replace")
+    return Segment(text.replace("\x00", ""), start, end - start)
+
+
+def _clean(text: str) -> str:
+    """Make text storable: invalid bytes become U+FFFD, NULs are dropped."""
+    text = text.encode("utf-8", errors="surrogateescape").decode("utf-8", errors="replace")
+    return text.replace("\x00", "")
+
+
+class _HTMLText(HTMLParser):
+    """Collect the visible text of an (X)HTML document."""
+
+    BLOCK_TAGS = frozenset(
+        {"p", "div", "br", "li", "tr", "section", "blockquote", "h1", "h2", "h3", "h4", "h5", "h6"}
+    )
+    SKIP_TAGS = frozenset({"head", "script", "style"})
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        joined = re.sub(r"[ \t]+", " ", "".join(self.parts))
+        return re.sub(r"\s*\n\s*\n\s*", "\n\n", joined).strip()
+
+
+def html_to_text(html: str) -> str:
+    """Extract the visible text of an (X)HTML document."""
+    parser = _HTMLText()
+    parser.feed(html)
+    parser.close()
+    return parser.text()
+
+
+def _extract_epub(path: str, page_size: int) -> ExtractedDocument:
+    """One chapter per spine document, in reading order."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            container = ET.fromstring(archive.read("META-INF/container.xml"))
+            rootfile = container.find(f".//{_CONTAINER_NS}rootfile")
+            if rootfile is None or not rootfile.get("full-path"):
+                raise ExtractionError("EPUB container has no rootfile")
+            package_path = rootfile.get("full-path", "")
+            package = ET.fromstring(archive.read(package_path))
+
+            manifest = {
+                item.get("id"): item.get("href")
+                for item in package.iterfind(f"{_OPF_NS}manifest/{_OPF_NS}item")
+            }
+            base = posixpath.dirname(package_path)
+            chapters: list[str] = []
+            for itemref in package.iterfind(f"{_OPF_NS}spine/{_OPF_NS}itemref"):
+                href = manifest.get(itemref.get("idref"))
+                if not href:
+                    continue
+                name = posixpath.normpath(posixpath.join(base, unquote(href)))
+                text = html_to_text(archive.read(name).decode("utf-8", errors="replace"))
+                if text:
+                    chapters.append(text)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        raise ExtractionError(f"Invalid EPUB: {e}") from e
+
+    return ExtractedDocument(
+        chapters=[Segment(_clean(chapter)) for chapter in chapters],
+        pages=[
+            Segment(_clean(page))
+            for chapter in chapters
+            for page in split_pages(chapter, page_size)
+        ],
+    )
+
+
+def _extract_pdf(path: str) -> ExtractedDocument:
+    """One page per PDF page; chapters from the top-level outline, if any."""
+    if PdfReader is None:
+        raise ExtractionError("PDF extraction requires the 'pdf' extra (pypdf)")
+    try:
+        reader = PdfReader(path)
+        pages = [page.extract_text() or "" for page in reader.pages]
+        # Top-level outline entries; nested lists are sub-sections
+        outline_pages = {
+            reader.get_destination_page_number(entry)
+            for entry in reader.outline
+            if not isinstance(entry, list)
+        }
+        starts = sorted(page for page in outline_pages if page is not None)
+    except (PdfReadError, ValueError, KeyError) as e:
+        raise ExtractionError(f"Invalid PDF: {e}") from e
+
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = zip(starts, starts[1:] + [len(pages)])
+    chapters = [
+        chapter for start, end in bounds if (chapter := "\n".join(pages[start:end]).strip())
+    ]
+    # Blank pages are kept, so page indexes match the PDF's
+    return ExtractedDocument(
+        chapters=[Segment(_clean(chapter)) for chapter in chapters],
+        pages=[Segment(_clean(page)) for page in pages],
+    )
+
+
+class ExtractionPool:
+    """
+    Run extraction in worker processes.
+
+    Parsing is CPU-bound and holds the GIL, so it runs in a separate process
+    pool rather than on the event loop or the storage I/O threads.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Process pool used for extraction (created lazily)."""
+        if self._executor is None:
+            # Spawn: forking a process with a running event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def extract(self, path: str, file_format: str, page_size: int) -> ExtractedDocument:
+        """Extract a document in a worker process."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, extract_document, path, file_format, page_size
+        )
+
+    def reset(self) -> None:
+        """Discard the pool (e.g. after a worker crashed); a new one is created on next use."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+extraction_pool = ExtractionPool(settings.EXTRACTION_MAX_WORKERS)
@@ -0,0 +1,226 @@
+"""Extraction job service: chapter/page extraction after upload, run from the outbox."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.file import File
+from app.db.models.file_page import CHAPTER, PAGE, FilePage
+from app.db.session import AsyncSessionLocal, utcnow
+from app.services.exceptions import (
+    ExtractionError,
+    ExtractionInProgressError,
+    PermanentJobError,
+)
+from app.services.extraction import ExtractedDocument, extraction_pool
+from app.services.outbox_service import OutboxService
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+# Outbox job kind of chapter/page extraction
+EXTRACT_FILE = "extract_file"
+
+
+class ExtractionService:
+    """Service for chapter/page extraction jobs."""
+
+    @staticmethod
+    async def enqueue(db: AsyncSession, file_ids: list[int]) -> list[int]:
+        """
+        Record extraction jobs for files in the caller's transaction.
+
+        The jobs are run by the outbox worker (and, with OUTBOX_INLINE, by
+        the API processes) once the transaction commits.
+
+        Args:
+            db: Database session
+            file_ids: IDs of the files to extract
+
+        Returns:
+            Outbox job IDs (none when extraction is disabled)
+        """
+        if not settings.EXTRACTION_ENABLED:
+            return []
+        return await OutboxService.enqueue(
+            db, EXTRACT_FILE, [{"file_id": file_id} for file_id in file_ids]
+        )
+
+    @staticmethod
+    async def process(payload: dict[str, Any], attempt: int) -> None:
+        """
+        Outbox handler: make one attempt at extracting a file's chapters and pages.
+
+        The file's job is claimed atomically, so a file is never extracted
+        by two runners at once; nothing is done when it is not pending.
+        Documents that cannot be parsed fail at once (PermanentJobError).
+        Other errors are raised for the outbox to retry with backoff; the
+        file is marked failed on the outbox job's last attempt
+        (OUTBOX_MAX_ATTEMPTS), when the job is dead-lettered.
+
+        Args:
+            payload: {"file_id": ID of the file to extract}
+            attempt: The outbox job's attempt number, from 1
+        """
+        file_id = payload["file_id"]
+        async with AsyncSessionLocal() as db:
+            file_record = await ExtractionService.claim(db, file_id)
+            await db.commit()
+        if file_record is None:
+            return
+
+        try:
+            document = await asyncio.wait_for(
+                extraction_pool.extract(
+                    file_record.location_url,
+                    file_record.format,
+                    settings.EXTRACTION_PAGE_SIZE,
+                ),
+                timeout=settings.EXTRACTION_TIMEOUT,
+            )
+        except ExtractionError as e:
+            await ExtractionService._record_failure(file_id, str(e), retry=False)
+            raise PermanentJobError(str(e)) from e
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                extraction_pool.reset()
+            retry = attempt < settings.OUTBOX_MAX_ATTEMPTS
+            error = f"{type(e).__name__}: {e}"
+            await ExtractionService._record_failure(file_id, error, retry=retry)
+            if not retry:
+                raise PermanentJobError(error) from e
+            raise
+
+        async with AsyncSessionLocal() as db:
+            await ExtractionService.complete(db, file_id, document)
+            await db.commit()
+
+    @staticmethod
+    async def _record_failure(file_id: int, error: str, retry: bool) -> None:
+        async with AsyncSessionLocal() as db:
+            await ExtractionService.fail(db, file_id, error, retry=retry)
+            await db.commit()
+        if not retry:
+            logger.warning("Extraction of file %s failed: %s", file_id, error)
+
+    @staticmethod
+    async def claim(db: AsyncSession, file_id: int) -> File | None:
+        """
+        Atomically move a pending job to processing and count the attempt.
+
+        A job left processing for longer than EXTRACTION_TIMEOUT (its runner
+        died) is claimed too.
+
+        Returns:
+            The claimed file, or None if it is not pending (done, failed,
+            deleted, or claimed by another runner)
+        """
+        stale_before = utcnow() - timedelta(seconds=settings.EXTRACTION_TIMEOUT)
+        return await db.scalar(
+            update(File)
+            .where(
+                File.id == file_id,
+                or_(
+                    File.extraction_status == STATUS_PENDING,
+                    and_(
+                        File.extraction_status == STATUS_PROCESSING,
+                        File.updated_at < stale_before,
+                    ),
+                ),
+            )
+            .values(
+                extraction_status=STATUS_PROCESSING,
+                extraction_attempts=File.extraction_attempts + 1,
+                extraction_error=None,
+            )
+            .returning(File)
+        )
+
+    @staticmethod
+    async def complete(db: AsyncSession, file_id: int, document: ExtractedDocument) -> None:
+        """Store the extracted chapters and pages and mark the job completed."""
+        # Replace the results of any earlier extraction
+        await db.execute(delete(FilePage).where(FilePage.file_id == file_id))
+        rows = [
+            {
+                "file_id": file_id,
+                "kind": kind,
+                "page_index": index,
+                "byte_offset": segment.byte_offset,
+                "byte_length": segment.byte_length,
+                "text": segment.text,
+            }
+            for kind, segments in ((PAGE, document.pages), (CHAPTER, document.chapters))
+            for index, segment in enumerate(segments)
+        ]
+        if rows:
+            await db.execute(insert(FilePage), rows)
+        await db.execute(
+            update(File)
+            .where(File.id == file_id)
+            .values(
+                chapter_count=len(document.chapters),
+                page_count=len(document.pages),
+                extraction_status=STATUS_COMPLETED,
+                extraction_error=None,
+            )
+        )
+
+    @staticmethod
+    async def fail(db: AsyncSession, file_id: int, error: str, retry: bool) -> None:
+        """Record a failed attempt; the job goes back to pending if it will be retried."""
+        await db.execute(
+            update(File)
+            .where(File.id == file_id)
+            .values(
+                extraction_status=STATUS_PENDING if retry else STATUS_FAILED,
+                extraction_error=error,
+            )
+        )
+
+    @staticmethod
+    async def requeue(db: AsyncSession, file_id: int) -> File:
+        """
+        Reset a file's extraction job to pending with a fresh attempt budget.
+
+        A job that is processing can only be requeued once it has been
+        running longer than EXTRACTION_TIMEOUT (its runner has died).
+
+        Args:
+            db: Database session
+            file_id: File ID
+
+        Returns:
+            The updated file
+        """
+        stale_before = utcnow() - timedelta(seconds=settings.EXTRACTION_TIMEOUT)
+        file_record = await db.scalar(
+            update(File)
+            .where(
+                File.id == file_id,
+                or_(
+                    File.extraction_status != STATUS_PROCESSING,
+                    File.updated_at < stale_before,
+                ),
+            )
+            .values(extraction_status=STATUS_PENDING, extraction_attempts=0, extraction_error=None)
+            .returning(File)
+        )
+        if file_record is not None:
+            return file_record
+
+        if await db.scalar(select(File.id).where(File.id == file_id)) is None:
+            raise ValueError(f"File with id {file_id} not found")
+        raise ExtractionInProgressError(f"Extraction of file {file_id} is already in progress")
@@ -2,21 +2,72 @@
 
 from __future__ import annotations
 
+import hashlib
+import os
 import re
+import tempfile
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.config import settings
+from app.core.metrics import SAVE_STAGE_SECONDS, Stopwatch
 from app.db.models.file import File
+from app.db.models.file_page import FilePage
+from app.db.models.topic import Topic
+from app.services.cache import detached_copy, topic_cache
+from app.services.compression import (
+    COMPRESSION_SUFFIXES,
+    detect_compression,
+    iter_decompressed,
+)
+from app.services.exceptions import EmptyUploadError, UploadTooLargeError
+from app.services.extraction import TEXT_FORMATS
+from app.services.page_index import PageIndexBuilder, heading_pattern, store_index
+from app.services.storage import storage_io
+from app.services.topic_service import TopicService
+from app.services.validation import ContentValidator, content_validator
+
+# Special characters (except dots) become underscores
+_TOPIC_SPECIAL_CHARS = re.compile(r"[^\w\s.\-]")
+# Runs of spaces, hyphens and underscores collapse to one underscore
+_TOPIC_SEPARATORS = re.compile(r"[-\s_]+")
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    """Result of streaming an upload to disk."""
+
+    location_url: str
+    size: int
+    checksum: str
+    created: bool = True
 
 
 class FileService:
     """Service for file-related operations."""
 
     UPLOAD_DIR = Path("uploads")
+    ALLOWED_FORMATS = ("txt", "md", "log", "pdf", "epub")
+    CONTENT_TYPES = {
+        "txt": "text/plain; charset=utf-8",
+        "md": "text/markdown; charset=utf-8",
+        "log": "text/plain; charset=utf-8",
+        "pdf": "application/pdf",
+        "epub": "application/epub+zip",
+    }
+    # Blobs live under UPLOAD_DIR/ab/cd/<sha256> to keep directories small
+    SHARD_LEVELS = 2
+    SHARD_WIDTH = 2
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize_topic(title: str) -> str:
         """
         Normalize title to create a valid topic/filename.
@@ -27,42 +78,253 @@ class FileService:
         Returns:
             Normalized topic string (lowercase, alphanumeric with underscores)
         """
-        # Convert to lowercase and replace special characters (except dots) with underscores
-        normalized = re.sub(r"[^\w\s.\-]", "_", title.lower())
-        # Replace multiple spaces, hyphens, and underscores with single underscore
-        normalized = re.sub(r"[-\s_]+", "_", normalized)
+        normalized = _TOPIC_SPECIAL_CHARS.sub("_", title.lower())
+        normalized = _TOPIC_SEPARATORS.sub("_", normalized)
         return normalized.strip("_")
 
     @staticmethod
-    async def save_file_to_disk(
-        file_content: bytes,
-        topic: str,
-        file_extension: str,
+    async def iter_stream_content(
+        chunks: AsyncIterator[bytes],
+        chunk_size: int | None = None,
+        max_size: int | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Read the real content of an upload that is still being received.
+
+        gzip, bz2, xz and zstd uploads are detected by their magic bytes and
+        decompressed as a stream. The content size limit is enforced on the
+        decompressed bytes, so a compression bomb is stopped after at most
+        max_size bytes have been produced.
+
+        Uncompressed content of the body stream (e.g. a multipart part) is
+        passed on as it arrives, coalesced into chunks of up to chunk_size,
+        so consumers such as validators see the first chunk before the rest
+        has been sent. Compressed content is spooled to a temporary file
+        first, because the decompressors read from a file.
+
+        Args:
+            chunks: Async iterator over the body as received
+            chunk_size: Maximum chunk size in bytes (defaults to UPLOAD_CHUNK_SIZE)
+            max_size: Maximum content size in bytes (defaults to MAX_UPLOAD_SIZE)
+
+        Yields:
+            Non-empty chunks of the (decompressed) content
+
+        Raises:
+            UploadTooLargeError: If the content exceeds max_size
+        """
+        chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+        max_size = max_size or settings.MAX_UPLOAD_SIZE
+
+        source = _coalesce(chunks, chunk_size)
+        try:
+            first = await source.__anext__()
+        except StopAsyncIteration:
+            first = b""
+        compression = detect_compression(first)
+
+        if compression is None:
+            async for chunk in _limit_size(_prepend(first, source), max_size):
+                yield chunk
+            return
+
+        spool = tempfile.SpooledTemporaryFile(max_size=chunk_size)
+        try:
+            async for chunk in _prepend(first, source):
+                await storage_io.run(spool.write, chunk)
+            spool.seek(0)
+            decompressed = iter_decompressed(spool, compression, chunk_size)
+            async for chunk in _limit_size(decompressed, max_size):
+                yield chunk
+        finally:
+            spool.close()
+
+    @staticmethod
+    def blob_path(checksum: str) -> Path:
+        """
+        Path of the content-addressed blob for a SHA-256 hex digest.
+
+        Blobs are sharded into nested hash-prefix directories, e.g.
+        ``uploads/9f/86/9f86d08...``.
+        """
+        width = FileService.SHARD_WIDTH
+        shards = [checksum[i * width : (i + 1) * width] for i in range(FileService.SHARD_LEVELS)]
+        return FileService.UPLOAD_DIR.joinpath(*shards, checksum)
+
+    @staticmethod
+    def page_index_builder(file_format: str) -> PageIndexBuilder | None:
+        """
+        Page index builder for a format, or None if it is not a text format.
+
+        Pages are EXTRACTION_PAGE_SIZE bytes at most, so the on-disk index and
+        the extracted page rows split the file identically.
+        """
+        if file_format not in TEXT_FORMATS:
+            return None
+        return PageIndexBuilder(settings.EXTRACTION_PAGE_SIZE, heading_pattern(file_format))
+
+    @staticmethod
+    def content_validator(file_format: str) -> ContentValidator | None:
+        """
+        Streaming validator for a format, or None with VALIDATE_UPLOAD_CONTENT off.
+
+        Text must be UTF-8, PDFs need a header and a trailer pointing at a
+        cross-reference section, and EPUBs must be zip archives with a
+        central directory listing META-INF/container.xml.
+        """
+        if not settings.VALIDATE_UPLOAD_CONTENT:
+            return None
+        return content_validator(file_format)
+
+    @staticmethod
+    async def finish_validation(path: Path, validator: ContentValidator | None) -> None:
+        """Run the checks that need the whole content, once it is stored at path."""
+        if validator is not None:
+            with SAVE_STAGE_SECONDS.time(stage="validate"):
+                await storage_io.run(validator.finish, path)
+
+    @staticmethod
+    async def store_page_index(blob_path: Path, builder: PageIndexBuilder | None) -> None:
+        """Write the page index next to a blob (kept if one already exists)."""
+        if builder is not None:
+            with SAVE_STAGE_SECONDS.time(stage="page_index"):
+                await storage_io.run(store_index, blob_path, builder.finish())
+
+    @staticmethod
+    async def hash_file(
+        path: Path,
+        page_index_builder: PageIndexBuilder | None = None,
+        validator: ContentValidator | None = None,
     ) -> str:
         """
-        Save file to disk and return the location URL.
+        Compute the SHA-256 hex digest of a file on the storage I/O pool.
+
+        Args:
+            path: File to hash
+            page_index_builder: Optional page index builder fed in the same pass
+            validator: Optional content validator fed in the same pass (call
+                finish_validation afterwards)
+
+        Returns:
+            SHA-256 hex digest
+
+        Raises:
+            CorruptUploadError: If the validator rejects the content
+        """
+        consumers = [c for c in (validator, page_index_builder) if c is not None]
+        return await storage_io.run(_sha256_file, path, settings.UPLOAD_CHUNK_SIZE, *consumers)
+
+    @staticmethod
+    async def place_blob(tmp_path: Path, checksum: str) -> tuple[Path, bool]:
+        """
+        Move a fully written temporary file into the blob store.
+
+        If a blob with the same checksum already exists the temporary file is
+        discarded before it is ever fsynced, so duplicate content costs no
+        durable write. The existing blob is touched, so that the orphan sweep
+        (app.scripts.sweep_blobs) leaves it alone until the caller's
+        transaction has committed its row.
 
         Args:
-            file_content: File content as bytes
-            topic: Normalized topic/filename
-            file_extension: File extension (e.g., 'txt', 'pdf')
+            tmp_path: Temporary file inside UPLOAD_DIR
+            checksum: SHA-256 hex digest of the file content
 
         Returns:
-            Location URL (relative path to the file)
+            Blob path and whether a new blob was written
+        """
+        blob_path = FileService.blob_path(checksum)
+        with SAVE_STAGE_SECONDS.time(stage="place"):
+            try:
+                await storage_io.run(os.utime, blob_path)
+            except FileNotFoundError:
+                pass
+            else:
+                await storage_io.unlink(tmp_path)
+                return blob_path, False
+
+            await storage_io.fsync_path(tmp_path)
+            await storage_io.mkdir(blob_path.parent)
+            await storage_io.replace(tmp_path, blob_path)
+        return blob_path, True
+
+    @staticmethod
+    async def save_stream_to_disk(
+        chunks: AsyncIterator[bytes],
+        page_index_builder: PageIndexBuilder | None = None,
+        validator: ContentValidator | None = None,
+    ) -> StoredFile:
+        """
+        Stream chunks into the content-addressed blob store.
+
+        Data is written to a temporary file in the upload directory while size
+        and SHA-256 are computed, then moved to its blob path once the whole
+        stream has been consumed. Identical content is stored only once and a
+        failed or empty upload never touches an existing blob. All disk calls
+        run on the storage I/O pool and never block the event loop.
+
+        If a page index builder is given it is fed in the same pass and the
+        index is written next to the blob. If a validator is given it sees
+        every chunk first, so invalid content stops the upload at the chunk
+        that proves it invalid; its final checks run before the blob is
+        placed.
+
+        Args:
+            chunks: Async iterator of file content chunks
+            page_index_builder: Optional builder (see page_index_builder)
+            validator: Optional content validator (see content_validator)
+
+        Returns:
+            Blob location, size in bytes, SHA-256 hex digest and whether a new
+            blob was written
+
+        Raises:
+            EmptyUploadError: If the stream contains no data
+            CorruptUploadError: If the validator rejects the content
         """
         # Ensure upload directory exists
-        FileService.UPLOAD_DIR.mkdir(exist_ok=True)
+        await storage_io.mkdir(FileService.UPLOAD_DIR)
 
-        # Create filename
-        filename = f"{topic}.{file_extension}"
-        file_path = FileService.UPLOAD_DIR / filename
+        fd, tmp_name = await storage_io.run(
+            tempfile.mkstemp, dir=FileService.UPLOAD_DIR, prefix=".", suffix=".part"
+        )
+        tmp_path = Path(tmp_name)
 
-        # Save file to disk
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        digest = hashlib.sha256()
+        consumers: list[Any] = [digest]
+        if validator is not None:
+            consumers.insert(0, validator)
+        if page_index_builder is not None:
+            consumers.append(page_index_builder)
+        size = 0
+        # Reading (and decompressing) the upload and writing it interleave per chunk
+        reading, writing = Stopwatch(), Stopwatch()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in reading.iterate(chunks):
+                    with writing:
+                        await storage_io.write(f, chunk, *consumers)
+                    size += len(chunk)
+            SAVE_STAGE_SECONDS.observe(reading.elapsed, stage="read")
+            SAVE_STAGE_SECONDS.observe(writing.elapsed, stage="write")
 
-        # Return relative path as location_url
-        return str(file_path)
+            if size == 0:
+                raise EmptyUploadError()
+            await FileService.finish_validation(tmp_path, validator)
+
+            checksum = digest.hexdigest()
+            blob_path, created = await FileService.place_blob(tmp_path, checksum)
+        except BaseException:
+            await storage_io.unlink(tmp_path)
+            raise
+
+        await FileService.store_page_index(blob_path, page_index_builder)
+
+        return StoredFile(
+            location_url=str(blob_path),
+            size=size,
+            checksum=checksum,
+            created=created,
+        )
 
     @staticmethod
     async def create_file_record(
@@ -71,6 +333,7 @@ class FileService:
         topic: str,
         size: int,
         file_format: str,
+        checksum: str | None = None,
     ) -> File:
         """
         Create a file record in the database.
@@ -78,33 +341,178 @@ class FileService:
         Args:
             db: Database session
             location_url: Path to file on disk
-            topic: Normalized topic
+            topic: Normalized topic (created if new)
             size: File size in bytes
             file_format: File extension/type
+            checksum: SHA-256 of the content (references the shared blob)
 
         Returns:
             Created File instance
         """
-        db_file = File(
-            location_url=location_url,
-            topic=topic,
-            size=size,
-            format=file_format,
-            chapters=None,
-            pages=None,
+        topic_id = await TopicService.get_id(db, topic)
+        # The topic's latest file changes once this commits
+        topic_cache.invalidate_on_commit(db, topic)
+        # Generated columns come back in the same statement (INSERT ... RETURNING)
+        with SAVE_STAGE_SECONDS.time(stage="insert"):
+            file_record = await db.scalar(
+                insert(File)
+                .values(
+                    location_url=location_url,
+                    checksum=checksum,
+                    topic_id=topic_id,
+                    size=size,
+                    format=file_format,
+                )
+                .returning(File)
+            )
+        set_committed_value(file_record, "topic", topic)
+        return file_record
+
+    @staticmethod
+    async def create_file_records(db: AsyncSession, records: list[dict[str, Any]]) -> list[File]:
+        """
+        Create many file records with a single multi-row INSERT ... RETURNING.
+
+        Args:
+            db: Database session
+            records: One dict per file with location_url, checksum, topic,
+                size and format keys
+
+        Returns:
+            Created File instances, in the same order as records
+        """
+        if not records:
+            return []
+        topic_ids = await TopicService.get_ids(db, [record["topic"] for record in records])
+        rows = []
+        for record in records:
+            topic_cache.invalidate_on_commit(db, record["topic"])
+            row = {key: value for key, value in record.items() if key != "topic"}
+            rows.append({**row, "topic_id": topic_ids[record["topic"]]})
+        with SAVE_STAGE_SECONDS.time(stage="insert"):
+            result = await db.scalars(
+                insert(File).returning(File, sort_by_parameter_order=True),
+                rows,
+            )
+        file_records = list(result.all())
+        for file_record, record in zip(file_records, records):
+            set_committed_value(file_record, "topic", record["topic"])
+        return file_records
+
+    @staticmethod
+    async def get_file(db: AsyncSession, file_id: int) -> File | None:
+        """Get a file by ID."""
+        result = await db.execute(select(File).where(File.id == file_id))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_pages(
+        db: AsyncSession,
+        file_id: int,
+        kind: str,
+        start: int,
+        stop: int,
+    ) -> list[FilePage]:
+        """
+        Get a range of a file's pages or chapters.
+
+        Reads only the requested rows, via the (file_id, kind, page_index)
+        primary key.
+
+        Args:
+            db: Database session
+            file_id: File ID
+            kind: PAGE or CHAPTER
+            start: First index (inclusive)
+            stop: Last index (exclusive)
+
+        Returns:
+            Pages or chapters in index order
+        """
+        result = await db.execute(
+            select(FilePage)
+            .where(
+                FilePage.file_id == file_id,
+                FilePage.kind == kind,
+                FilePage.page_index >= start,
+                FilePage.page_index < stop,
+            )
+            .order_by(FilePage.page_index)
         )
-        db.add(db_file)
-        await db.flush()
-        await db.refresh(db_file)
-        return db_file
+        return list(result.scalars().all())
 
     @staticmethod
     async def get_file_by_topic(db: AsyncSession, topic: str) -> File | None:
-        """Get a file by its topic."""
-        result = await db.execute(select(File).where(File.topic == topic))
-        return result.scalar_one_or_none()
+        """
+        Get the most recently uploaded file for a topic.
+
+        Served from topic_cache; the entry is invalidated when a file for the
+        topic is committed. The result is a shared, detached snapshot: its
+        extraction fields may lag by up to METADATA_CACHE_TTL (use get_file
+        for the current state) and it must be merged into a session before
+        being modified.
+        """
+
+        async def load() -> File | None:
+            result = await db.execute(
+                select(File)
+                .join(Topic, Topic.id == File.topic_id)
+                .where(Topic.name == topic)
+                .order_by(File.id.desc())
+                .limit(1)
+            )
+            file_record = result.scalar_one_or_none()
+            return None if file_record is None else detached_copy(file_record)
+
+        return await topic_cache.get_or_load(topic, load)
 
     @staticmethod
     def get_file_extension(filename: str) -> str:
         """Extract file extension from filename."""
         return Path(filename).suffix.lstrip(".").lower()
+
+    @staticmethod
+    def get_content_extension(filename: str) -> str:
+        """Extract the content extension, skipping a compression suffix (e.g. 'book.txt.gz' -> 'txt')."""
+        extension = FileService.get_file_extension(filename)
+        if extension in COMPRESSION_SUFFIXES:
+            return FileService.get_file_extension(Path(filename).stem)
+        return extension
+
+
+def _sha256_file(path: Path, chunk_size: int, *consumers: Any) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+            for consumer in consumers:
+                consumer.update(chunk)
+    return digest.hexdigest()
+
+
+async def _coalesce(chunks: AsyncIterator[bytes], chunk_size: int) -> AsyncIterator[bytes]:
+    """Join small chunks into chunks of chunk_size bytes (the last may be shorter)."""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _prepend(first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    if first:
+        yield first
+    async for chunk in rest:
+        yield chunk
+
+
+async def _limit_size(chunks: AsyncIterator[bytes], max_size: int) -> AsyncIterator[bytes]:
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        if total > max_size:
+            raise UploadTooLargeError(max_size)
+        yield chunk
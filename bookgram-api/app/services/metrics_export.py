@@ -0,0 +1,72 @@
+"""Serving the metrics registry, across worker processes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.metrics import MetricsRegistry, registry
+from app.services.storage import storage_io
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsExporter:
+    """
+    Render the registry for /metrics.
+
+    Without a snapshot directory only this process's metrics are rendered.
+    With one, this process writes its snapshot there every interval seconds
+    (and on shutdown) and a scrape renders the sum of every worker's
+    snapshot, with this worker's own values taken live from memory.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: Path | None, interval: float) -> None:
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start writing snapshots (no-op without a snapshot directory)."""
+        if self.directory is not None and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the snapshot task and write a final snapshot."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.write_snapshot()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.write_snapshot()
+            except OSError:
+                logger.exception("Could not write the metrics snapshot")
+            await asyncio.sleep(self.interval)
+
+    async def write_snapshot(self) -> None:
+        """Write this process's snapshot to the shared directory."""
+        if self.directory is not None:
+            await storage_io.run(self.registry.write_snapshot, self.directory)
+
+    async def render(self) -> str:
+        """Metrics in the Prometheus text format (all workers if configured)."""
+        if self.directory is None:
+            return self.registry.render()
+        return await storage_io.run(self.registry.render_all, self.directory)
+
+
+# Global metrics exporter, started by the application lifespan
+metrics_exporter = MetricsExporter(
+    registry, settings.METRICS_MULTIPROC_DIR, settings.METRICS_SNAPSHOT_INTERVAL
+)
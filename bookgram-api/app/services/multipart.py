@@ -0,0 +1,164 @@
+"""Streaming multipart/form-data parsing: parts are handed over as their bytes arrive."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.services.exceptions import InvalidFormError
+
+
+class FormPart:
+    """One part of a multipart body: a form field or a file."""
+
+    def __init__(
+        self, stream: MultipartStream, name: str, filename: str | None, content_type: str | None
+    ) -> None:
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+        self.finished = False
+        self._stream = stream
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """The part's data, chunk by chunk as it is received."""
+        while not self.finished:
+            kind, value = await self._stream.next_event()
+            if kind == "data":
+                yield value
+            elif kind == "part_end":
+                self.finished = True
+            else:
+                raise InvalidFormError("Malformed multipart body")
+
+    async def read(self, max_size: int) -> bytes:
+        """The whole part's data, refused above max_size bytes."""
+        data = bytearray()
+        async for chunk in self.chunks():
+            data += chunk
+            if len(data) > max_size:
+                raise InvalidFormError(f"Form field '{self.name}' exceeds {max_size} bytes")
+        return bytes(data)
+
+    async def text(self, max_size: int) -> str:
+        """The part's data as UTF-8 text."""
+        try:
+            return (await self.read(max_size)).decode()
+        except UnicodeDecodeError as e:
+            raise InvalidFormError(f"Form field '{self.name}' is not UTF-8 text") from e
+
+
+class MultipartStream:
+    """
+    Parse a multipart/form-data body while it streams in.
+
+    Unlike Request.form(), nothing is buffered or spooled: parts() yields
+    each part as soon as its headers are parsed, and the part's chunks()
+    are read from the body on demand. A part must be consumed before the
+    next one is returned; whatever is left of it is skipped.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], content_type: str | None) -> None:
+        media_type, options = parse_options_header(content_type or "")
+        boundary = options.get(b"boundary")
+        if media_type != b"multipart/form-data" or not boundary:
+            raise InvalidFormError("Expected a multipart/form-data body")
+
+        self._source = chunks
+        self._events: deque[tuple[str, Any]] = deque()
+        self._headers: dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._ended = False
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_end": self._on_end,
+            },
+        )
+
+    async def parts(self) -> AsyncIterator[FormPart]:
+        """The body's parts, in order."""
+        while True:
+            kind, value = await self.next_event()
+            if kind == "end":
+                return
+            if kind != "headers":
+                raise InvalidFormError("Malformed multipart body")
+            part = self._part(value)
+            yield part
+            async for _ in part.chunks():
+                pass
+
+    async def next_event(self) -> tuple[str, Any]:
+        """The next parser event, reading more of the body when none is pending."""
+        while not self._events:
+            if self._ended:
+                raise InvalidFormError("Multipart body is truncated")
+            try:
+                chunk = await self._source.__anext__()
+            except StopAsyncIteration:
+                chunk = None
+            try:
+                if chunk is None:
+                    self._parser.finalize()
+                    if not self._events:
+                        raise InvalidFormError("Multipart body is truncated")
+                else:
+                    self._parser.write(chunk)
+            except MultipartParseError as e:
+                raise InvalidFormError(f"Malformed multipart body: {e}") from e
+        return self._events.popleft()
+
+    def _part(self, headers: dict[bytes, bytes]) -> FormPart:
+        disposition, options = parse_options_header(headers.get(b"content-disposition", b""))
+        if disposition != b"form-data" or b"name" not in options:
+            raise InvalidFormError("Multipart part without a form-data name")
+        filename = options.get(b"filename")
+        content_type = headers.get(b"content-type")
+        return FormPart(
+            self,
+            name=options[b"name"].decode("latin-1"),
+            filename=filename.decode("latin-1") if filename is not None else None,
+            content_type=content_type.decode("latin-1") if content_type is not None else None,
+        )
+
+    # Parser callbacks: data arguments are views of the fed chunk, so they are copied
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        self._events.append(("headers", self._headers))
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        self._events.append(("data", data[start:end]))
+
+    def _on_part_end(self) -> None:
+        self._events.append(("part_end", None))
+
+    def _on_end(self) -> None:
+        self._ended = True
+        self._events.append(("end", None))
@@ -0,0 +1,176 @@
+"""Outbox service: jobs recorded with the change that needs them, run later."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.outbox import JOB_DEAD, JOB_PENDING, JOB_PROCESSING, OutboxJob
+from app.db.session import utcnow
+
+# Dead jobs listed by stats()
+DEAD_JOBS_LISTED = 20
+
+
+class OutboxService:
+    """Service for outbox jobs: enqueueing, claiming and recording outcomes."""
+
+    @staticmethod
+    async def enqueue(db: AsyncSession, kind: str, payloads: list[dict[str, Any]]) -> list[int]:
+        """
+        Add jobs in the caller's transaction with a single multi-row INSERT.
+
+        The jobs become visible to workers when the transaction commits, and
+        are discarded with it on rollback.
+
+        Args:
+            db: Database session
+            kind: Job kind (selects the handler)
+            payloads: One JSON-serializable payload per job
+
+        Returns:
+            IDs of the new jobs, in the same order as payloads
+        """
+        if not payloads:
+            return []
+        result = await db.scalars(
+            insert(OutboxJob).returning(OutboxJob.id, sort_by_parameter_order=True),
+            [{"kind": kind, "payload": payload} for payload in payloads],
+        )
+        return list(result.all())
+
+    @staticmethod
+    async def claim(
+        db: AsyncSession, limit: int, job_ids: list[int] | None = None
+    ) -> list[OutboxJob]:
+        """
+        Lease up to limit due jobs to the caller and count their attempt.
+
+        Due jobs are pending ones whose retry time has come, and processing
+        ones whose lease expired. Rows locked by a concurrent claim are
+        skipped (FOR UPDATE SKIP LOCKED), so workers never wait for each
+        other or take the same job. Commit to release the row locks.
+
+        Args:
+            db: Database session
+            limit: Maximum number of jobs
+            job_ids: Only consider these jobs
+
+        Returns:
+            The claimed jobs, now processing until OUTBOX_LEASE seconds from now
+        """
+        now = utcnow()
+        due = select(OutboxJob.id).where(
+            or_(
+                and_(OutboxJob.status == JOB_PENDING, OutboxJob.available_at <= now),
+                and_(OutboxJob.status == JOB_PROCESSING, OutboxJob.locked_until < now),
+            )
+        )
+        if job_ids is not None:
+            due = due.where(OutboxJob.id.in_(job_ids))
+        due = (
+            due.order_by(OutboxJob.available_at, OutboxJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.scalars(
+            update(OutboxJob)
+            .where(OutboxJob.id.in_(due.scalar_subquery()))
+            .values(
+                status=JOB_PROCESSING,
+                attempts=OutboxJob.attempts + 1,
+                locked_until=now + timedelta(seconds=settings.OUTBOX_LEASE),
+            )
+            .returning(OutboxJob)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.all())
+
+    @staticmethod
+    async def complete(db: AsyncSession, job_id: int) -> None:
+        """Delete a finished job."""
+        await db.execute(delete(OutboxJob).where(OutboxJob.id == job_id))
+
+    @staticmethod
+    async def fail(db: AsyncSession, job: OutboxJob, error: str, permanent: bool) -> bool:
+        """
+        Record a failed attempt of a claimed job.
+
+        The job is retried after a backoff, unless the error is permanent or
+        OUTBOX_MAX_ATTEMPTS is spent: then it is dead-lettered (kept with its
+        error and never claimed again).
+
+        Returns:
+            True if the job was dead-lettered
+        """
+        dead = permanent or job.attempts >= settings.OUTBOX_MAX_ATTEMPTS
+        values: dict[str, Any] = {
+            "status": JOB_DEAD if dead else JOB_PENDING,
+            "locked_until": None,
+            "last_error": error,
+        }
+        if not dead:
+            values["available_at"] = utcnow() + timedelta(
+                seconds=OutboxService.retry_delay(job.attempts)
+            )
+        await db.execute(update(OutboxJob).where(OutboxJob.id == job.id).values(**values))
+        return dead
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Seconds before retrying a job that failed its attempts-th attempt."""
+        return min(
+            settings.OUTBOX_RETRY_DELAY * 2 ** max(attempts - 1, 0),
+            settings.OUTBOX_MAX_RETRY_DELAY,
+        )
+
+    @staticmethod
+    async def stats(db: AsyncSession) -> dict[str, Any]:
+        """
+        Job counts by status and kind, the oldest due job, and recent dead jobs.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Report for the internal outbox endpoint
+        """
+        counts = await db.execute(
+            select(OutboxJob.status, OutboxJob.kind, func.count())
+            .group_by(OutboxJob.status, OutboxJob.kind)
+            .order_by(OutboxJob.status, OutboxJob.kind)
+        )
+        oldest_due = await db.scalar(
+            select(func.min(OutboxJob.available_at)).where(
+                OutboxJob.status == JOB_PENDING, OutboxJob.available_at <= utcnow()
+            )
+        )
+        dead = await db.scalars(
+            select(OutboxJob)
+            .where(OutboxJob.status == JOB_DEAD)
+            .order_by(OutboxJob.updated_at.desc())
+            .limit(DEAD_JOBS_LISTED)
+        )
+        return {
+            "jobs": [
+                {"status": status, "kind": kind, "count": count} for status, kind, count in counts
+            ],
+            "oldest_due_seconds": (
+                None if oldest_due is None else (utcnow() - oldest_due).total_seconds()
+            ),
+            "dead": [
+                {
+                    "id": job.id,
+                    "kind": job.kind,
+                    "payload": job.payload,
+                    "attempts": job.attempts,
+                    "error": job.last_error,
+                    "failed_at": job.updated_at.isoformat(),
+                }
+                for job in dead
+            ],
+        }
@@ -0,0 +1,207 @@
+"""Running outbox jobs: the worker loop, also run in the API process with OUTBOX_INLINE."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fastapi import BackgroundTasks
+
+from app.core.config import settings
+from app.core.metrics import OUTBOX_JOB_SECONDS, OUTBOX_JOBS_TOTAL
+from app.db.models.outbox import OutboxJob
+from app.db.session import AsyncSessionLocal
+from app.services.exceptions import PermanentJobError
+from app.services.extraction_service import EXTRACT_FILE, ExtractionService
+from app.services.outbox_service import OutboxService
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any], int], Awaitable[None]]
+
+# Handler of every job kind, called with the job's payload and attempt number
+# (from 1); a handler raises PermanentJobError for failures that retrying
+# cannot fix and any other exception to be retried
+JOB_HANDLERS: dict[str, JobHandler] = {
+    EXTRACT_FILE: ExtractionService.process,
+}
+
+COMPLETED = "completed"
+RETRY = "retry"
+DEAD = "dead"
+
+
+async def execute(job: OutboxJob, handlers: dict[str, JobHandler] = JOB_HANDLERS) -> str:
+    """
+    Run a claimed job and record its outcome.
+
+    Returns:
+        COMPLETED, RETRY (scheduled again after a backoff) or DEAD
+    """
+    handler = handlers.get(job.kind)
+    error = None
+    permanent = False
+    started = time.perf_counter()
+    if handler is None:
+        error, permanent = f"No handler for job kind '{job.kind}'", True
+    else:
+        try:
+            await handler(job.payload, job.attempts)
+        except PermanentJobError as e:
+            error, permanent = str(e), True
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    OUTBOX_JOB_SECONDS.observe(time.perf_counter() - started, kind=job.kind)
+
+    async with AsyncSessionLocal() as db:
+        if error is None:
+            await OutboxService.complete(db, job.id)
+            outcome = COMPLETED
+        else:
+            dead = await OutboxService.fail(db, job, error, permanent=permanent)
+            outcome = DEAD if dead else RETRY
+        await db.commit()
+
+    OUTBOX_JOBS_TOTAL.inc(kind=job.kind, outcome=outcome)
+    if outcome == DEAD:
+        logger.warning("Outbox job %s (%s) dead-lettered: %s", job.id, job.kind, error)
+    return outcome
+
+
+class OutboxWorker:
+    """
+    Claim due outbox jobs in batches and run up to concurrency of them at once.
+
+    Any number of workers can run side by side: claims skip rows locked by
+    other workers, and a job whose worker dies is claimed again once its
+    lease (OUTBOX_LEASE) expires.
+    """
+
+    def __init__(
+        self,
+        handlers: dict[str, JobHandler],
+        concurrency: int,
+        batch_size: int,
+        poll_interval: float,
+    ) -> None:
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._running: set[asyncio.Task[str]] = set()
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Run jobs on a background task until shutdown() (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self) -> None:
+        """Stop claiming jobs; run() returns once the jobs in flight finish."""
+        self._stopping.set()
+
+    async def shutdown(self, timeout: float) -> None:
+        """
+        Stop the background task, waiting up to timeout seconds for the jobs in flight.
+
+        Jobs still running are cancelled and claimed again once their lease expires.
+        """
+        if self._task is None:
+            return
+        self.stop()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Outbox jobs still running at shutdown were cancelled")
+        self._task = None
+
+    async def run(self) -> None:
+        """Run jobs until stop() is called."""
+        while not self._stopping.is_set():
+            limit = min(self.concurrency - len(self._running), self.batch_size)
+            jobs = await self._claim(limit) if limit > 0 else []
+            for job in jobs:
+                task = asyncio.create_task(self._execute(job))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+            # A full claim means more jobs may be due: claim again as soon as there is room
+            if len(jobs) < limit or len(self._running) >= self.concurrency:
+                await self._wait()
+        if self._running:
+            await asyncio.gather(*self._running)
+
+    async def run_due(self) -> int:
+        """Run jobs until none is due; returns how many were run."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_one(job: OutboxJob) -> None:
+            async with semaphore:
+                await self._execute(job)
+
+        total = 0
+        while jobs := await self._claim(self.batch_size):
+            await asyncio.gather(*(run_one(job) for job in jobs))
+            total += len(jobs)
+        return total
+
+    async def _claim(self, limit: int) -> list[OutboxJob]:
+        try:
+            async with AsyncSessionLocal() as db:
+                jobs = await OutboxService.claim(db, limit)
+                await db.commit()
+        except Exception:
+            logger.exception("Could not claim outbox jobs")
+            return []
+        return jobs
+
+    async def _execute(self, job: OutboxJob) -> str:
+        try:
+            return await execute(job, self.handlers)
+        except Exception:
+            # The outcome could not be recorded; the job is claimed again when its lease expires
+            logger.exception("Outbox job %s (%s) could not be run", job.id, job.kind)
+            return RETRY
+
+    async def _wait(self) -> None:
+        """Wait for stop(), a free slot when full, or the poll interval otherwise."""
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        try:
+            if len(self._running) >= self.concurrency:
+                await asyncio.wait({stopping, *self._running}, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.wait({stopping}, timeout=self.poll_interval)
+        finally:
+            stopping.cancel()
+
+
+def dispatch(background_tasks: BackgroundTasks, job_ids: list[int]) -> None:
+    """
+    Run committed jobs in this process after the response, with OUTBOX_INLINE.
+
+    This only saves the poll interval: the process's poll loop (or a worker)
+    runs the retries and any job this misses. Without OUTBOX_INLINE, the
+    jobs are left to the worker.
+    """
+    if settings.OUTBOX_INLINE and job_ids:
+        background_tasks.add_task(run_inline, job_ids)
+
+
+async def run_inline(job_ids: list[int]) -> None:
+    """Make the first attempt at jobs here, unless a worker has claimed them already."""
+    await asyncio.gather(*(_run_inline(job_id) for job_id in job_ids))
+
+
+async def _run_inline(job_id: int) -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            jobs = await OutboxService.claim(db, 1, job_ids=[job_id])
+            await db.commit()
+        # None when claimed by a worker first
+        for job in jobs:
+            await execute(job)
+    except Exception:
+        logger.exception("Outbox job %s could not be run", job_id)
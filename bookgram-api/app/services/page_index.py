@@ -0,0 +1,283 @@
+"""Byte-offset page/chapter index for stored text files."""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import NamedTuple
+
+from app.db.models.file_page import PAGE
+
+# Chapter headings: Markdown H1/H2, or plain-text "Chapter 1", "PART II", "Prologue" lines
+MARKDOWN_HEADING = re.compile(rb"^#{1,2}[ \t]+\S[^\n]*$", re.MULTILINE)
+TEXT_HEADING = re.compile(
+    rb"^[ \t]*(?:chapter|part|book|prologue|epilogue|introduction)\b[^\n]{0,80}$",
+    re.MULTILINE | re.IGNORECASE,
+)
+
+# Lines longer than this cannot be headings, so they are not carried across chunks
+_MAX_HEADING_LINE = 4096
+
+# Index file: header, then page boundaries, then chapter boundaries (uint64 LE)
+INDEX_SUFFIX = ".idx"
+_MAGIC = b"BGPX"
+_VERSION = 1
+_HEADER = struct.Struct("<4sB3xIQQ4x")
+_OFFSET = struct.Struct("<QQ")
+
+
+class Span(NamedTuple):
+    """Byte span of one page or chapter, and how many there are."""
+
+    start: int
+    end: int
+    total: int
+
+
+def heading_pattern(file_format: str) -> re.Pattern[bytes]:
+    """Chapter heading pattern for a text format."""
+    return MARKDOWN_HEADING if file_format == "md" else TEXT_HEADING
+
+
+@dataclass(frozen=True)
+class PageIndex:
+    """
+    Page and chapter boundaries of a text file.
+
+    Each array holds n + 1 byte offsets for n items: item i spans
+    ``[offsets[i], offsets[i + 1])``. Pages are contiguous and cover the file.
+    """
+
+    page_size: int
+    pages: array
+    chapters: array
+
+    @property
+    def page_count(self) -> int:
+        return max(len(self.pages) - 1, 0)
+
+    @property
+    def chapter_count(self) -> int:
+        return max(len(self.chapters) - 1, 0)
+
+    def spans(self, kind: str) -> list[tuple[int, int]]:
+        """(start, end) byte spans of every page or chapter."""
+        offsets = self.pages if kind == PAGE else self.chapters
+        return list(zip(offsets, offsets[1:]))
+
+    def write(self, path: Path) -> None:
+        """Write the index atomically (temporary file, then rename)."""
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                _HEADER.pack(_MAGIC, _VERSION, self.page_size, len(self.pages), len(self.chapters))
+            )
+            for offsets in (self.pages, self.chapters):
+                if sys.byteorder == "big":  # pragma: no cover - little-endian on disk
+                    offsets = array("Q", offsets)
+                    offsets.byteswap()
+                offsets.tofile(f)
+        os.replace(tmp_name, path)
+
+
+class PageIndexBuilder:
+    """
+    Build a PageIndex from a stream of chunks, in bounded memory.
+
+    Pages are at most page_size bytes and break at the last paragraph break,
+    else line break, else space in the second half of the window, so words
+    and paragraphs stay whole where possible; a hard cut never splits a
+    UTF-8 character, so a page too small for one holds that whole
+    character. Chapters start at heading lines.
+    """
+
+    def __init__(self, page_size: int, heading: re.Pattern[bytes] | None = None) -> None:
+        self.page_size = page_size
+        self.heading = heading
+        self._pages = array("Q", [0])
+        self._chapters = array("Q")
+        # Bytes of the current, unfinished page
+        self._buffer = bytearray()
+        self._page_start = 0
+        # Unfinished last line (for heading detection) and its absolute offset
+        self._line = b""
+        self._line_start = 0
+        self._position = 0
+        self._front_matter = False
+
+    def update(self, chunk: bytes) -> None:
+        """Consume the next chunk of the file (like a hashlib digest)."""
+        if self.heading is not None:
+            self._scan_headings(chunk)
+        self._position += len(chunk)
+
+        self._buffer += chunk
+        while len(self._buffer) > self.page_size:
+            cut = self._find_cut()
+            if not cut:
+                break
+            del self._buffer[:cut]
+            self._page_start += cut
+            self._pages.append(self._page_start)
+
+    def finish(self) -> PageIndex:
+        """Close the last page and chapter and return the index."""
+        if self.heading is not None and self._line:
+            self._scan_lines(self._line + b"\n", self._line_start)
+            self._line = b""
+        if self._buffer:
+            self._pages.append(self._position)
+            self._buffer.clear()
+
+        chapters = self._chapters
+        if self._position and (not chapters or self._front_matter):
+            chapters = array("Q", [0]) + chapters
+        if chapters:
+            chapters.append(self._position)
+        return PageIndex(page_size=self.page_size, pages=self._pages, chapters=chapters)
+
+    def _find_cut(self) -> int:
+        """Length of the next page, or 0 until the rest of its last character arrives."""
+        floor = self.page_size // 2
+        for separator in (b"\n\n", b"\n", b" "):
+            cut = self._buffer.rfind(separator, floor, self.page_size)
+            if cut != -1:
+                return cut + len(separator)
+        # Hard cut, moved back off UTF-8 continuation bytes
+        cut = self.page_size
+        while cut > floor and self._buffer[cut] & 0xC0 == 0x80:
+            cut -= 1
+        if cut and self._buffer[cut] & 0xC0 != 0x80:
+            return cut
+        # Page smaller than the character: cut after it instead
+        cut = self.page_size
+        while cut < len(self._buffer) and self._buffer[cut] & 0xC0 == 0x80:
+            cut += 1
+        return cut if cut < len(self._buffer) else 0
+
+    def _scan_headings(self, chunk: bytes) -> None:
+        last_newline = chunk.rfind(b"\n")
+        if last_newline == -1:
+            self._line += chunk
+        else:
+            self._scan_lines(self._line + chunk[: last_newline + 1], self._line_start)
+            self._line = chunk[last_newline + 1 :]
+            self._line_start = self._position + last_newline + 1
+        if len(self._line) > _MAX_HEADING_LINE:
+            if not self._chapters and self._line.strip():
+                self._front_matter = True
+            self._line = b""
+            self._line_start = self._position + len(chunk)
+
+    def _scan_lines(self, lines: bytes, offset: int) -> None:
+        """Record heading lines within complete lines starting at offset."""
+        assert self.heading is not None
+        for match in self.heading.finditer(lines):
+            if not self._chapters and lines[: match.start()].strip():
+                self._front_matter = True
+            self._chapters.append(offset + match.start())
+        if not self._chapters and lines.strip():
+            self._front_matter = True
+
+
+def build_page_index(
+    content: bytes, page_size: int, heading: re.Pattern[bytes] | None = None
+) -> PageIndex:
+    """Build the index of content held in memory."""
+    builder = PageIndexBuilder(page_size, heading)
+    builder.update(content)
+    return builder.finish()
+
+
+def index_path(blob_path: Path) -> Path:
+    """Path of the index stored next to a blob."""
+    return blob_path.with_name(blob_path.name + INDEX_SUFFIX)
+
+
+def lookup(path: Path, kind: str, index: int, page_size: int) -> Span | None:
+    """
+    Read the byte span of one page or chapter from an index file.
+
+    Reads only the header and two offsets, whatever the size of the book.
+
+    Args:
+        path: Index file
+        kind: PAGE or CHAPTER
+        index: Page or chapter number (0-based)
+        page_size: Page size the caller expects
+
+    Returns:
+        Byte span, or None if the index is missing or was built with a
+        different page size
+
+    Raises:
+        IndexError: If there is no such page or chapter
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        header = _read_header(fd, page_size)
+        if header is None:
+            return None
+        page_offsets, chapter_offsets = header
+        offsets, first = (page_offsets, 0) if kind == PAGE else (chapter_offsets, page_offsets)
+        total = max(offsets - 1, 0)
+        if not 0 <= index < total:
+            raise IndexError(f"No {kind} {index}")
+        start, end = _OFFSET.unpack(os.pread(fd, _OFFSET.size, _HEADER.size + (first + index) * 8))
+        return Span(start, end, total)
+    finally:
+        os.close(fd)
+
+
+def store_index(blob_path: Path, index: PageIndex) -> bool:
+    """
+    Write a blob's index unless an index with the same page size exists.
+
+    Returns:
+        Whether the index was written
+    """
+    path = index_path(blob_path)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        pass
+    else:
+        try:
+            if _read_header(fd, index.page_size) is not None:
+                return False
+        finally:
+            os.close(fd)
+    index.write(path)
+    return True
+
+
+def read_span(path: Path, start: int, end: int) -> bytes:
+    """
+    Read a byte span of a file through a memory map.
+
+    Only the pages of the file backing the span are touched; the slice is
+    the single copy, made straight into the returned body.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return mapped[start:end]
+
+
+def _read_header(fd: int, page_size: int) -> tuple[int, int] | None:
+    """Page and chapter offset counts, or None if the header is not for page_size."""
+    header = os.pread(fd, _HEADER.size, 0)
+    if len(header) != _HEADER.size:
+        return None
+    magic, version, built_page_size, page_offsets, chapter_offsets = _HEADER.unpack(header)
+    if magic != _MAGIC or version != _VERSION or built_page_size != page_size:
+        return None
+    return page_offsets, chapter_offsets
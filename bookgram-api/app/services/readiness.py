@@ -0,0 +1,209 @@
+"""Background readiness checks (database and upload disk) for the /readyz probe."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.db import engine
+from app.db.session import utcnow
+from app.services.file_service import FileService
+from app.services.storage import storage_io
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """Outcome of one background check."""
+
+    ok: bool
+    checked_at: datetime
+    monotonic: float
+    latency_ms: float
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class DiskStatus:
+    """Free space of the filesystem holding the upload directory."""
+
+    path: str
+    free_bytes: int
+    total_bytes: int
+
+
+class ReadinessMonitor:
+    """
+    Refresh the database and disk status on one background task.
+
+    The database is probed with SELECT 1 every interval seconds over a
+    dedicated single-connection engine, so probe traffic never takes a
+    connection from the request pool, however often /readyz is polled and
+    however saturated the pool is. /readyz only reads the last result.
+    """
+
+    def __init__(self, interval: float, timeout: float, min_free_disk: int) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.min_free_disk = min_free_disk
+        self.database: CheckResult | None = None
+        self.disk: DiskStatus | None = None
+        self.disk_error: str | None = None
+        self._engine: AsyncEngine | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def probe_engine(self) -> AsyncEngine:
+        """Engine used for database checks (one connection, created lazily)."""
+        if self._engine is None:
+            self._engine = create_async_engine(
+                settings.database_url_str,
+                pool_size=1,
+                max_overflow=0,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_pre_ping=False,
+            )
+        return self._engine
+
+    def start(self) -> None:
+        """Start the background checks (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background checks and close the probe connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self) -> None:
+        """Run all checks once and store their results."""
+        await asyncio.gather(self.check_database(), self.check_disk())
+
+    async def check_database(self) -> None:
+        """Run SELECT 1 with a timeout and record the outcome."""
+        started = time.monotonic()
+        error = None
+        try:
+            await asyncio.wait_for(self._select_one(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            error = f"no response within {self.timeout:g}s"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        if error is not None and (self.database is None or self.database.ok):
+            logger.warning("Database readiness check failed: %s", error)
+        self.database = CheckResult(
+            ok=error is None,
+            checked_at=utcnow(),
+            monotonic=started,
+            latency_ms=round((time.monotonic() - started) * 1000, 2),
+            error=error,
+        )
+
+    async def _select_one(self) -> None:
+        async with self.probe_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def check_disk(self, path: Path | None = None) -> None:
+        """Record the free space of the upload directory's filesystem."""
+        path = path or FileService.UPLOAD_DIR
+        try:
+            await storage_io.mkdir(path)
+            usage = await storage_io.run(shutil.disk_usage, path)
+        except OSError as e:
+            self.disk, self.disk_error = None, f"{type(e).__name__}: {e}"
+            return
+        self.disk = DiskStatus(str(path), usage.free, usage.total)
+        self.disk_error = None
+
+    def status(self) -> dict[str, Any]:
+        """
+        The last check results, current pool saturation and overall readiness.
+
+        Not ready while no database check has succeeded recently (within
+        three intervals) or the upload disk has less than min_free_disk
+        bytes free. Pool saturation is reported but does not fail readiness:
+        taking a busy instance out of rotation would only move its load.
+        """
+        database_ok = (
+            self.database is not None
+            and self.database.ok
+            and time.monotonic() - self.database.monotonic <= 3 * self.interval + self.timeout
+        )
+        disk_ok = self.disk is not None and self.disk.free_bytes >= self.min_free_disk
+
+        return {
+            "status": "ready" if database_ok and disk_ok else "not_ready",
+            "database": self._database_status(database_ok),
+            "pool": pool_saturation(),
+            "disk": self._disk_status(disk_ok),
+        }
+
+    def _database_status(self, ok: bool) -> dict[str, Any]:
+        if self.database is None:
+            return {"status": "unknown"}
+        return {
+            "status": "healthy" if ok else "unhealthy",
+            "checked_at": self.database.checked_at.isoformat(),
+            "latency_ms": self.database.latency_ms,
+            "error": self.database.error or (None if ok else "last successful check is too old"),
+        }
+
+    def _disk_status(self, ok: bool) -> dict[str, Any]:
+        if self.disk is None:
+            return {
+                "status": "unknown" if self.disk_error is None else "unhealthy",
+                "error": self.disk_error,
+            }
+        return {
+            "status": "healthy" if ok else "low_space",
+            "path": self.disk.path,
+            "free_bytes": self.disk.free_bytes,
+            "total_bytes": self.disk.total_bytes,
+            "min_free_bytes": self.min_free_disk,
+        }
+
+
+def pool_saturation() -> dict[str, Any]:
+    """Connections checked out of the request pool, against its capacity."""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+    capacity = pool.size() + pool._max_overflow
+    return {
+        "checked_out": pool.checkedout(),
+        "capacity": capacity,
+        "saturation": round(pool.checkedout() / capacity, 3) if capacity else None,
+    }
+
+
+# Global readiness monitor, started by the application lifespan
+readiness_monitor = ReadinessMonitor(
+    interval=settings.READINESS_CHECK_INTERVAL,
+    timeout=settings.READINESS_CHECK_TIMEOUT,
+    min_free_disk=settings.READINESS_MIN_FREE_DISK,
+)
@@ -0,0 +1,96 @@
+"""Full-text search over extracted pages."""
+
+from __future__ import annotations
+
+from sqlalchemy import Row, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.file import File
+from app.db.models.file_page import PAGE, SEARCH_CONFIG, FilePage
+from app.db.models.topic import Topic
+
+# ts_headline options: up to two short fragments around the matches
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10"
+
+
+class SearchService:
+    """Service for full-text search."""
+
+    @staticmethod
+    async def search_pages(
+        db: AsyncSession,
+        query: str,
+        offset: int = 0,
+        limit: int = 20,
+        max_candidates: int | None = None,
+    ) -> list[Row]:
+        """
+        Search pages by content, best match first.
+
+        The query uses web search syntax ("quoted phrases", or, -excluded).
+        Matching pages come from the GIN index on file_pages.search_vector;
+        at most max_candidates of them are ranked (ts_rank_cd, cover density),
+        so a very common term costs the same as a rare one. Results are
+        therefore approximate when more pages match: the candidates are the
+        matches in the newest files (highest file IDs), a deterministic set,
+        so pages of results stay consistent between requests. Snippets are
+        built only for the returned page, never for every match.
+
+        Args:
+            db: Database session
+            query: Search query
+            offset: Number of results to skip
+            limit: Maximum number of results
+            max_candidates: Matches ranked per query (defaults to SEARCH_MAX_CANDIDATES)
+
+        Returns:
+            Rows with file_id, topic, page_index, rank and snippet
+        """
+        max_candidates = max_candidates or settings.SEARCH_MAX_CANDIDATES
+        config = cast(literal(SEARCH_CONFIG), REGCONFIG)
+        tsquery = func.websearch_to_tsquery(config, query)
+
+        # Rank a bounded set of matches (rank is computed for these rows only)
+        candidates = (
+            select(
+                FilePage.file_id,
+                FilePage.page_index,
+                func.ts_rank_cd(FilePage.search_vector, tsquery).label("rank"),
+            )
+            # Only pages have a search vector, so this matches pages only
+            .where(FilePage.search_vector.bool_op("@@")(tsquery))
+            # A stable candidate set (top-N sort on the key, no ranking needed)
+            .order_by(FilePage.file_id.desc(), FilePage.page_index)
+            .limit(max_candidates)
+            .subquery("candidates")
+        )
+        hits = (
+            select(candidates)
+            .order_by(candidates.c.rank.desc(), candidates.c.file_id, candidates.c.page_index)
+            .offset(offset)
+            .limit(limit)
+            .cte("hits")
+        )
+
+        # Fetch text and highlight only the page of results
+        result = await db.execute(
+            select(
+                hits.c.file_id,
+                Topic.name.label("topic"),
+                hits.c.page_index,
+                hits.c.rank,
+                func.ts_headline(config, FilePage.text, tsquery, HEADLINE_OPTIONS).label("snippet"),
+            )
+            .join(
+                FilePage,
+                (FilePage.file_id == hits.c.file_id)
+                & (FilePage.kind == PAGE)
+                & (FilePage.page_index == hits.c.page_index),
+            )
+            .join(File, File.id == hits.c.file_id)
+            .join(Topic, Topic.id == File.topic_id)
+            .order_by(hits.c.rank.desc(), hits.c.file_id, hits.c.page_index)
+        )
+        return list(result.all())
@@ -0,0 +1,112 @@
+"""Non-blocking storage I/O on a bounded thread pool."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import IO, Any, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class StorageIO:
+    """
+    Run blocking filesystem calls off the event loop.
+
+    Every call is dispatched to a dedicated thread pool whose size caps the
+    number of concurrent disk operations, so a slow disk delays uploads
+    without stalling unrelated requests on the same worker.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool used for storage calls (created lazily)."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="storage-io",
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking callable on the storage thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def mkdir(self, path: Path) -> None:
+        """Create a directory (and parents) if it does not exist."""
+        await self.run(path.mkdir, parents=True, exist_ok=True)
+
+    async def write(self, f: IO[bytes], data: bytes, *digests: Any) -> None:
+        """
+        Write data to an open binary file.
+
+        Any hashlib digests (or other objects with an update method) are
+        updated in the same thread hop, so checksumming or indexing large
+        chunks does not run on the event loop either.
+        """
+        await self.run(_write, f, data, digests)
+
+    async def fsync(self, f: IO[bytes]) -> None:
+        """Flush Python buffers and fsync an open file to stable storage."""
+        await self.run(_flush_and_fsync, f)
+
+    async def fsync_path(self, path: Path) -> None:
+        """Fsync a closed file by path."""
+        await self.run(_fsync_path, path)
+
+    async def replace(self, src: Path, dst: Path) -> None:
+        """Atomically rename src to dst and persist the directory entry."""
+        await self.run(_replace_durably, src, dst)
+
+    async def unlink(self, path: Path) -> None:
+        """Remove a file, ignoring it if it is already gone."""
+        await self.run(path.unlink, missing_ok=True)
+
+    def shutdown(self) -> None:
+        """Stop the thread pool, waiting for in-flight operations."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _write(f: IO[bytes], data: bytes, digests: tuple[Any, ...]) -> None:
+    f.write(data)
+    for digest in digests:
+        digest.update(data)
+
+
+def _flush_and_fsync(f: IO[bytes]) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _fsync_path(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace_durably(src: Path, dst: Path) -> None:
+    os.replace(src, dst)
+    dir_fd = os.open(dst.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+# Global storage I/O instance
+storage_io = StorageIO(max_workers=settings.STORAGE_IO_MAX_WORKERS)
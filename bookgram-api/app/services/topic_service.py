@@ -0,0 +1,94 @@
+"""Topic service: resolving normalized topic names to their integer IDs."""
+
+from __future__ import annotations
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.metrics import SAVE_STAGE_SECONDS
+from app.db.models.topic import Topic
+from app.services.cache import topic_id_cache
+
+# Session.info key of the topics created in the session's transaction, by name
+_CREATED_TOPICS = "created_topics"
+
+
+class TopicService:
+    """Service for topic-related operations."""
+
+    @staticmethod
+    async def get_id(db: AsyncSession, name: str) -> int:
+        """Get the ID of a topic, creating the topic if needed."""
+        return (await TopicService.get_ids(db, [name]))[name]
+
+    @staticmethod
+    async def get_ids(db: AsyncSession, names: list[str]) -> dict[str, int]:
+        """
+        Get the IDs of topics by name, creating the missing topics.
+
+        Known topics are served from topic_id_cache without a query. The
+        others are looked up in one SELECT, and the ones still missing are
+        inserted with INSERT ... ON CONFLICT DO NOTHING, so concurrent
+        requests creating the same topic cannot fail or duplicate it. Topics
+        created in this transaction are cached when it commits, so a
+        rollback never leaves an unknown ID in the cache.
+
+        Args:
+            db: Database session
+            names: Normalized topic names
+
+        Returns:
+            Topic ID of every name
+        """
+        created: dict[str, int] = db.info.setdefault(_CREATED_TOPICS, {})
+        ids: dict[str, int] = {}
+        missing = []
+        for name in dict.fromkeys(names):
+            topic_id = created.get(name) or topic_id_cache.peek(name)
+            if topic_id is None:
+                missing.append(name)
+            else:
+                ids[name] = topic_id
+        if not missing:
+            return ids
+
+        with SAVE_STAGE_SECONDS.time(stage="topic"):
+            found = await TopicService._select_ids(db, missing)
+            new = [name for name in missing if name not in found]
+            if new:
+                result = await db.execute(
+                    insert(Topic)
+                    .values([{"name": name} for name in new])
+                    .on_conflict_do_nothing(index_elements=[Topic.name])
+                    .returning(Topic.name, Topic.id)
+                )
+                inserted = dict(result.tuples().all())
+                created.update(inserted)
+                found.update(inserted)
+                # Created by a concurrent transaction that committed after our SELECT
+                if lost := [name for name in new if name not in inserted]:
+                    found.update(await TopicService._select_ids(db, lost))
+        ids.update(found)
+        return ids
+
+    @staticmethod
+    async def _select_ids(db: AsyncSession, names: list[str]) -> dict[str, int]:
+        """Look up topics not created in this transaction (so committed ones) and cache them."""
+        result = await db.execute(select(Topic.name, Topic.id).where(Topic.name.in_(names)))
+        found = dict(result.tuples().all())
+        for name, topic_id in found.items():
+            topic_id_cache.put(name, topic_id)
+        return found
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_created_topics(session: Session) -> None:
+    for name, topic_id in session.info.pop(_CREATED_TOPICS, {}).items():
+        topic_id_cache.put(name, topic_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_created_topics(session: Session) -> None:
+    session.info.pop(_CREATED_TOPICS, None)
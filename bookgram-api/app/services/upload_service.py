@@ -0,0 +1,301 @@
+"""Upload service for resumable, chunked uploads."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import AsyncIterator
+from datetime import timedelta
+from pathlib import Path
+from typing import Literal
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.file import File
+from app.db.models.upload_session import UploadSession
+from app.db.session import utcnow
+from app.services.blob_service import BlobService
+from app.services.exceptions import (
+    EmptyUploadError,
+    UploadConflictError,
+    UploadTooLargeError,
+)
+from app.services.file_service import FileService
+from app.services.storage import storage_io
+from app.services.user_service import UserService
+from app.services.validation import ContentValidator
+
+
+class UploadService:
+    """Service for resumable upload sessions."""
+
+    PARTIAL_DIR_NAME = ".partial"
+
+    @staticmethod
+    def partial_path(session_id: str) -> Path:
+        """Path of the partial file backing an upload session."""
+        return FileService.UPLOAD_DIR / UploadService.PARTIAL_DIR_NAME / session_id
+
+    @staticmethod
+    async def create_session(
+        db: AsyncSession,
+        user_id: int,
+        topic: str,
+        filename: str,
+        file_format: str,
+        total_size: int | None = None,
+    ) -> UploadSession:
+        """
+        Create an upload session and its empty partial file.
+
+        Args:
+            db: Database session
+            user_id: User ID to subscribe on finalize
+            topic: Normalized topic
+            filename: Original file name
+            file_format: File extension/type
+            total_size: Declared size in bytes, if known
+
+        Returns:
+            Created UploadSession instance
+        """
+        if await UserService.get_user(db, user_id) is None:
+            raise ValueError(f"User with id {user_id} not found")
+        if total_size is not None and total_size > settings.MAX_UPLOAD_SIZE:
+            raise UploadTooLargeError(settings.MAX_UPLOAD_SIZE)
+
+        result = await db.execute(
+            insert(UploadSession)
+            .values(
+                user_id=user_id,
+                topic=topic,
+                filename=filename,
+                format=file_format,
+                total_size=total_size,
+                bytes_received=0,
+                status="active",
+            )
+            .returning(UploadSession)
+        )
+        upload_session = result.scalar_one()
+
+        partial_path = UploadService.partial_path(upload_session.id)
+        await storage_io.mkdir(partial_path.parent)
+        await storage_io.run(partial_path.touch)
+        return upload_session
+
+    @staticmethod
+    async def get_session(
+        db: AsyncSession, session_id: str, lock: Literal["share", "update"] | None = None
+    ) -> UploadSession:
+        """
+        Get an upload session by ID, raising ValueError if it does not exist.
+
+        With lock, the row is locked until the transaction ends: chunk
+        writes take a share lock so they can run side by side, finalize an
+        update lock so it never runs while a chunk is being written (or
+        another finalize).
+        """
+        stmt = select(UploadSession).where(UploadSession.id == session_id)
+        if lock is not None:
+            stmt = stmt.with_for_update(read=lock == "share")
+        result = await db.execute(stmt)
+        upload_session = result.scalar_one_or_none()
+        if upload_session is None:
+            raise ValueError(f"Upload session {session_id} not found")
+        return upload_session
+
+    @staticmethod
+    async def write_chunk(
+        db: AsyncSession,
+        upload_session: UploadSession,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+    ) -> int:
+        """
+        Write a chunk at its offset in the partial file.
+
+        The chunk may start anywhere up to the current offset, so a client
+        that lost a response can safely resend. Data is written in place with
+        pwrite; earlier data is never read back. A chunk at offset 0 is
+        checked against the format as it streams, so content of the wrong
+        type is rejected before the rest of the upload is sent.
+
+        Args:
+            db: Database session
+            upload_session: Active upload session
+            offset: Byte offset at which the chunk starts
+            chunks: Async iterator over the chunk body
+
+        Returns:
+            New offset (number of contiguous bytes received)
+        """
+        if upload_session.status != "active":
+            raise UploadConflictError(f"Upload session is {upload_session.status}")
+        if offset > upload_session.bytes_received:
+            raise UploadConflictError(
+                f"Offset {offset} does not match current offset {upload_session.bytes_received}"
+            )
+
+        limit = upload_session.total_size or settings.MAX_UPLOAD_SIZE
+        validator = FileService.content_validator(upload_session.format) if offset == 0 else None
+        partial_path = UploadService.partial_path(upload_session.id)
+        fd = await storage_io.run(os.open, partial_path, os.O_WRONLY)
+        position = offset
+        try:
+            # A finalize that did not commit left the partial file linked into the blob store
+            if (await storage_io.run(os.fstat, fd)).st_nlink > 1:
+                raise UploadConflictError("Upload is being finalized; finalize it again")
+            async for chunk in chunks:
+                if position + len(chunk) > limit:
+                    if upload_session.total_size is not None:
+                        raise UploadConflictError(
+                            f"Chunk exceeds the declared size of {upload_session.total_size} bytes"
+                        )
+                    raise UploadTooLargeError(settings.MAX_UPLOAD_SIZE)
+                await storage_io.run(_pwrite_all, fd, chunk, position, validator)
+                position += len(chunk)
+        finally:
+            await storage_io.run(os.close, fd)
+
+        # Only move the offset forward; concurrent retries cannot rewind it
+        result = await db.execute(
+            update(UploadSession)
+            .where(UploadSession.id == upload_session.id)
+            .values(bytes_received=func.greatest(UploadSession.bytes_received, position))
+            .returning(UploadSession.bytes_received)
+        )
+        return result.scalar_one()
+
+    @staticmethod
+    async def finalize(db: AsyncSession, upload_session: UploadSession) -> File:
+        """
+        Complete an upload: store the partial file as a blob and save the file.
+
+        Runs the same flow as a direct upload: content validation, blob
+        reference, file record and topic subscription. The caller commits the
+        transaction and then calls discard_partial. The partial file is
+        hard-linked into the blob store rather than moved, so if the
+        transaction does not commit the session can be finalized again; the
+        session row must be locked (get_session with lock="update").
+
+        Args:
+            db: Database session
+            upload_session: Upload session with all bytes received
+
+        Returns:
+            Created File instance
+        """
+        if upload_session.status != "active":
+            raise UploadConflictError(f"Upload session is {upload_session.status}")
+        if upload_session.bytes_received == 0:
+            raise EmptyUploadError()
+        if (
+            upload_session.total_size is not None
+            and upload_session.bytes_received != upload_session.total_size
+        ):
+            raise UploadConflictError(
+                f"Upload incomplete: {upload_session.bytes_received} of "
+                f"{upload_session.total_size} bytes received"
+            )
+
+        partial_path = UploadService.partial_path(upload_session.id)
+        size = upload_session.bytes_received
+        # Drop anything written past the acknowledged offset by an abandoned request
+        await storage_io.run(os.truncate, partial_path, size)
+        page_index_builder = FileService.page_index_builder(upload_session.format)
+        validator = FileService.content_validator(upload_session.format)
+        checksum = await FileService.hash_file(partial_path, page_index_builder, validator)
+        await FileService.finish_validation(partial_path, validator)
+        link_path = partial_path.with_name(f"{partial_path.name}.blob")
+        await storage_io.run(_link, partial_path, link_path)
+        blob_path, _ = await FileService.place_blob(link_path, checksum)
+        await FileService.store_page_index(blob_path, page_index_builder)
+
+        await BlobService.acquire(
+            db=db,
+            checksum=checksum,
+            location_url=str(blob_path),
+            size=size,
+        )
+        file_record = await FileService.create_file_record(
+            db=db,
+            location_url=str(blob_path),
+            topic=upload_session.topic,
+            size=size,
+            file_format=upload_session.format,
+            checksum=checksum,
+        )
+        await UserService.subscribe_user_to_topic(
+            db=db,
+            user_id=upload_session.user_id,
+            topic=upload_session.topic,
+        )
+
+        upload_session.status = "completed"
+        upload_session.file_id = file_record.id
+        await db.flush()
+        return file_record
+
+    @staticmethod
+    async def discard_partial(upload_session: UploadSession) -> None:
+        """Remove the partial file of a session whose finalize has committed."""
+        await UploadService.remove_partial(upload_session.id)
+
+    @staticmethod
+    async def expire_sessions(db: AsyncSession, limit: int) -> list[str]:
+        """
+        Mark active sessions without a chunk for UPLOAD_SESSION_TTL seconds as expired.
+
+        Sessions locked by a chunk write or a finalize in progress are
+        skipped. The caller commits and then removes the partial files
+        (remove_partial), so an active session never loses its partial file.
+
+        Args:
+            db: Database session
+            limit: Maximum number of sessions
+
+        Returns:
+            IDs of the expired sessions
+        """
+        cutoff = utcnow() - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+        stale = (
+            select(UploadSession.id)
+            .where(UploadSession.status == "active", UploadSession.updated_at < cutoff)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.scalars(
+            update(UploadSession)
+            .where(UploadSession.id.in_(stale.scalar_subquery()))
+            .values(status="expired")
+            .returning(UploadSession.id)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.all())
+
+    @staticmethod
+    async def remove_partial(session_id: str) -> None:
+        """Remove a session's partial file and any blob link left by a failed finalize."""
+        partial_path = UploadService.partial_path(session_id)
+        await storage_io.unlink(partial_path)
+        await storage_io.unlink(partial_path.with_name(f"{partial_path.name}.blob"))
+
+
+def _link(src: Path, dst: Path) -> None:
+    """Hard-link src to dst, replacing a link left by an earlier attempt."""
+    dst.unlink(missing_ok=True)
+    os.link(src, dst)
+
+
+def _pwrite_all(
+    fd: int, data: bytes, position: int, validator: ContentValidator | None = None
+) -> None:
+    if validator is not None:
+        validator.update(data)
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, position)
+        view = view[written:]
+        position += written
@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
-from sqlalchemy import select
+from sqlalchemy import DateTime, Integer, Select, cast, exists, func, literal, select, true
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.metrics import SAVE_STAGE_SECONDS
+from app.db.models.subscription import UserTopicSubscription
+from app.db.models.topic import Topic
 from app.db.models.user import User
+from app.db.session import utcnow
+from app.services.cache import detached_copy, subscription_cache, user_cache
+from app.services.topic_service import TopicService
 
 
 class UserService:
@@ -16,42 +23,149 @@ class UserService:
         db: AsyncSession,
         user_id: int,
         topic: str,
-    ) -> User:
+    ) -> bool:
         """
         Subscribe a user to a topic.
 
+        Runs as a single atomic statement: the subscription row is inserted
+        with ON CONFLICT DO NOTHING, so concurrent subscribes cannot race or
+        duplicate, and the cost does not grow with the number of topics the
+        user already follows.
+
         Args:
             db: Database session
             user_id: User ID
-            topic: Topic to subscribe to
+            topic: Topic to subscribe to (created if new)
 
         Returns:
-            Updated User instance
+            True if the user was newly subscribed, False if already subscribed
+        """
+        topic_id = await TopicService.get_id(db, topic)
+        rows = select(User.id, literal(topic_id, Integer), literal(utcnow(), DateTime)).where(
+            User.id == user_id
+        )
+        return await UserService._insert_subscriptions(db, user_id, rows) > 0
+
+    @staticmethod
+    async def subscribe_user_to_topics(
+        db: AsyncSession,
+        user_id: int,
+        topics: list[str],
+    ) -> int:
         """
-        # Get user
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        Subscribe a user to many topics with a single statement.
 
-        if not user:
+        Args:
+            db: Database session
+            user_id: User ID
+            topics: Topics to subscribe to (created if new)
+
+        Returns:
+            Number of new subscriptions
+        """
+        topic_ids = await TopicService.get_ids(db, topics)
+        unnested = (
+            func.unnest(cast(list(topic_ids.values()), ARRAY(Integer)))
+            .table_valued("topic_id")
+            .render_derived(name="topic_ids")
+        )
+        rows = (
+            select(User.id, unnested.c.topic_id, literal(utcnow(), DateTime))
+            .join_from(User, unnested, true())
+            .where(User.id == user_id)
+        )
+        return await UserService._insert_subscriptions(db, user_id, rows)
+
+    @staticmethod
+    async def _insert_subscriptions(db: AsyncSession, user_id: int, rows: Select) -> int:
+        """Insert (user_id, topic_id, created_at) rows, checking the user exists in the same statement."""
+        subscription_cache.invalidate_on_commit(db, user_id)
+        inserted = (
+            insert(UserTopicSubscription)
+            .from_select(["user_id", "topic_id", "created_at"], rows)
+            .on_conflict_do_nothing()
+            .returning(UserTopicSubscription.user_id)
+            .cte("inserted")
+        )
+        with SAVE_STAGE_SECONDS.time(stage="subscribe"):
+            result = await db.execute(
+                select(
+                    exists().where(User.id == user_id),
+                    select(func.count()).select_from(inserted).scalar_subquery(),
+                )
+            )
+        user_exists, inserted_count = result.one()
+        if not user_exists:
             raise ValueError(f"User with id {user_id} not found")
+        return inserted_count
 
-        # Initialize subscribed_topics if None
-        if user.subscribed_topics is None:
-            user.subscribed_topics = []
+    @staticmethod
+    async def get_subscribed_topics(db: AsyncSession, user_id: int) -> list[str]:
+        """
+        Get the topics a user is subscribed to, oldest first.
 
-        # Add topic if not already subscribed
-        if topic not in user.subscribed_topics:
-            user.subscribed_topics = [*user.subscribed_topics, topic]
+        Served from subscription_cache; the entry is invalidated when a
+        subscription of the user is committed.
+        """
 
-        await db.flush()
-        await db.refresh(user)
-        return user
+        async def load() -> tuple[str, ...]:
+            result = await db.execute(
+                select(Topic.name)
+                .join(UserTopicSubscription, UserTopicSubscription.topic_id == Topic.id)
+                .where(UserTopicSubscription.user_id == user_id)
+                .order_by(UserTopicSubscription.created_at, Topic.name)
+            )
+            return tuple(result.scalars().all())
+
+        return list(await subscription_cache.get_or_load(user_id, load))
+
+    @staticmethod
+    async def get_topic_subscribers(
+        db: AsyncSession,
+        topic: str,
+        after_user_id: int | None = None,
+        limit: int = 1000,
+    ) -> list[int]:
+        """
+        Get one page of the users subscribed to a topic.
+
+        Uses keyset pagination on the (topic_id, user_id) index, so every page
+        costs the same no matter how deep into the subscriber list it is.
+
+        Args:
+            db: Database session
+            topic: Topic to look up
+            after_user_id: Last user ID of the previous page, if any
+            limit: Maximum number of user IDs to return
+
+        Returns:
+            Subscribed user IDs in ascending order
+        """
+        stmt = (
+            select(UserTopicSubscription.user_id)
+            .join(Topic, Topic.id == UserTopicSubscription.topic_id)
+            .where(Topic.name == topic)
+        )
+        if after_user_id is not None:
+            stmt = stmt.where(UserTopicSubscription.user_id > after_user_id)
+        result = await db.execute(stmt.order_by(UserTopicSubscription.user_id).limit(limit))
+        return list(result.scalars().all())
 
     @staticmethod
     async def get_user(db: AsyncSession, user_id: int) -> User | None:
-        """Get a user by ID."""
-        result = await db.execute(select(User).where(User.id == user_id))
-        return result.scalar_one_or_none()
+        """
+        Get a user by ID.
+
+        Served from user_cache as a shared, detached snapshot; merge it into
+        a session before modifying it.
+        """
+
+        async def load() -> User | None:
+            result = await db.execute(select(User).where(User.id == user_id))
+            user = result.scalar_one_or_none()
+            return None if user is None else detached_copy(user)
+
+        return await user_cache.get_or_load(user_id, load)
 
     @staticmethod
     async def create_user(
@@ -60,8 +174,10 @@ class UserService:
         username: str,
     ) -> User:
         """Create a new user."""
-        db_user = User(email=email, username=username, subscribed_topics=[])
-        db.add(db_user)
-        await db.flush()
-        await db.refresh(db_user)
-        return db_user
+        result = await db.execute(
+            insert(User).values(email=email, username=username).returning(User)
+        )
+        user = result.scalar_one()
+        # A lookup of the new ID may have cached "not found"
+        user_cache.invalidate_on_commit(db, user.id)
+        return user
@@ -0,0 +1,187 @@
+"""Streaming content validation of uploads: format sniffing and structural checks."""
+
+from __future__ import annotations
+
+import codecs
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Protocol
+
+from app.services.exceptions import CorruptUploadError
+
+# The PDF header must start within the first PDF_WINDOW bytes, and %%EOF must end
+# within the last PDF_WINDOW bytes
+PDF_HEADER = b"%PDF-"
+PDF_WINDOW = 1024
+# "startxref <offset> %%EOF", searched in the last bytes of the file
+PDF_TRAILER = re.compile(rb"startxref\s+(\d+)\s+%%EOF")
+# What a cross-reference offset must point at: an xref table or an xref stream object
+PDF_XREF = re.compile(rb"\s*(?:xref|\d+\s+\d+\s+obj)")
+
+ZIP_LOCAL_HEADER = b"PK\x03\x04"
+ZIP_CENTRAL_HEADER = b"PK\x01\x02"
+# End of central directory record: signature, disk numbers, entry counts, size,
+# offset, comment length (up to 64 KiB of comment follows)
+ZIP_EOCD = struct.Struct("<4s4H2LH")
+ZIP_EOCD_SIGNATURE = b"PK\x05\x06"
+ZIP_EOCD_WINDOW = ZIP_EOCD.size + 0xFFFF
+# Central directories larger than this are not scanned for the EPUB container
+MAX_CENTRAL_DIRECTORY = 1024 * 1024
+EPUB_CONTAINER = b"META-INF/container.xml"
+
+
+class ContentValidator(Protocol):
+    """
+    Checks content of one format as it streams by.
+
+    update() raises CorruptUploadError as soon as the bytes seen so far
+    prove the content invalid, so a bad upload is rejected without reading
+    the rest of it. finish() runs the checks that need the whole content,
+    reading at most a few small ranges of the stored file.
+    """
+
+    def update(self, chunk: bytes) -> None: ...
+
+    def finish(self, path: Path) -> None: ...
+
+
+def content_validator(file_format: str) -> ContentValidator | None:
+    """Validator for a content format, or None if the format is not checked."""
+    if file_format in ("txt", "md", "log"):
+        return TextValidator()
+    if file_format == "pdf":
+        return PdfValidator()
+    if file_format == "epub":
+        return EpubValidator()
+    return None
+
+
+class TextValidator:
+    """UTF-8 text without NUL bytes, checked with an incremental decoder."""
+
+    def __init__(self) -> None:
+        self.size = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def update(self, chunk: bytes) -> None:
+        nul = chunk.find(b"\x00")
+        if nul >= 0:
+            raise CorruptUploadError(f"File is not text: NUL byte at offset {self.size + nul}")
+        pending, _ = self._decoder.getstate()
+        # ASCII is valid UTF-8; only other chunks (or a split character) need decoding
+        if pending or not chunk.isascii():
+            try:
+                self._decoder.decode(chunk)
+            except UnicodeDecodeError as e:
+                offset = self.size - len(pending) + e.start
+                raise CorruptUploadError(
+                    f"File is not valid UTF-8 text: invalid byte at offset {offset}"
+                ) from e
+        self.size += len(chunk)
+
+    def finish(self, path: Path) -> None:
+        try:
+            self._decoder.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            raise CorruptUploadError("File is not valid UTF-8 text: truncated character") from e
+
+
+class PdfValidator:
+    """
+    PDF header, and a trailer whose startxref points at a cross-reference section.
+
+    Only the first and last kilobytes are looked at, plus one small read at
+    the cross-reference offset; the document itself is never parsed.
+    """
+
+    def __init__(self) -> None:
+        self.size = 0
+        self._head = b""
+        self._header_offset: int | None = None
+        self._tail = bytearray()
+
+    def update(self, chunk: bytes) -> None:
+        if self._header_offset is None:
+            self._head = (self._head + chunk[:PDF_WINDOW])[:PDF_WINDOW]
+            found = self._head.find(PDF_HEADER)
+            if found >= 0:
+                self._header_offset = found
+            elif len(self._head) >= PDF_WINDOW:
+                raise CorruptUploadError("File is not a PDF: missing %PDF- header")
+        self._tail += chunk[-2 * PDF_WINDOW :]
+        del self._tail[: -2 * PDF_WINDOW]
+        self.size += len(chunk)
+
+    def finish(self, path: Path) -> None:
+        if self._header_offset is None:
+            raise CorruptUploadError("File is not a PDF: missing %PDF- header")
+        trailers = list(PDF_TRAILER.finditer(self._tail))
+        tail_start = self.size - len(self._tail)
+        if not trailers or tail_start + trailers[-1].end() < self.size - PDF_WINDOW:
+            raise CorruptUploadError("PDF is truncated: no startxref/%%EOF trailer")
+
+        offset = int(trailers[-1].group(1))
+        # Offsets count from the header, which is usually (not always) at byte 0
+        candidates = {offset, offset + self._header_offset}
+        if not any(
+            start < self.size and PDF_XREF.match(_read_at(path, start, 64)) for start in candidates
+        ):
+            raise CorruptUploadError(
+                f"PDF is corrupted: startxref offset {offset} is not a cross-reference section"
+            )
+
+
+class EpubValidator:
+    """
+    Zip local header, and a central directory that lists the EPUB container.
+
+    The end of central directory record is found in the streamed tail; the
+    central directory itself is read once from the stored file.
+    """
+
+    def __init__(self) -> None:
+        self.size = 0
+        self._head = b""
+        self._tail = bytearray()
+
+    def update(self, chunk: bytes) -> None:
+        if len(self._head) < len(ZIP_LOCAL_HEADER):
+            self._head += chunk[: len(ZIP_LOCAL_HEADER) - len(self._head)]
+            if not ZIP_LOCAL_HEADER.startswith(self._head):
+                raise CorruptUploadError("File is not an EPUB: not a zip archive")
+        self._tail += chunk[-ZIP_EOCD_WINDOW:]
+        del self._tail[:-ZIP_EOCD_WINDOW]
+        self.size += len(chunk)
+
+    def finish(self, path: Path) -> None:
+        if self._head != ZIP_LOCAL_HEADER:
+            raise CorruptUploadError("File is not an EPUB: not a zip archive")
+        last = len(self._tail) - ZIP_EOCD.size
+        found = self._tail.rfind(ZIP_EOCD_SIGNATURE, 0, last + len(ZIP_EOCD_SIGNATURE))
+        if found < 0:
+            raise CorruptUploadError("EPUB is truncated: no zip central directory")
+        _, _, _, _, entries, cd_size, cd_offset, _ = ZIP_EOCD.unpack_from(self._tail, found)
+        eocd_offset = self.size - len(self._tail) + found
+        if entries == 0:
+            raise CorruptUploadError("EPUB is corrupted: empty zip archive")
+        # Zip64 archives keep the real values elsewhere; EPUBs that large are not checked further
+        if cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF:
+            return
+        if cd_offset + cd_size > eocd_offset:
+            raise CorruptUploadError("EPUB is corrupted: invalid zip central directory")
+
+        central_directory = _read_at(path, cd_offset, min(cd_size, MAX_CENTRAL_DIRECTORY))
+        if not central_directory.startswith(ZIP_CENTRAL_HEADER):
+            raise CorruptUploadError("EPUB is corrupted: invalid zip central directory")
+        if cd_size <= MAX_CENTRAL_DIRECTORY and EPUB_CONTAINER not in central_directory:
+            raise CorruptUploadError("File is not an EPUB: no META-INF/container.xml")
+
+
+def _read_at(path: Path, offset: int, size: int) -> bytes:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.pread(fd, size, offset)
+    finally:
+        os.close(fd)
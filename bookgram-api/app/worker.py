@@ -0,0 +1,79 @@
+"""
+BookGram outbox worker - runs post-upload jobs (chapter/page extraction, ...).
+
+Claims due jobs from the outbox_jobs table in batches with
+SELECT ... FOR UPDATE SKIP LOCKED and runs them concurrently. Run as many
+worker processes as needed; set OUTBOX_INLINE=false on the API so that
+follow-up work stays off the API processes. Stops on SIGINT/SIGTERM once the
+jobs in flight finish.
+
+Usage (from the bookgram-api directory):
+    python -m app.worker
+    python -m app.worker --concurrency 8 --batch-size 50
+    python -m app.worker --once  # run the jobs due now and exit
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.db import engine
+from app.services.extraction import extraction_pool
+from app.services.metrics_export import metrics_exporter
+from app.services.outbox_worker import JOB_HANDLERS, OutboxWorker
+from app.services.storage import storage_io
+
+logger = logging.getLogger("app.worker")
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the worker until stopped (or, with --once, until no job is due)."""
+    worker = OutboxWorker(
+        handlers=JOB_HANDLERS,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        poll_interval=args.poll_interval,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    # Share this worker's job metrics with the API's /metrics
+    metrics_exporter.start()
+    logger.info(
+        "Outbox worker started (concurrency %s, batch size %s)", args.concurrency, args.batch_size
+    )
+    try:
+        if args.once:
+            logger.info("Ran %s outbox jobs", await worker.run_due())
+        else:
+            await worker.run()
+    finally:
+        await metrics_exporter.stop()
+        await engine.dispose()
+        storage_io.shutdown()
+        extraction_pool.shutdown()
+    logger.info("Outbox worker stopped")
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--concurrency", type=int, default=settings.OUTBOX_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE)
+    parser.add_argument("--poll-interval", type=float, default=settings.OUTBOX_POLL_INTERVAL)
+    parser.add_argument("--once", action="store_true", help="run the due jobs and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: `/health` latency while large uploads are being written to disk.
+
+Runs the ASGI app in-process, streams several large uploads to disk
+concurrently and probes `/health` on the same event loop. Any blocking disk
+call made by the upload path shows up directly as `/health` tail latency.
+
+The database dependency is replaced by a stub so no PostgreSQL is needed.
+
+Usage (from the bookgram-api directory):
+    python -m benchmarks.health_during_uploads --uploads 4 --size-mb 256
+    python -m benchmarks.health_during_uploads --mode blocking  # pre-storage-IO baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
+from pathlib import Path
+from typing import Any
+
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.db import get_db
+from app.main import app
+from app.services.file_service import FileService
+
+
+class _StubSession:
+    """Minimal stand-in for AsyncSession used by /health."""
+
+    async def execute(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
+
+async def _stub_get_db() -> AsyncGenerator[_StubSession, None]:
+    yield _StubSession()
+
+
+async def _chunks(size: int, chunk_size: int) -> AsyncIterator[bytes]:
+    block = os.urandom(chunk_size)
+    remaining = size
+    while remaining > 0:
+        chunk = block[: min(chunk_size, remaining)]
+        remaining -= len(chunk)
+        yield chunk
+
+
+async def _upload_engine(index: int, size: int, chunk_size: int) -> None:
+    await FileService.save_stream_to_disk(chunks=_chunks(size, chunk_size))
+
+
+async def _upload_blocking(index: int, size: int, chunk_size: int) -> None:
+    # Reproduces the original implementation: plain open()/write() on the loop.
+    file_path = FileService.UPLOAD_DIR / f"bench_upload_{index}.txt"
+    with open(file_path, "wb") as f:
+        async for chunk in _chunks(size, chunk_size):
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(
+    mode: str, uploads: int, size: int, chunk_size: int, interval: float
+) -> dict[str, Any]:
+    """Run the benchmark and return a JSON-serializable report."""
+    upload = _upload_engine if mode == "engine" else _upload_blocking
+    latencies: list[float] = []
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        done = asyncio.Event()
+
+        async def probe() -> None:
+            while not done.is_set():
+                start = time.perf_counter()
+                response = await client.get("/health")
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+                await asyncio.sleep(interval)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(upload(i, size, chunk_size) for i in range(uploads)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        "mode": mode,
+        "uploads": uploads,
+        "upload_size_bytes": size,
+        "chunk_size_bytes": chunk_size,
+        "storage_io_max_workers": settings.STORAGE_IO_MAX_WORKERS,
+        "upload_seconds": round(elapsed, 3),
+        "upload_throughput_mb_s": round(uploads * size / elapsed / 1024 / 1024, 1),
+        "health_samples": len(latencies),
+        "health_p50_ms": round(statistics.median(latencies), 3),
+        "health_p95_ms": round(_percentile(latencies, 95), 3),
+        "health_p99_ms": round(_percentile(latencies, 99), 3),
+        "health_max_ms": round(max(latencies), 3),
+    }
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--mode", choices=["engine", "blocking"], default="engine")
+    parser.add_argument("--uploads", type=int, default=4, help="concurrent uploads")
+    parser.add_argument("--size-mb", type=int, default=128, help="size of each upload in MiB")
+    parser.add_argument("--chunk-kb", type=int, default=settings.UPLOAD_CHUNK_SIZE // 1024)
+    parser.add_argument(
+        "--interval-ms", type=float, default=5.0, help="delay between /health probes"
+    )
+    args = parser.parse_args()
+
+    app.dependency_overrides[get_db] = _stub_get_db
+    with tempfile.TemporaryDirectory(prefix="bookgram-bench-") as upload_dir:
+        FileService.UPLOAD_DIR = Path(upload_dir)
+        report = asyncio.run(
+            run(
+                mode=args.mode,
+                uploads=args.uploads,
+                size=args.size_mb * 1024 * 1024,
+                chunk_size=args.chunk_kb * 1024,
+                interval=args.interval_ms / 1000,
+            )
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
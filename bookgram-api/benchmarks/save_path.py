@@ -0,0 +1,398 @@
+"""
+Benchmark: `POST /api/v1/files/save` throughput, latency, memory and DB round trips.
+
+Runs the ASGI app in-process against PostgreSQL and drives the save endpoint
+for every combination of upload size, concurrency and format. Each scenario
+sends --requests saves (after --warmup untimed ones) with `concurrency` in
+flight and reports throughput, p50/p95/p99 latency, peak RSS of the process
+and database round trips per request. Every upload has unique content, so
+each save writes a new blob; `gz` uploads are gzip-compressed text and
+exercise the decompression path.
+
+Blobs are written to a temporary directory, and the rows created (a
+benchmark user, its subscriptions, files and blobs) are deleted afterwards.
+Extraction is disabled unless --extraction is given, so background work
+started after the response does not count towards the save latency.
+
+Needs a migrated database (DATABASE_URL). A local stand-in:
+    docker run -d --name bookgram-bench-db -p 5432:5432 \\
+        -e POSTGRES_USER=bookgram -e POSTGRES_PASSWORD=bookgram -e POSTGRES_DB=bookgram \\
+        postgres:16-alpine
+    uv run alembic upgrade head
+
+The report is printed and written as JSON (by default to
+benchmarks/results/save_path-<commit>.json); --compare prints the change
+between two reports and exits with status 1 on a regression.
+
+Usage (from the bookgram-api directory):
+    python -m benchmarks.save_path
+    python -m benchmarks.save_path --sizes-kb 4 1024 16384 --concurrency 1 16 64 --formats txt gz
+    python -m benchmarks.save_path --compare benchmarks/results/save_path-abc1234.json \\
+        benchmarks/results/save_path-def5678.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import AsyncSessionLocal, engine
+from app.db.query_counter import count_queries
+from app.main import app
+from app.services.cache import metadata_caches
+from app.services.file_service import FileService
+
+TOPIC_PREFIX = "bench_save_"
+RESULTS_DIR = Path(__file__).parent / "results"
+FORMATS = ("txt", "md", "log", "gz")
+# Keys identifying a scenario across reports
+SCENARIO_KEY = ("format", "size_bytes", "concurrency")
+
+
+def make_corpus(size: int, seed: int = 0) -> bytes:
+    """Text of about size bytes, lines of synthetic words."""
+    rng = random.Random(seed)
+    words = [f"w{rank}" for rank in range(5000)]
+    lines = []
+    total = 0
+    while total < size:
+        line = " ".join(rng.choices(words, k=12)) + "\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines).encode()[:size]
+
+
+class Payloads:
+    """Upload bodies of one format and size, unique per request."""
+
+    def __init__(self, file_format: str, size: int) -> None:
+        self.file_format = file_format
+        self.size = size
+        self._body = make_corpus(size)
+        # gzip members concatenate into one stream, so the large part is compressed once
+        if file_format == "gz":
+            self._body = gzip.compress(self._body, compresslevel=6)
+
+    @property
+    def filename(self) -> str:
+        """Upload filename (gz uploads are compressed text)."""
+        return "book.txt.gz" if self.file_format == "gz" else f"book.{self.file_format}"
+
+    def body(self, request_id: str) -> bytes:
+        """Content starting with a unique line, so no two uploads share a blob."""
+        header = f"{request_id}\n".encode()
+        if self.file_format == "gz":
+            header = gzip.compress(header)
+        return header + self._body
+
+
+class RssSampler:
+    """Track the peak resident set size of this process from a background thread."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def __enter__(self) -> RssSampler:
+        self.peak = current_rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+
+def current_rss() -> int:
+    """Resident set size in bytes (peak RSS where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Bytes on macOS, KiB elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of samples."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def create_user(run_id: str) -> int:
+    """Insert the benchmark user; returns its ID."""
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(
+            text(
+                "INSERT INTO users (email, username, created_at, updated_at) "
+                "VALUES (:email, :username, timezone('utc', now()), timezone('utc', now())) "
+                "RETURNING id"
+            ),
+            {"email": f"{TOPIC_PREFIX}{run_id}@bench.invalid", "username": TOPIC_PREFIX + run_id},
+        )
+        await db.commit()
+    return user_id
+
+
+async def cleanup(run_id: str, user_id: int | None, upload_dir: Path) -> None:
+    """Delete the rows created by the run (subscriptions and pages cascade)."""
+    async with AsyncSessionLocal() as db:
+        topics = {"pattern": f"{TOPIC_PREFIX}{run_id}_%"}
+        await db.execute(
+            text(
+                "DELETE FROM files WHERE topic_id IN "
+                "(SELECT id FROM topics WHERE name LIKE :pattern)"
+            ),
+            topics,
+        )
+        await db.execute(
+            text("DELETE FROM blobs WHERE location_url LIKE :pattern"),
+            {"pattern": f"{upload_dir}%"},
+        )
+        if user_id is not None:
+            await db.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        await db.execute(text("DELETE FROM topics WHERE name LIKE :pattern"), topics)
+        await db.commit()
+
+
+async def run_scenario(
+    client: AsyncClient,
+    payloads: Payloads,
+    concurrency: int,
+    requests: int,
+    warmup: int,
+    user_id: int,
+    run_id: str,
+) -> dict[str, Any]:
+    """Send warmup + requests saves with concurrency in flight; returns the measurements."""
+    latencies: list[float] = []
+    round_trips: list[int] = []
+    failures: dict[str, int] = {}
+    sequence = itertools.count()
+
+    async def save(measured: bool) -> None:
+        request_id = f"{run_id}_{next(sequence)}_{uuid.uuid4().hex[:8]}"
+        files = {"file": (payloads.filename, payloads.body(request_id), "application/octet-stream")}
+        data = {"title": TOPIC_PREFIX + request_id, "user_id": str(user_id)}
+        with count_queries() as counter:
+            started = time.perf_counter()
+            response = await client.post("/api/v1/files/save", files=files, data=data)
+            elapsed = time.perf_counter() - started
+        if response.status_code != 201:
+            key = str(response.status_code)
+            failures[key] = failures.get(key, 0) + 1
+        elif measured:
+            latencies.append(elapsed * 1000)
+            round_trips.append(counter.count)
+
+    async def worker(count: int, measured: bool) -> None:
+        for _ in range(count):
+            await save(measured)
+
+    async def drive(total: int, measured: bool) -> None:
+        # Split the requests over `concurrency` workers, each sending one at a time
+        share, extra = divmod(total, concurrency)
+        await asyncio.gather(*(worker(share + (i < extra), measured) for i in range(concurrency)))
+
+    await drive(warmup, measured=False)
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        await drive(requests, measured=True)
+        elapsed = time.perf_counter() - started
+
+    result: dict[str, Any] = {
+        "format": payloads.file_format,
+        "size_bytes": payloads.size,
+        "concurrency": concurrency,
+        "requests": requests,
+        "succeeded": len(latencies),
+        "failures": failures,
+        "seconds": round(elapsed, 3),
+        "peak_rss_mb": round(rss.peak / 1024 / 1024, 1),
+    }
+    if latencies:
+        result.update(
+            {
+                "throughput_rps": round(len(latencies) / elapsed, 2),
+                "throughput_mb_s": round(len(latencies) * payloads.size / elapsed / 1024 / 1024, 2),
+                "p50_ms": round(statistics.median(latencies), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "max_ms": round(max(latencies), 3),
+                "db_round_trips_per_request": round(statistics.mean(round_trips), 2),
+                "db_round_trips_max": max(round_trips),
+            }
+        )
+    return result
+
+
+def environment() -> dict[str, Any]:
+    """What the results depend on besides the code: commit, runtime and settings."""
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            name: getattr(settings, name)
+            for name in (
+                "DB_POOL_SIZE",
+                "DB_MAX_OVERFLOW",
+                "STORAGE_IO_MAX_WORKERS",
+                "UPLOAD_CHUNK_SIZE",
+                "EXTRACTION_ENABLED",
+                "METADATA_CACHE_MAX_ENTRIES",
+            )
+        },
+    }
+
+
+def git_commit() -> str | None:
+    """Short hash of HEAD, suffixed with -dirty for uncommitted changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+async def run(args: argparse.Namespace, upload_dir: Path) -> dict[str, Any]:
+    """Run every scenario; returns a JSON-serializable report."""
+    run_id = uuid.uuid4().hex[:8]
+    user_id = None
+    scenarios = []
+    try:
+        user_id = await create_user(run_id)
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench", timeout=None
+        ) as client:
+            for file_format, size_kb in itertools.product(args.formats, args.sizes_kb):
+                payloads = Payloads(file_format, size_kb * 1024)
+                for concurrency in args.concurrency:
+                    # Every scenario starts with the same (cold) metadata caches
+                    for cache in metadata_caches:
+                        cache.clear()
+                    result = await run_scenario(
+                        client,
+                        payloads,
+                        concurrency,
+                        args.requests,
+                        args.warmup,
+                        user_id,
+                        run_id,
+                    )
+                    scenarios.append(result)
+                    print(json.dumps(result), file=sys.stderr)
+    finally:
+        await cleanup(run_id, user_id, upload_dir)
+        await engine.dispose()
+
+    return {"benchmark": "save_path", "environment": environment(), "scenarios": scenarios}
+
+
+def compare(baseline_path: Path, current_path: Path, threshold: float) -> bool:
+    """Print the change per scenario between two reports; True if nothing regressed."""
+    baseline, current = (json.loads(path.read_text()) for path in (baseline_path, current_path))
+    before = {tuple(s[k] for k in SCENARIO_KEY): s for s in baseline["scenarios"]}
+    ok = True
+    print(
+        f"{baseline['environment']['commit']} -> {current['environment']['commit']}"
+        f" (regression threshold {threshold:.0%})"
+    )
+    print(f"{'format':<6} {'size KiB':>9} {'conc':>5} {'rps':>18} {'p95 ms':>20} {'trips':>11}")
+    for scenario in current["scenarios"]:
+        key = tuple(scenario[k] for k in SCENARIO_KEY)
+        old = before.get(key)
+        if old is None or "p95_ms" not in old or "p95_ms" not in scenario:
+            continue
+        rps = scenario["throughput_rps"] / old["throughput_rps"] - 1
+        p95 = scenario["p95_ms"] / old["p95_ms"] - 1
+        trips = scenario["db_round_trips_per_request"] - old["db_round_trips_per_request"]
+        regressed = rps < -threshold or p95 > threshold or trips > 0
+        ok &= not regressed
+        print(
+            f"{key[0]:<6} {key[1] // 1024:>9} {key[2]:>5}"
+            f" {scenario['throughput_rps']:>9.1f} ({rps:+6.1%})"
+            f" {scenario['p95_ms']:>11.2f} ({p95:+6.1%})"
+            f" {scenario['db_round_trips_per_request']:>5.1f} ({trips:+.1f})"
+            + ("  REGRESSION" if regressed else "")
+        )
+    return ok
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[4, 256, 4096])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--formats", choices=FORMATS, nargs="+", default=["txt", "gz"])
+    parser.add_argument("--requests", type=int, default=200, help="timed saves per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed saves per scenario")
+    parser.add_argument("--extraction", action="store_true", help="extract pages after saves")
+    parser.add_argument("--output", type=Path, help="report path (default: results/<commit>)")
+    parser.add_argument(
+        "--compare", type=Path, nargs=2, metavar=("BASELINE", "CURRENT"), help="compare reports"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="relative change counted as a regression"
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(0 if compare(*args.compare, threshold=args.threshold) else 1)
+
+    settings.EXTRACTION_ENABLED = args.extraction
+    with tempfile.TemporaryDirectory(prefix="bookgram-bench-") as upload_dir:
+        FileService.UPLOAD_DIR = Path(upload_dir)
+        report = asyncio.run(run(args, Path(upload_dir)))
+
+    output = args.output or RESULTS_DIR / f"save_path-{report['environment']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(json.dumps(report, indent=2))
+    print(f"Report written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Benchmark: `GET /files/search` latency over a synthetic corpus.
+
+Seeds PostgreSQL with synthetic books (files rows tagged ``bench_search_*``
+and their pages), with word frequencies skewed like natural language so
+queries cover very common, medium and rare terms, phrases and AND queries.
+Each query class is then run repeatedly through SearchService and its
+latency reported. The pages are vectorized and indexed exactly as extracted
+pages are, by the search_vector trigger and its GIN index.
+
+Needs a migrated database (DATABASE_URL). The corpus is deleted afterwards
+unless --keep is given; --skip-seed reuses a kept corpus.
+
+Usage (from the bookgram-api directory):
+    python -m benchmarks.search --pages 1000000
+    python -m benchmarks.search --pages 100000 --keep
+    python -m benchmarks.search --skip-seed --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import AsyncSessionLocal, engine
+from app.services.search_service import SearchService
+
+TOPIC_PREFIX = "bench_search_"
+# Synthetic words are WORD_PREFIX followed by the word's frequency rank
+WORD_PREFIX = "w"
+
+
+def word(rank: int) -> str:
+    """The synthetic word of a frequency rank (0 is the most frequent)."""
+    return f"{WORD_PREFIX}{rank}"
+
+
+async def seed(pages: int, pages_per_file: int, words_per_page: int, vocabulary: int) -> float:
+    """Insert the synthetic corpus, one transaction per batch of files; returns seconds."""
+    files = -(-pages // pages_per_file)
+    started = time.perf_counter()
+    for first in range(0, files, 100):
+        batch = min(100, files - first)
+        async with AsyncSessionLocal() as db:
+            file_ids = (
+                await db.scalars(
+                    text(
+                        """
+                        WITH t AS (
+                            INSERT INTO topics (name, created_at)
+                            SELECT :prefix || g, timezone('utc', now())
+                            FROM generate_series(CAST(:first AS integer), CAST(:last AS integer)) AS g
+                            RETURNING id
+                        )
+                        INSERT INTO files (location_url, topic_id, size, format,
+                                           extraction_status, extraction_attempts,
+                                           page_count, created_at, updated_at)
+                        SELECT 'benchmark/search', t.id, 0, 'txt', 'completed', 1,
+                               CAST(:pages_per_file AS integer), timezone('utc', now()), timezone('utc', now())
+                        FROM t
+                        RETURNING id
+                        """
+                    ),
+                    {
+                        "prefix": TOPIC_PREFIX,
+                        "pages_per_file": pages_per_file,
+                        "first": first,
+                        "last": first + batch - 1,
+                    },
+                )
+            ).all()
+            # power(random(), 3) skews word choice towards the low (frequent) ranks
+            await db.execute(
+                text(
+                    """
+                    INSERT INTO file_pages (file_id, kind, page_index, text)
+                    SELECT f.id, 'page', p,
+                           (SELECT string_agg(
+                                       :prefix || floor(power(random(), 3) * :vocabulary)::int, ' ')
+                            FROM generate_series(1, CAST(:words_per_page AS integer))
+                            WHERE p >= 0)
+                    FROM unnest(CAST(:file_ids AS integer[])) AS f(id)
+                    CROSS JOIN generate_series(0, CAST(:pages_per_file AS integer) - 1) AS p
+                    """
+                ),
+                {
+                    "prefix": WORD_PREFIX,
+                    "vocabulary": vocabulary,
+                    "words_per_page": words_per_page,
+                    "file_ids": list(file_ids),
+                    "pages_per_file": pages_per_file,
+                },
+            )
+            await db.commit()
+    # Flush the GIN pending list and refresh statistics, as autovacuum would
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE file_pages"))
+    return time.perf_counter() - started
+
+
+def query_classes(vocabulary: int) -> dict[str, str]:
+    """One representative query per class, from most to least frequent terms."""
+    return {
+        "common_term": word(0),
+        "medium_term": word(vocabulary // 10),
+        "rare_term": word(vocabulary - 1),
+        "two_terms": f"{word(vocabulary // 10)} {word(vocabulary // 5)}",
+        "phrase": f'"{word(1)} {word(2)}"',
+        "no_match": "zzzzzz",
+    }
+
+
+async def measure(queries: dict[str, str], repeat: int, limit: int) -> dict[str, Any]:
+    """Run each query repeatedly (first run as warm-up) and report latencies."""
+    report: dict[str, Any] = {}
+    async with AsyncSessionLocal() as db:
+        for name, query in queries.items():
+            await SearchService.search_pages(db, query, limit=limit)
+            latencies: list[float] = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                rows = await SearchService.search_pages(db, query, limit=limit)
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+            report[name] = {
+                "query": query,
+                "results": len(rows),
+                "p50_ms": round(statistics.median(latencies), 2),
+                "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 2),
+                "max_ms": round(latencies[-1], 2),
+            }
+    return report
+
+
+async def cleanup() -> None:
+    """Delete the synthetic corpus and its topics (pages cascade)."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            text(
+                "DELETE FROM files WHERE topic_id IN "
+                "(SELECT id FROM topics WHERE name LIKE :pattern)"
+            ),
+            {"pattern": f"{TOPIC_PREFIX}%"},
+        )
+        await db.execute(
+            text("DELETE FROM topics WHERE name LIKE :pattern"), {"pattern": f"{TOPIC_PREFIX}%"}
+        )
+        await db.commit()
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Seed, measure and clean up; returns a JSON-serializable report."""
+    seed_seconds = None
+    try:
+        if not args.skip_seed:
+            seed_seconds = round(
+                await seed(args.pages, args.pages_per_file, args.words_per_page, args.vocabulary), 1
+            )
+        async with AsyncSessionLocal() as db:
+            indexed_pages = await db.scalar(
+                text(
+                    "SELECT count(*) FROM file_pages p JOIN files f ON f.id = p.file_id "
+                    "JOIN topics t ON t.id = f.topic_id WHERE t.name LIKE :pattern"
+                ),
+                {"pattern": f"{TOPIC_PREFIX}%"},
+            )
+        results = await measure(query_classes(args.vocabulary), args.repeat, args.limit)
+    finally:
+        if not args.keep:
+            await cleanup()
+        await engine.dispose()
+
+    return {
+        "pages": indexed_pages,
+        "words_per_page": args.words_per_page,
+        "vocabulary": args.vocabulary,
+        "search_max_candidates": settings.SEARCH_MAX_CANDIDATES,
+        "limit": args.limit,
+        "seed_seconds": seed_seconds,
+        "queries": results,
+    }
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--pages", type=int, default=100_000, help="synthetic pages to insert")
+    parser.add_argument("--pages-per-file", type=int, default=300)
+    parser.add_argument("--words-per-page", type=int, default=400)
+    parser.add_argument("--vocabulary", type=int, default=20_000, help="distinct words")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per query")
+    parser.add_argument("--limit", type=int, default=20, help="results per search")
+    parser.add_argument("--keep", action="store_true", help="keep the corpus for later runs")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse a kept corpus")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
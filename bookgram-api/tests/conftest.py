@@ -7,7 +7,9 @@ import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 
+from app.core.config import settings
 from app.main import app
+from app.services.cache import metadata_caches
 
 
 @pytest.fixture(scope="session")
@@ -27,3 +29,23 @@ async def client() -> AsyncGenerator[AsyncClient, None]:
         base_url="http://test",
     ) as ac:
         yield ac
+
+
+@pytest.fixture(autouse=True)
+def no_background_extraction(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Do not start chapter/page extraction from endpoint tests."""
+    monkeypatch.setattr(settings, "EXTRACTION_ENABLED", False)
+
+
+@pytest.fixture
+def internal_api(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Serve the /internal endpoints (disabled by default)."""
+    monkeypatch.setattr(settings, "INTERNAL_API_ENABLED", True)
+
+
+@pytest.fixture(autouse=True)
+def clear_metadata_caches() -> Generator[None, None, None]:
+    """Start every test with empty metadata caches."""
+    yield
+    for cache in metadata_caches:
+        cache.clear()
@@ -0,0 +1,206 @@
+"""Tests for upload admission control."""
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.admission import (
+    AdmissionRejectedError,
+    UploadAdmission,
+    client_address,
+    upload_admission,
+)
+from app.core.config import settings
+from app.core.metrics import UPLOAD_ADMISSION_REJECTED_TOTAL
+from app.services.file_service import FileService
+
+# Rejected by content validation, so an admitted request never reaches the database
+BINARY_TXT = {"file": ("book.txt", b"\x00\x01\x02", "text/plain")}
+
+
+def multipart_body(content: bytes) -> bytes:
+    """A save form with title and user_id before a text file of the given content."""
+    return (
+        b'--b\r\nContent-Disposition: form-data; name="title"\r\n\r\nBig\r\n'
+        b'--b\r\nContent-Disposition: form-data; name="user_id"\r\n\r\n1\r\n'
+        b'--b\r\nContent-Disposition: form-data; name="file"; filename="big.txt"\r\n'
+        b"Content-Type: text/plain\r\n\r\n" + content + b"\r\n--b--\r\n"
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_admission():
+    """Start every test with no upload in flight."""
+    upload_admission.clear()
+    yield
+    upload_admission.clear()
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Small admission limits."""
+    monkeypatch.setattr(settings, "UPLOAD_MAX_CONCURRENT", 3)
+    monkeypatch.setattr(settings, "UPLOAD_MAX_INFLIGHT_BYTES", 1000)
+    monkeypatch.setattr(settings, "UPLOAD_MAX_CONCURRENT_PER_USER", 2)
+    monkeypatch.setattr(settings, "UPLOAD_MAX_INFLIGHT_BYTES_PER_USER", 500)
+
+
+class TestUploadAdmission:
+    """Test in-flight accounting."""
+
+    @pytest.mark.usefixtures("limits")
+    @pytest.mark.parametrize(
+        ("admitted", "request_", "reason"),
+        [
+            ([("a", 1), ("a", 1)], ("a", 1), "user_concurrency"),
+            ([("a", 400)], ("a", 200), "user_bytes"),
+            ([("a", 1), ("b", 1), ("c", 1)], ("d", 1), "concurrency"),
+            ([("a", 450), ("b", 450)], ("c", 200), "bytes"),
+        ],
+        ids=["user_concurrency", "user_bytes", "concurrency", "bytes"],
+    )
+    def test_limits(self, admitted, request_, reason):
+        """Test each global and per-user limit."""
+        admission = UploadAdmission()
+        for user, size in admitted:
+            admission.acquire(user, size)
+
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            admission.acquire(*request_)
+        assert exc_info.value.reason == reason
+
+    @pytest.mark.usefixtures("limits")
+    def test_release_frees_capacity(self):
+        """Test finished requests no longer count."""
+        admission = UploadAdmission()
+        admission.acquire("a", 300)
+        admission.acquire("a", 100)
+        admission.release("a", 300)
+
+        admission.acquire("a", 300)
+        admission.release("a", 300)
+        admission.release("a", 100)
+
+        assert admission.stats() == {"uploads": 0, "bytes": 0, "users": 0, "busiest_users": []}
+
+    @pytest.mark.usefixtures("limits")
+    def test_oversized_request_admitted_alone(self):
+        """Test a request larger than the byte budget is admitted when nothing else is in flight."""
+        admission = UploadAdmission()
+        admission.acquire("a", 5000)
+
+        with pytest.raises(AdmissionRejectedError):
+            admission.acquire("b", 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("limits")
+async def test_over_limit_upload_gets_429(client: AsyncClient, tmp_path, monkeypatch):
+    """Test a user over their limit gets 429 with Retry-After while other users get through."""
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(settings, "UPLOAD_RETRY_AFTER", 7)
+    upload_admission.acquire("user:1", 0)
+    upload_admission.acquire("user:1", 0)
+    rejected = UPLOAD_ADMISSION_REJECTED_TOTAL.value(reason="user_concurrency")
+
+    response = await client.post(
+        "/api/v1/files/save",
+        files=BINARY_TXT,
+        data={"title": "Busy", "user_id": "1"},
+        headers={"X-User-Id": "1"},
+    )
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+    assert "user concurrency" in response.json()["detail"]
+    assert UPLOAD_ADMISSION_REJECTED_TOTAL.value(reason="user_concurrency") == rejected + 1
+
+    response = await client.post(
+        "/api/v1/files/save",
+        files=BINARY_TXT,
+        data={"title": "Idle", "user_id": "2"},
+        headers={"X-User-Id": "2"},
+    )
+    assert response.status_code == 400
+    # Released once the request finished
+    assert upload_admission.stats()["uploads"] == 2
+
+
+@pytest.mark.asyncio
+async def test_content_length_over_maximum_gets_413(client: AsyncClient, monkeypatch):
+    """Test a request declaring a body over the maximum is refused without being read."""
+    monkeypatch.setattr(settings, "MAX_UPLOAD_REQUEST_SIZE", 100)
+
+    response = await client.put(
+        "/api/v1/uploads/abc?offset=0", content=b"x" * 101, headers={"X-User-Id": "1"}
+    )
+
+    assert response.status_code == 413
+    assert upload_admission.stats()["uploads"] == 0
+
+
+@pytest.mark.asyncio
+async def test_other_requests_not_admitted(client: AsyncClient, monkeypatch):
+    """Test requests other than uploads pass through."""
+    monkeypatch.setattr(settings, "UPLOAD_MAX_CONCURRENT", 1)
+    upload_admission.acquire("user:1", 0)
+
+    response = await client.get("/livez")
+
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_chunked_body_over_maximum_gets_413(client: AsyncClient, tmp_path, monkeypatch):
+    """Test a body without Content-Length is cut off once it grows past the maximum."""
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(settings, "MAX_UPLOAD_REQUEST_SIZE", 500)
+    body = multipart_body(b"x" * 2000)
+    sent = 0
+
+    async def chunks():
+        nonlocal sent
+        for start in range(0, len(body), 100):
+            sent += 100
+            yield body[start : start + 100]
+
+    response = await client.post(
+        "/api/v1/files/save",
+        content=chunks(),
+        headers={"Content-Type": "multipart/form-data; boundary=b"},
+    )
+
+    assert response.status_code == 413
+    assert "maximum size of 500 bytes" in response.json()["detail"]
+    assert sent < len(body)
+    assert upload_admission.stats()["uploads"] == 0
+
+
+@pytest.mark.asyncio
+async def test_user_id_must_match_admitted_user(client: AsyncClient, tmp_path, monkeypatch):
+    """Test a form user_id other than X-User-Id is refused before the file is stored."""
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+
+    response = await client.post(
+        "/api/v1/files/save",
+        content=multipart_body(b"text"),
+        headers={"Content-Type": "multipart/form-data; boundary=b", "X-User-Id": "2"},
+    )
+
+    assert response.status_code == 400
+    assert "X-User-Id" in response.json()["detail"]
+    assert not [path for path in tmp_path.rglob("*") if path.is_file()]
+
+
+@pytest.mark.parametrize(
+    ("header", "headers", "address"),
+    [
+        ("", [(b"x-forwarded-for", b"6.6.6.6")], "10.0.0.1"),
+        ("X-Forwarded-For", [(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7")], "203.0.113.7"),
+        ("X-Forwarded-For", [], "10.0.0.1"),
+    ],
+    ids=["connection", "trusted_header", "header_missing"],
+)
+def test_client_address(monkeypatch, header, headers, address):
+    """Test the forwarded address is only used from the configured header."""
+    monkeypatch.setattr(settings, "UPLOAD_CLIENT_ADDRESS_HEADER", header)
+
+    assert client_address({"headers": headers, "client": ("10.0.0.1", 5000)}) == address
@@ -0,0 +1,71 @@
+"""Tests for the batch SaveFile endpoint."""
+
+import io
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.db.models.file import File
+from app.services.file_service import FileService
+
+
+class TestBatchUpload:
+    """Test the save-batch endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_batch_reports_per_file_outcome(self, client: AsyncClient, tmp_path, monkeypatch):
+        """Test valid files are saved together and invalid ones reported."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        files = [
+            ("files", ("one.txt", io.BytesIO(b"first book"), "text/plain")),
+            ("files", ("two.exe", io.BytesIO(b"binary"), "application/octet-stream")),
+            ("files", ("three.md", io.BytesIO(b""), "text/markdown")),
+            ("files", ("four.md", io.BytesIO(b"fourth book"), "text/markdown")),
+        ]
+        data = {"titles": ["One", "Two", "Three", "Four"], "user_id": "1"}
+
+        with (
+            patch(
+                "app.api.v1.files.BlobService.acquire_many", new_callable=AsyncMock
+            ) as mock_acquire,
+            patch(
+                "app.api.v1.files.FileService.create_file_records", new_callable=AsyncMock
+            ) as mock_create,
+            patch(
+                "app.api.v1.files.UserService.subscribe_user_to_topics", new_callable=AsyncMock
+            ) as mock_subscribe,
+        ):
+            mock_create.return_value = [File(id=1, topic="one"), File(id=2, topic="four")]
+
+            response = await client.post("/api/v1/files/save-batch", files=files, data=data)
+
+            assert response.status_code == 200
+            body = response.json()
+            assert body["saved"] == 2
+            assert body["failed"] == 2
+            statuses = [(r["filename"], r["status"], r["file_id"]) for r in body["results"]]
+            assert statuses == [
+                ("one.txt", "saved", 1),
+                ("two.exe", "failed", None),
+                ("three.md", "failed", None),
+                ("four.md", "saved", 2),
+            ]
+            assert "empty" in body["results"][2]["error"].lower()
+
+            # One call per stage, covering every stored file
+            assert len(mock_acquire.call_args.kwargs["blobs"]) == 2
+            records = mock_create.call_args.kwargs["records"]
+            assert [(r["topic"], r["format"]) for r in records] == [("one", "txt"), ("four", "md")]
+            mock_subscribe.assert_called_once()
+            assert mock_subscribe.call_args.kwargs["topics"] == ["one", "four"]
+
+    @pytest.mark.asyncio
+    async def test_batch_title_count_mismatch(self, client: AsyncClient):
+        """Test a batch needs exactly one title per file."""
+        files = [("files", ("one.txt", io.BytesIO(b"first"), "text/plain"))]
+        data = {"titles": ["One", "Two"], "user_id": "1"}
+
+        response = await client.post("/api/v1/files/save-batch", files=files, data=data)
+
+        assert response.status_code == 400
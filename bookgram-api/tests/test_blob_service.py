@@ -0,0 +1,87 @@
+"""Tests for blob service."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.blob_service import BlobService
+
+
+class TestBlobService:
+    """Test BlobService class."""
+
+    @pytest.mark.asyncio
+    async def test_acquire_returns_refcount(self):
+        """Test acquiring a blob is a single upsert returning the refcount."""
+        mock_db = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.scalar_one.return_value = 2
+        mock_db.execute.return_value = mock_result
+
+        refcount = await BlobService.acquire(
+            db=mock_db,
+            checksum="a" * 64,
+            location_url="uploads/" + "a" * 64,
+            size=1024,
+        )
+
+        assert refcount == 2
+        mock_db.execute.assert_called_once()
+        statement = str(mock_db.execute.call_args.args[0])
+        assert "ON CONFLICT" in statement
+
+    @pytest.mark.asyncio
+    async def test_acquire_many_upserts_in_checksum_order(self):
+        """Test duplicates are folded and rows are locked in a consistent (checksum) order."""
+        mock_db = AsyncMock()
+
+        await BlobService.acquire_many(
+            db=mock_db,
+            blobs=[
+                ("c" * 64, "uploads/c", 3),
+                ("a" * 64, "uploads/a", 1),
+                ("c" * 64, "uploads/c", 3),
+            ],
+        )
+
+        mock_db.execute.assert_called_once()
+        params = mock_db.execute.call_args.args[0].compile().params
+        assert [params["checksum_m0"], params["checksum_m1"]] == ["a" * 64, "c" * 64]
+        assert [params["refcount_m0"], params["refcount_m1"]] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_release_keeps_shared_blob(self):
+        """Test releasing one of several references keeps the blob row."""
+        mock_db = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = 1
+        mock_db.execute.return_value = mock_result
+
+        refcount = await BlobService.release(db=mock_db, checksum="a" * 64)
+
+        assert refcount == 1
+        mock_db.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_release_last_reference_deletes_blob(self):
+        """Test releasing the last reference deletes the blob row."""
+        mock_db = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = 0
+        mock_db.execute.return_value = mock_result
+
+        refcount = await BlobService.release(db=mock_db, checksum="a" * 64)
+
+        assert refcount == 0
+        assert mock_db.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_release_unknown_blob(self):
+        """Test releasing an unknown blob raises error."""
+        mock_db = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = None
+        mock_db.execute.return_value = mock_result
+
+        with pytest.raises(ValueError, match="not found"):
+            await BlobService.release(db=mock_db, checksum="b" * 64)
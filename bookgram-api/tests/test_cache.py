@@ -0,0 +1,208 @@
+"""Tests for the metadata cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.user import User
+from app.services.cache import MetadataCache, detached_copy, user_cache
+from app.services.user_service import UserService
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_cache(max_entries: int = 10, ttl: float = 30.0) -> tuple[MetadataCache, FakeClock]:
+    clock = FakeClock()
+    return MetadataCache("test", max_entries, ttl, clock=clock), clock
+
+
+class TestMetadataCache:
+    """Test LRU, TTL, single-flight and invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_hit_and_miss(self):
+        """Test a loaded value is served from the cache, including None."""
+        cache, _ = make_cache()
+        loader = AsyncMock(return_value=None)
+
+        assert await cache.get_or_load("a", loader) is None
+        assert await cache.get_or_load("a", loader) is None
+
+        loader.assert_awaited_once()
+        assert (cache.stats.misses, cache.stats.hits) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test the least recently used key is evicted beyond max_entries."""
+        cache, _ = make_cache(max_entries=2)
+        await cache.get_or_load("a", AsyncMock(return_value=1))
+        await cache.get_or_load("b", AsyncMock(return_value=2))
+        await cache.get_or_load("a", AsyncMock())
+        await cache.get_or_load("c", AsyncMock(return_value=3))
+
+        reload_b = AsyncMock(return_value=2)
+        assert await cache.get_or_load("a", AsyncMock()) == 1
+        assert await cache.get_or_load("b", reload_b) == 2
+        reload_b.assert_awaited_once()
+        assert cache.stats.evictions == 2
+        assert len(cache) == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        """Test entries are reloaded once their TTL has passed."""
+        cache, clock = make_cache(ttl=10)
+        loader = AsyncMock(side_effect=[1, 2])
+
+        assert await cache.get_or_load("a", loader) == 1
+        clock.now = 9.9
+        assert await cache.get_or_load("a", loader) == 1
+        clock.now = 10.0
+        assert await cache.get_or_load("a", loader) == 2
+        assert cache.stats.expirations == 1
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self):
+        """Test concurrent misses for one key share a single load."""
+        cache, _ = make_cache()
+        release = asyncio.Event()
+        calls = 0
+
+        async def loader() -> str:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "value"
+
+        tasks = [asyncio.create_task(cache.get_or_load("a", loader)) for _ in range(50)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == ["value"] * 50
+        assert calls == 1
+        assert (cache.stats.misses, cache.stats.coalesced) == (1, 49)
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """Test a failed load is shared by its waiters but not stored."""
+        cache, _ = make_cache()
+        release = asyncio.Event()
+
+        async def failing() -> None:
+            await release.wait()
+            raise RuntimeError("db down")
+
+        tasks = [asyncio.create_task(cache.get_or_load("a", failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await cache.get_or_load("a", AsyncMock(return_value=1)) == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_load_is_retried_by_waiters(self):
+        """Test waiters load the key themselves if the loading coroutine is cancelled."""
+        cache, _ = make_cache()
+        started = asyncio.Event()
+
+        async def hanging() -> int:
+            started.set()
+            await asyncio.Event().wait()
+            return 0
+
+        leader = asyncio.create_task(cache.get_or_load("a", hanging))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get_or_load("a", AsyncMock(return_value=2)))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await waiter == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_load(self):
+        """Test a load running when its key is invalidated does not store its result."""
+        cache, _ = make_cache()
+        release = asyncio.Event()
+
+        async def old_value() -> str:
+            await release.wait()
+            return "old"
+
+        task = asyncio.create_task(cache.get_or_load("a", old_value))
+        await asyncio.sleep(0)
+        cache.invalidate("a")
+        release.set()
+
+        assert await task == "old"
+        assert await cache.get_or_load("a", AsyncMock(return_value="new")) == "new"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_on_commit(self):
+        """Test keys are invalidated when the session commits, not on rollback."""
+        cache, _ = make_cache()
+        await cache.get_or_load("a", AsyncMock(return_value=1))
+
+        async with AsyncSession() as db:
+            cache.invalidate_on_commit(db, "a")
+            await db.rollback()
+            assert await cache.get_or_load("a", AsyncMock()) == 1
+
+            cache.invalidate_on_commit(db, "a")
+            assert await cache.get_or_load("a", AsyncMock()) == 1
+            await db.commit()
+
+        assert await cache.get_or_load("a", AsyncMock(return_value=2)) == 2
+        assert cache.stats.invalidations == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        """Test a zero TTL disables caching."""
+        cache, _ = make_cache(ttl=0)
+        loader = AsyncMock(return_value=1)
+
+        await cache.get_or_load("a", loader)
+        await cache.get_or_load("a", loader)
+
+        assert loader.await_count == 2
+        assert len(cache) == 0
+
+
+class TestCachedLookups:
+    """Test services serve hot rows from the cache."""
+
+    @pytest.mark.asyncio
+    async def test_get_user_is_cached(self):
+        """Test repeated get_user calls run one query and return a detached snapshot."""
+        mock_db = AsyncMock(info={})
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = User(id=1, email="a@b.c", username="a")
+        mock_db.execute.return_value = result
+
+        first = await UserService.get_user(mock_db, 1)
+        second = await UserService.get_user(mock_db, 1)
+
+        assert first is second
+        assert first.username == "a"
+        mock_db.execute.assert_awaited_once()
+        assert user_cache.stats.hits == 1
+
+    def test_detached_copy(self):
+        """Test the copy keeps the loaded columns and is detached."""
+        user = User(id=1, email="a@b.c", username="a")
+
+        copy = detached_copy(user)
+
+        assert copy is not user
+        assert (copy.id, copy.email, copy.username) == (1, "a@b.c", "a")
+        assert inspect(copy).detached
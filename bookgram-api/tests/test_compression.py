@@ -0,0 +1,89 @@
+"""Tests for streaming decompression of uploads."""
+
+import bz2
+import gzip
+import lzma
+from collections.abc import AsyncIterator
+
+import pytest
+
+from app.services.compression import detect_compression
+from app.services.exceptions import CorruptUploadError, UploadTooLargeError
+from app.services.file_service import FileService
+
+CONTENT = b"Chapter 1\nIt was a bright cold day in April.\n" * 200
+
+
+async def body_stream(data: bytes, piece_size: int = 100) -> AsyncIterator[bytes]:
+    """A request body arriving in small pieces."""
+    for start in range(0, len(data), piece_size):
+        yield data[start : start + piece_size]
+
+
+async def read_content(data: bytes, **kwargs) -> bytes:
+    """Collect the decompressed content of an upload body."""
+    return b"".join(
+        [chunk async for chunk in FileService.iter_stream_content(body_stream(data), **kwargs)]
+    )
+
+
+class TestCompression:
+    """Test compressed upload handling."""
+
+    def test_detect_compression(self):
+        """Test compression formats are detected by magic bytes."""
+        assert detect_compression(gzip.compress(b"x")) == "gzip"
+        assert detect_compression(bz2.compress(b"x")) == "bz2"
+        assert detect_compression(lzma.compress(b"x")) == "xz"
+        assert detect_compression(b"\x28\xb5\x2f\xfd\x00") == "zstd"
+        assert detect_compression(b"plain text") is None
+        assert detect_compression(b"") is None
+
+    def test_get_content_extension(self):
+        """Test compression suffixes are skipped when resolving the format."""
+        assert FileService.get_content_extension("book.txt.gz") == "txt"
+        assert FileService.get_content_extension("notes.MD.xz") == "md"
+        assert FileService.get_content_extension("book.epub.zst") == "epub"
+        assert FileService.get_content_extension("book.txt") == "txt"
+        assert FileService.get_content_extension("archive.gz") == ""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("compress", [gzip.compress, bz2.compress, lzma.compress])
+    async def test_decompresses_stream(self, compress):
+        """Test compressed uploads are decompressed in bounded chunks."""
+        chunks = [
+            chunk
+            async for chunk in FileService.iter_stream_content(
+                body_stream(compress(CONTENT)), chunk_size=1024
+            )
+        ]
+
+        assert b"".join(chunks) == CONTENT
+        assert max(len(chunk) for chunk in chunks) <= 1024
+
+    @pytest.mark.asyncio
+    async def test_decompresses_zstd(self):
+        """Test zstd uploads are decompressed when zstandard is installed."""
+        zstandard = pytest.importorskip("zstandard")
+        compressed = zstandard.ZstdCompressor().compress(CONTENT)
+
+        assert await read_content(compressed) == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_uncompressed_passthrough(self):
+        """Test plain uploads are returned unchanged."""
+        assert await read_content(CONTENT, chunk_size=100) == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_compression_bomb_rejected(self):
+        """Test the size limit applies to decompressed bytes."""
+        bomb = gzip.compress(b"\0" * (8 * 1024 * 1024))
+
+        with pytest.raises(UploadTooLargeError):
+            await read_content(bomb, chunk_size=64 * 1024, max_size=1024 * 1024)
+
+    @pytest.mark.asyncio
+    async def test_truncated_stream_rejected(self):
+        """Test a truncated compressed stream is reported as corrupted."""
+        with pytest.raises(CorruptUploadError):
+            await read_content(gzip.compress(CONTENT)[:50])
@@ -0,0 +1,75 @@
+"""Tests for the upload session expiry script."""
+
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.scripts import expire_uploads
+from app.scripts.expire_uploads import ExpiryStats, expire_sessions, remove_stray_partials
+from app.services.file_service import FileService
+from app.services.upload_service import UploadService
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """Mock session returned by the script's AsyncSessionLocal."""
+    mock_db = AsyncMock()
+    session = MagicMock()
+    session.__aenter__.return_value = mock_db
+    monkeypatch.setattr(expire_uploads, "AsyncSessionLocal", MagicMock(return_value=session))
+    return mock_db
+
+
+def write_partial(name: str, age: float = 0):
+    """Write a partial file last modified age seconds ago."""
+    path = UploadService.partial_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"partial")
+    modified = time.time() - age
+    os.utime(path, (modified, modified))
+    return path
+
+
+class TestExpireUploads:
+    """Test the upload session expiry script."""
+
+    @pytest.mark.asyncio
+    async def test_expired_sessions_lose_partial_files_after_commit(
+        self, tmp_path, monkeypatch, mock_db
+    ):
+        """Test partial files are removed batch by batch, once the expiry has committed."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        first, second, kept = write_partial("a"), write_partial("b"), write_partial("c")
+        stats = ExpiryStats()
+
+        with patch(
+            "app.scripts.expire_uploads.UploadService.expire_sessions", new_callable=AsyncMock
+        ) as mock_expire:
+            mock_expire.side_effect = [["a", "b"], []]
+            await expire_sessions(2, stats)
+
+        assert stats == ExpiryStats(expired=2)
+        assert mock_db.commit.call_count == 2
+        assert not first.exists() and not second.exists()
+        assert kept.exists()
+
+    @pytest.mark.asyncio
+    async def test_stray_partials_removed(self, tmp_path, monkeypatch, mock_db):
+        """Test old partial files without an active session are removed."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        monkeypatch.setattr(settings, "UPLOAD_SESSION_TTL", 3600)
+        active = write_partial("active", age=7200)
+        orphan = write_partial("orphan", age=7200)
+        orphan_link = write_partial("orphan.blob", age=7200)
+        recent = write_partial("recent")
+        mock_db.scalars.return_value = ["active"]
+        stats = ExpiryStats()
+
+        await remove_stray_partials(500, stats)
+
+        assert stats == ExpiryStats(stray_files=2)
+        assert active.exists() and recent.exists()
+        assert not orphan.exists() and not orphan_link.exists()
@@ -0,0 +1,328 @@
+"""Tests for chapter/page extraction."""
+
+import zipfile
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.db.models.file import File
+from app.services import extraction
+from app.services.exceptions import (
+    ExtractionError,
+    ExtractionInProgressError,
+    PermanentJobError,
+)
+from app.services.extraction import (
+    ExtractedDocument,
+    Segment,
+    extract_document,
+    html_to_text,
+    split_pages,
+)
+from app.services.extraction_service import EXTRACT_FILE, ExtractionService
+from app.services.page_index import index_path
+
+CONTAINER_XML = """<?xml version="1.0"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>"""
+
+PACKAGE_OPF = """<?xml version="1.0"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0">
+  <manifest>
+    <item id="c2" href="text/chapter%202.xhtml" media-type="application/xhtml+xml"/>
+    <item id="c1" href="text/chapter1.xhtml" media-type="application/xhtml+xml"/>
+  </manifest>
+  <spine>
+    <itemref idref="c1"/>
+    <itemref idref="c2"/>
+  </spine>
+</package>"""
+
+
+def write_epub(path, chapters: dict[str, str]) -> None:
+    """Write a minimal EPUB with the given chapter documents."""
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("mimetype", "application/epub+zip")
+        archive.writestr("META-INF/container.xml", CONTAINER_XML)
+        archive.writestr("OEBPS/content.opf", PACKAGE_OPF)
+        for name, body in chapters.items():
+            archive.writestr(
+                f"OEBPS/text/{name}",
+                f"<html><head><title>x</title></head><body>{body}</body></html>",
+            )
+
+
+def session_factory() -> MagicMock:
+    """Mock AsyncSessionLocal usable as an async context manager."""
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock()
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory
+
+
+class TestExtraction:
+    """Test the document parsers."""
+
+    def test_split_pages_breaks_at_paragraphs(self):
+        """Test pages stay within the size and break between paragraphs."""
+        text = "\n\n".join(f"Paragraph {i} " + "word " * 20 for i in range(20))
+
+        pages = split_pages(text, page_size=400)
+
+        assert len(pages) > 1
+        assert all(len(page) <= 400 for page in pages)
+        assert all(page.endswith("\n\n") for page in pages[:-1])
+        assert "".join(pages) == text
+
+    def test_split_pages_hard_cut_without_whitespace(self):
+        """Test text without any break point is cut at the page size."""
+        assert split_pages("x" * 25, page_size=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+    def test_text_chapters_from_headings(self, tmp_path):
+        """Test plain-text chapters start at 'Chapter' lines, keeping front matter."""
+        path = tmp_path / "book.txt"
+        path.write_text("Title page\n\nCHAPTER 1\nIt begins.\n\nChapter Two\nIt ends.\n")
+
+        document = extract_document(str(path), "txt", page_size=1000)
+
+        assert [chapter.text for chapter in document.chapters] == [
+            "Title page\n\n",
+            "CHAPTER 1\nIt begins.\n\n",
+            "Chapter Two\nIt ends.\n",
+        ]
+        assert len(document.pages) == 1
+        # The page index is stored next to the file
+        assert index_path(path).exists()
+
+    def test_text_segments_have_byte_ranges(self, tmp_path):
+        """Test byte ranges address the stored bytes, including multi-byte and invalid UTF-8."""
+        content = "Préface\n\nChapter 1\nÉté \u2014 fin.\n".encode() + b"\xff\n\nChapter 2\nEnd\n"
+        path = tmp_path / "book.txt"
+        path.write_bytes(content)
+
+        document = extract_document(str(path), "txt", page_size=12)
+
+        for segment in document.chapters + document.pages:
+            raw = content[segment.byte_offset : segment.byte_offset + segment.byte_length]
+            assert raw.decode("utf-8", errors="replace") == segment.text
+        assert document.chapters[1].text == "Chapter 1\nÉté \u2014 fin.\n\ufffd\n\n"
+        # Pages cover the file and never split a character
+        assert (
+            b"".join(
+                content[page.byte_offset : page.byte_offset + page.byte_length]
+                for page in document.pages
+            )
+            == content
+        )
+        assert all(page.text.count("\ufffd") <= 1 for page in document.pages)
+
+    def test_markdown_chapters_from_headings(self, tmp_path):
+        """Test Markdown chapters start at H1/H2 headings only."""
+        path = tmp_path / "book.md"
+        path.write_text("# One\ntext\n### detail\nmore\n## Two\ntext\n")
+
+        document = extract_document(str(path), "md", page_size=1000)
+
+        assert [chapter.text for chapter in document.chapters] == [
+            "# One\ntext\n### detail\nmore\n",
+            "## Two\ntext\n",
+        ]
+
+    def test_epub_chapters_follow_spine(self, tmp_path):
+        """Test EPUB chapters are the spine documents in reading order."""
+        path = tmp_path / "book.epub"
+        write_epub(
+            path,
+            {
+                "chapter 2.xhtml": "<h1>Two</h1><p>Second &amp; last.</p>",
+                "chapter1.xhtml": "<h1>One</h1><p>First.</p><script>ignored()</script>",
+            },
+        )
+
+        document = extract_document(str(path), "epub", page_size=1000)
+
+        assert [chapter.text for chapter in document.chapters] == [
+            "One\n\nFirst.",
+            "Two\n\nSecond & last.",
+        ]
+        assert document.pages == document.chapters
+        assert document.pages[0].byte_offset is None
+
+    def test_invalid_epub_raises(self, tmp_path):
+        """Test a file that is not a valid EPUB fails permanently."""
+        path = tmp_path / "book.epub"
+        path.write_bytes(b"not a zip")
+
+        with pytest.raises(ExtractionError, match="Invalid EPUB"):
+            extract_document(str(path), "epub", page_size=1000)
+
+    def test_pdf_requires_pypdf(self, tmp_path, monkeypatch):
+        """Test PDF extraction reports the missing optional dependency."""
+        monkeypatch.setattr(extraction, "PdfReader", None)
+
+        with pytest.raises(ExtractionError, match="pypdf"):
+            extract_document(str(tmp_path / "book.pdf"), "pdf", page_size=1000)
+
+    def test_html_to_text_skips_head(self):
+        """Test markup, head and scripts are dropped."""
+        assert html_to_text("<head><style>p{}</style></head><p>a  b</p><p>c</p>") == "a b\n\nc"
+
+
+class TestExtractionService:
+    """Test the extraction job runner."""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_respects_setting(self, monkeypatch):
+        """Test outbox jobs are only recorded when extraction is enabled."""
+        mock_db = AsyncMock()
+        assert await ExtractionService.enqueue(mock_db, [1]) == []
+        mock_db.scalars.assert_not_called()
+
+        monkeypatch.setattr(settings, "EXTRACTION_ENABLED", True)
+        result = MagicMock()
+        result.all.return_value = [10, 11]
+        mock_db.scalars.return_value = result
+
+        assert await ExtractionService.enqueue(mock_db, [1, 2]) == [10, 11]
+        assert mock_db.scalars.call_args.args[1] == [
+            {"kind": EXTRACT_FILE, "payload": {"file_id": 1}},
+            {"kind": EXTRACT_FILE, "payload": {"file_id": 2}},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_process_stores_result(self):
+        """Test a successful extraction is written back to the file."""
+        document = ExtractedDocument(chapters=[Segment("c")], pages=[Segment("p")])
+        file_record = File(id=1, location_url="uploads/x", format="txt", extraction_attempts=1)
+
+        with (
+            patch("app.services.extraction_service.AsyncSessionLocal", session_factory()),
+            patch.object(ExtractionService, "claim", new_callable=AsyncMock) as mock_claim,
+            patch.object(ExtractionService, "complete", new_callable=AsyncMock) as mock_complete,
+            patch(
+                "app.services.extraction_service.extraction_pool.extract", new_callable=AsyncMock
+            ) as mock_extract,
+        ):
+            mock_claim.return_value = file_record
+            mock_extract.return_value = document
+
+            await ExtractionService.process({"file_id": 1}, 1)
+
+            mock_extract.assert_awaited_once_with("uploads/x", "txt", settings.EXTRACTION_PAGE_SIZE)
+            assert mock_complete.call_args.args[1:] == (1, document)
+
+    @pytest.mark.asyncio
+    async def test_process_retries_transient_errors(self, monkeypatch):
+        """Test transient errors are raised for a retry until the outbox attempt budget is spent."""
+        monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 2)
+
+        with (
+            patch("app.services.extraction_service.AsyncSessionLocal", session_factory()),
+            patch.object(ExtractionService, "claim", new_callable=AsyncMock) as mock_claim,
+            patch.object(ExtractionService, "fail", new_callable=AsyncMock) as mock_fail,
+            patch(
+                "app.services.extraction_service.extraction_pool.extract", new_callable=AsyncMock
+            ) as mock_extract,
+        ):
+            mock_claim.side_effect = [
+                File(id=1, location_url="x", format="txt", extraction_attempts=1),
+                File(id=1, location_url="x", format="txt", extraction_attempts=2),
+            ]
+            mock_extract.side_effect = OSError("disk hiccup")
+
+            with pytest.raises(OSError):
+                await ExtractionService.process({"file_id": 1}, 1)
+            with pytest.raises(PermanentJobError, match="disk hiccup"):
+                await ExtractionService.process({"file_id": 1}, 2)
+
+            assert mock_extract.await_count == 2
+            assert [call.kwargs["retry"] for call in mock_fail.call_args_list] == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_process_does_not_retry_unparseable_documents(self):
+        """Test documents that cannot be parsed fail without retrying."""
+        with (
+            patch("app.services.extraction_service.AsyncSessionLocal", session_factory()),
+            patch.object(ExtractionService, "claim", new_callable=AsyncMock) as mock_claim,
+            patch.object(ExtractionService, "fail", new_callable=AsyncMock) as mock_fail,
+            patch(
+                "app.services.extraction_service.extraction_pool.extract", new_callable=AsyncMock
+            ) as mock_extract,
+        ):
+            mock_claim.return_value = File(
+                id=1, location_url="x", format="epub", extraction_attempts=1
+            )
+            mock_extract.side_effect = ExtractionError("Invalid EPUB")
+
+            with pytest.raises(PermanentJobError):
+                await ExtractionService.process({"file_id": 1}, 1)
+
+            mock_claim.assert_awaited_once()
+            assert mock_fail.call_args.args[2] == "Invalid EPUB"
+            assert mock_fail.call_args.kwargs["retry"] is False
+
+    @pytest.mark.asyncio
+    async def test_process_skips_unclaimed_job(self):
+        """Test nothing runs when the job is not pending."""
+        with (
+            patch("app.services.extraction_service.AsyncSessionLocal", session_factory()),
+            patch.object(ExtractionService, "claim", new_callable=AsyncMock) as mock_claim,
+            patch(
+                "app.services.extraction_service.extraction_pool.extract", new_callable=AsyncMock
+            ) as mock_extract,
+        ):
+            mock_claim.return_value = None
+
+            await ExtractionService.process({"file_id": 1}, 1)
+
+            mock_extract.assert_not_called()
+
+
+class TestExtractionEndpoints:
+    """Test the extraction status endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_get_status(self, client: AsyncClient):
+        """Test the job status is reported."""
+        file_record = File(
+            id=3, extraction_status="failed", extraction_attempts=3, extraction_error="boom"
+        )
+        with patch("app.api.v1.files.FileService.get_file", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = file_record
+
+            response = await client.get("/api/v1/files/3/extraction")
+
+            assert response.status_code == 200
+            assert response.json() == {
+                "file_id": 3,
+                "status": "failed",
+                "attempts": 3,
+                "error": "boom",
+            }
+
+    @pytest.mark.asyncio
+    async def test_get_status_not_found(self, client: AsyncClient):
+        """Test an unknown file returns 404."""
+        with patch("app.api.v1.files.FileService.get_file", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = None
+
+            response = await client.get("/api/v1/files/99/extraction")
+
+            assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_retry_while_running_conflicts(self, client: AsyncClient):
+        """Test a running job cannot be requeued."""
+        with patch(
+            "app.api.v1.files.ExtractionService.requeue", new_callable=AsyncMock
+        ) as mock_requeue:
+            mock_requeue.side_effect = ExtractionInProgressError("in progress")
+
+            response = await client.post("/api/v1/files/3/extraction")
+
+            assert response.status_code == 409
@@ -0,0 +1,121 @@
+"""Tests for the file download endpoint."""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.db.models.file import File
+
+CONTENT = b"0123456789" * 10
+CHECKSUM = "a" * 64
+CREATED_AT = datetime(2026, 1, 2, 3, 4, 5, 678000)
+
+
+@pytest.fixture
+def stored_file(tmp_path):
+    """A stored file and its record."""
+    path = tmp_path / "blob"
+    path.write_bytes(CONTENT)
+    file_record = File(
+        id=1,
+        location_url=str(path),
+        checksum=CHECKSUM,
+        topic="book",
+        size=len(CONTENT),
+        format="txt",
+        created_at=CREATED_AT,
+        # Moved by extraction after the content was saved
+        updated_at=datetime(2026, 3, 1),
+    )
+    with patch("app.api.v1.files.FileService.get_file", new_callable=AsyncMock) as mock_get_file:
+        mock_get_file.return_value = file_record
+        yield file_record
+
+
+class TestFileContent:
+    """Test GET /files/{id}/content."""
+
+    @pytest.mark.asyncio
+    async def test_download(self, client: AsyncClient, stored_file):
+        """Test the full content is served with validators."""
+        response = await client.get("/api/v1/files/1/content")
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["etag"] == f'"{CHECKSUM}"'
+        assert response.headers["last-modified"] == "Fri, 02 Jan 2026 03:04:05 GMT"
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-type"] == "text/plain; charset=utf-8"
+        assert response.headers["content-disposition"] == 'inline; filename="book.txt"'
+
+    @pytest.mark.asyncio
+    async def test_range_request(self, client: AsyncClient, stored_file):
+        """Test a byte range returns 206 with only that range."""
+        response = await client.get("/api/v1/files/1/content", headers={"Range": "bytes=10-19"})
+
+        assert response.status_code == 206
+        assert response.content == CONTENT[10:20]
+        assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+    @pytest.mark.asyncio
+    async def test_if_range_mismatch_returns_full_content(self, client: AsyncClient, stored_file):
+        """Test a stale If-Range validator gets the whole file."""
+        response = await client.get(
+            "/api/v1/files/1/content", headers={"Range": "bytes=10-19", "If-Range": '"stale"'}
+        )
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_if_none_match(self, client: AsyncClient, stored_file):
+        """Test a matching (or weak) ETag returns 304 without a body."""
+        for if_none_match in (f'"{CHECKSUM}"', f'"other", W/"{CHECKSUM}"', "*"):
+            response = await client.get(
+                "/api/v1/files/1/content", headers={"If-None-Match": if_none_match}
+            )
+
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == f'"{CHECKSUM}"'
+
+        response = await client.get("/api/v1/files/1/content", headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_if_modified_since(self, client: AsyncClient, stored_file):
+        """Test If-Modified-Since compares at one-second resolution."""
+        not_modified = await client.get(
+            "/api/v1/files/1/content",
+            headers={"If-Modified-Since": "Fri, 02 Jan 2026 03:04:05 GMT"},
+        )
+        modified = await client.get(
+            "/api/v1/files/1/content",
+            headers={"If-Modified-Since": "Fri, 02 Jan 2026 03:04:04 GMT"},
+        )
+
+        assert not_modified.status_code == 304
+        assert modified.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_missing_content(self, client: AsyncClient, stored_file, tmp_path):
+        """Test a record whose blob is gone returns 404."""
+        stored_file.location_url = str(tmp_path / "missing")
+
+        response = await client.get("/api/v1/files/1/content")
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_unknown_file(self, client: AsyncClient):
+        """Test an unknown file returns 404."""
+        with patch(
+            "app.api.v1.files.FileService.get_file", new_callable=AsyncMock
+        ) as mock_get_file:
+            mock_get_file.return_value = None
+
+            response = await client.get("/api/v1/files/99/content")
+
+            assert response.status_code == 404
@@ -0,0 +1,170 @@
+"""Tests for paginated file content."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.db.models.file import File
+from app.db.models.file_page import FilePage
+from app.services.extraction import ExtractedDocument, Segment
+from app.services.extraction_service import ExtractionService
+from app.services.page_index import TEXT_HEADING, build_page_index, store_index
+
+
+class TestFilePages:
+    """Test the page and chapter range endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_get_page_range(self, client: AsyncClient):
+        """Test only the requested range is read."""
+        with (
+            patch("app.api.v1.files.FileService.get_file", new_callable=AsyncMock) as mock_get_file,
+            patch(
+                "app.api.v1.files.FileService.get_pages", new_callable=AsyncMock
+            ) as mock_get_pages,
+        ):
+            mock_get_file.return_value = File(id=5, page_count=40, chapter_count=3)
+            mock_get_pages.return_value = [
+                FilePage(
+                    file_id=5, kind="page", page_index=10, byte_offset=0, byte_length=4, text="ten "
+                ),
+                FilePage(
+                    file_id=5,
+                    kind="page",
+                    page_index=11,
+                    byte_offset=4,
+                    byte_length=6,
+                    text="eleven",
+                ),
+            ]
+
+            response = await client.get("/api/v1/files/5/pages", params={"from": 10, "to": 12})
+
+            assert response.status_code == 200
+            body = response.json()
+            assert body["total"] == 40
+            assert [item["index"] for item in body["items"]] == [10, 11]
+            assert body["items"][1]["text"] == "eleven"
+            assert mock_get_pages.call_args.args[1:] == (5, "page", 10, 12)
+
+    @pytest.mark.asyncio
+    async def test_get_chapters_defaults_to_ten(self, client: AsyncClient):
+        """Test chapters use the same range rules, defaulting to ten items."""
+        with (
+            patch("app.api.v1.files.FileService.get_file", new_callable=AsyncMock) as mock_get_file,
+            patch(
+                "app.api.v1.files.FileService.get_pages", new_callable=AsyncMock
+            ) as mock_get_pages,
+        ):
+            mock_get_file.return_value = File(id=5, page_count=40, chapter_count=3)
+            mock_get_pages.return_value = []
+
+            response = await client.get("/api/v1/files/5/chapters", params={"from": 2})
+
+            assert response.status_code == 200
+            assert response.json()["total"] == 3
+            assert mock_get_pages.call_args.args[1:] == (5, "chapter", 2, 12)
+
+    @pytest.mark.asyncio
+    async def test_range_too_large_rejected(self, client: AsyncClient):
+        """Test oversized and inverted ranges are rejected."""
+        too_large = await client.get("/api/v1/files/5/pages", params={"from": 0, "to": 1000})
+        inverted = await client.get("/api/v1/files/5/pages", params={"from": 5, "to": 2})
+
+        assert too_large.status_code == 400
+        assert inverted.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_file_not_found(self, client: AsyncClient):
+        """Test an unknown file returns 404."""
+        with patch(
+            "app.api.v1.files.FileService.get_file", new_callable=AsyncMock
+        ) as mock_get_file:
+            mock_get_file.return_value = None
+
+            response = await client.get("/api/v1/files/99/pages")
+
+            assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_complete_writes_page_rows(self):
+        """Test extraction results replace the file's rows and set the counts."""
+        mock_db = AsyncMock()
+        document = ExtractedDocument(
+            chapters=[Segment("chapter", 0, 7)],
+            pages=[Segment("cha", 0, 3), Segment("pter", 3, 4)],
+        )
+
+        await ExtractionService.complete(mock_db, 5, document)
+
+        delete_call, insert_call, update_call = mock_db.execute.call_args_list
+        assert str(delete_call.args[0]).startswith("DELETE FROM file_pages")
+        rows = insert_call.args[1]
+        assert [(row["kind"], row["page_index"], row["byte_offset"]) for row in rows] == [
+            ("page", 0, 0),
+            ("page", 1, 3),
+            ("chapter", 0, 0),
+        ]
+        params = update_call.args[0].compile().params
+        assert params["page_count"] == 2
+        assert params["chapter_count"] == 1
+
+
+class TestSinglePage:
+    """Test the single page and chapter endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_page_from_index(self, client: AsyncClient, tmp_path):
+        """Test text pages are sliced from the stored file through its index."""
+        content = b"Chapter 1\nOne.\n\nChapter 2\nTwo.\n"
+        blob = tmp_path / "blob"
+        blob.write_bytes(content)
+        store_index(blob, build_page_index(content, settings.EXTRACTION_PAGE_SIZE, TEXT_HEADING))
+
+        with (
+            patch("app.api.v1.files.FileService.get_file", new_callable=AsyncMock) as mock_get_file,
+            patch(
+                "app.api.v1.files.FileService.get_pages", new_callable=AsyncMock
+            ) as mock_get_pages,
+        ):
+            mock_get_file.return_value = File(id=5, location_url=str(blob), format="txt")
+
+            chapter = await client.get("/api/v1/files/5/chapters/1")
+            page = await client.get("/api/v1/files/5/pages/0")
+            missing = await client.get("/api/v1/files/5/chapters/2")
+
+            assert chapter.status_code == 200
+            assert chapter.content == b"Chapter 2\nTwo.\n"
+            assert chapter.headers["x-total-count"] == "2"
+            assert chapter.headers["content-type"] == "text/plain; charset=utf-8"
+            assert page.content == content
+            assert missing.status_code == 404
+            mock_get_pages.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_page_from_extracted_rows(self, client: AsyncClient, tmp_path):
+        """Test formats without an index fall back to the extracted text."""
+        with (
+            patch("app.api.v1.files.FileService.get_file", new_callable=AsyncMock) as mock_get_file,
+            patch(
+                "app.api.v1.files.FileService.get_pages", new_callable=AsyncMock
+            ) as mock_get_pages,
+        ):
+            mock_get_file.return_value = File(
+                id=5, location_url=str(tmp_path / "book.pdf"), format="pdf", page_count=3
+            )
+            mock_get_pages.return_value = [
+                FilePage(file_id=5, kind="page", page_index=1, text="two")
+            ]
+
+            response = await client.get("/api/v1/files/5/pages/1")
+
+            assert response.status_code == 200
+            assert response.text == "two"
+            assert response.headers["x-total-count"] == "3"
+            assert mock_get_pages.call_args.args[1:] == (5, "page", 1, 2)
+
+            mock_get_pages.return_value = []
+            assert (await client.get("/api/v1/files/5/pages/9")).status_code == 404
@@ -1,11 +1,22 @@
 """Tests for file service."""
 
+import hashlib
 from unittest.mock import AsyncMock, MagicMock
 import pytest
 from pathlib import Path
 
+from app.core.config import settings
 from app.db.models.file import File
+from app.services.cache import topic_id_cache
+from app.services.exceptions import EmptyUploadError
 from app.services.file_service import FileService
+from app.services.page_index import index_path, lookup
+
+
+async def iter_chunks(*chunks: bytes):
+    """Yield the given chunks as an async stream."""
+    for chunk in chunks:
+        yield chunk
 
 
 class TestFileService:
@@ -26,34 +37,83 @@ class TestFileService:
         assert FileService.get_file_extension("doc.tar.gz") == "gz"
         assert FileService.get_file_extension("no_extension") == ""
 
+    def test_blob_path_is_sharded(self, tmp_path, monkeypatch):
+        """Test blobs are placed under two levels of hash-prefix directories."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        checksum = hashlib.sha256(b"book").hexdigest()
+
+        blob_path = FileService.blob_path(checksum)
+
+        assert blob_path == tmp_path / checksum[:2] / checksum[2:4] / checksum
+
+    @pytest.mark.asyncio
+    async def test_save_stream_to_disk(self, tmp_path, monkeypatch):
+        """Test streaming chunks stores a content-addressed blob."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path / "uploads")
+
+        stored_file = await FileService.save_stream_to_disk(
+            chunks=iter_chunks(b"Hello ", b"streaming ", b"world"),
+        )
+
+        content = b"Hello streaming world"
+        checksum = hashlib.sha256(content).hexdigest()
+        assert Path(stored_file.location_url).read_bytes() == content
+        assert Path(stored_file.location_url) == FileService.blob_path(checksum)
+        assert stored_file.size == len(content)
+        assert stored_file.checksum == checksum
+        assert stored_file.created is True
+        # No temporary files are left behind
+        assert len(list((tmp_path / "uploads").iterdir())) == 1
+
+    @pytest.mark.asyncio
+    async def test_save_stream_to_disk_deduplicates(self, tmp_path, monkeypatch):
+        """Test identical content is stored once and not rewritten."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path / "uploads")
+
+        first = await FileService.save_stream_to_disk(chunks=iter_chunks(b"same book"))
+        second = await FileService.save_stream_to_disk(chunks=iter_chunks(b"same ", b"book"))
+
+        assert first.location_url == second.location_url
+        assert first.created is True
+        assert second.created is False
+        assert len(list((tmp_path / "uploads").iterdir())) == 1
+
     @pytest.mark.asyncio
-    async def test_save_file_to_disk(self, tmp_path, monkeypatch):
-        """Test saving file to disk."""
-        # Override UPLOAD_DIR to use tmp_path
-        test_upload_dir = tmp_path / "uploads"
-        monkeypatch.setattr(FileService, "UPLOAD_DIR", test_upload_dir)
-
-        file_content = b"Test file content"
-        topic = "test_topic"
-        file_extension = "txt"
-
-        location_url = await FileService.save_file_to_disk(
-            file_content=file_content,
-            topic=topic,
-            file_extension=file_extension,
+    async def test_save_stream_to_disk_writes_page_index(self, tmp_path, monkeypatch):
+        """Test text uploads get a page index next to the blob, built in the same pass."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path / "uploads")
+
+        stored_file = await FileService.save_stream_to_disk(
+            chunks=iter_chunks(b"Chapter 1\nOne.\n", b"Chapter 2\nTwo.\n"),
+            page_index_builder=FileService.page_index_builder("txt"),
         )
 
-        # Verify file was created
-        assert Path(location_url).exists()
-        assert Path(location_url).read_bytes() == file_content
-        assert location_url.endswith("test_topic.txt")
+        index = index_path(Path(stored_file.location_url))
+        assert lookup(index, "chapter", 1, settings.EXTRACTION_PAGE_SIZE) == (15, 30, 2)
+        assert FileService.page_index_builder("pdf") is None
+
+    @pytest.mark.asyncio
+    async def test_save_stream_to_disk_empty(self, tmp_path, monkeypatch):
+        """Test empty streams are rejected and cleaned up."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path / "uploads")
+
+        with pytest.raises(EmptyUploadError):
+            await FileService.save_stream_to_disk(chunks=iter_chunks())
+
+        assert list((tmp_path / "uploads").iterdir()) == []
 
     @pytest.mark.asyncio
     async def test_create_file_record(self):
-        """Test creating file record in database."""
-        mock_db = AsyncMock()
-        mock_db.add = MagicMock()
-        mock_db.flush = AsyncMock()
+        """Test creating file record is a single INSERT ... RETURNING for a known topic."""
+        topic_id_cache.put("test_topic", 5)
+        mock_db = AsyncMock(info={})
+        mock_db.scalar.return_value = File(
+            id=1,
+            location_url="uploads/test.txt",
+            topic="test_topic",
+            size=1024,
+            format="txt",
+        )
 
         file_record = await FileService.create_file_record(
             db=mock_db,
@@ -63,17 +123,45 @@ class TestFileService:
             file_format="txt",
         )
 
-        assert file_record.location_url == "uploads/test.txt"
+        assert file_record.id == 1
         assert file_record.topic == "test_topic"
-        assert file_record.size == 1024
-        assert file_record.format == "txt"
-        mock_db.add.assert_called_once()
-        mock_db.flush.assert_called_once()
+        mock_db.scalar.assert_called_once()
+        statement = mock_db.scalar.call_args.args[0]
+        assert statement.compile().params["location_url"] == "uploads/test.txt"
+        assert statement.compile().params["topic_id"] == 5
+        assert "RETURNING" in str(statement)
+        mock_db.execute.assert_not_called()
+        mock_db.flush.assert_not_called()
+        mock_db.refresh.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_file_records(self):
+        """Test creating many file records in one statement."""
+        topic_id_cache.put("a", 1)
+        topic_id_cache.put("b", 2)
+        mock_db = AsyncMock(info={})
+        mock_result = MagicMock()
+        mock_result.all.return_value = [File(id=1, topic="a"), File(id=2, topic="b")]
+        mock_db.scalars.return_value = mock_result
+
+        file_records = await FileService.create_file_records(
+            db=mock_db,
+            records=[
+                {"location_url": "uploads/a", "checksum": "a", "topic": "a", "size": 1, "format": "txt"},
+                {"location_url": "uploads/b", "checksum": "b", "topic": "b", "size": 2, "format": "md"},
+            ],
+        )
+
+        assert [f.id for f in file_records] == [1, 2]
+        mock_db.scalars.assert_called_once()
+        params = mock_db.scalars.call_args.args[1]
+        assert [p["topic_id"] for p in params] == [1, 2]
+        assert [f.topic for f in file_records] == ["a", "b"]
 
     @pytest.mark.asyncio
     async def test_get_file_by_topic(self):
         """Test retrieving file by topic."""
-        mock_db = AsyncMock()
+        mock_db = AsyncMock(info={})
         mock_file = File(
             id=1,
             location_url="uploads/python.txt",
@@ -99,7 +187,7 @@ class TestFileService:
     @pytest.mark.asyncio
     async def test_get_file_by_topic_not_found(self):
         """Test retrieving non-existent file returns None."""
-        mock_db = AsyncMock()
+        mock_db = AsyncMock(info={})
         mock_result = MagicMock()
         mock_result.scalar_one_or_none.return_value = None
         mock_db.execute.return_value = mock_result
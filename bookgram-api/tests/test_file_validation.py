@@ -1,12 +1,15 @@
 """Tests for file validation in the SaveFile endpoint."""
 
+import gzip
 import io
+from pathlib import Path
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from httpx import AsyncClient
 
 from app.db.models.user import User
+from app.services.file_service import StoredFile
 
 
 class TestFileValidation:
@@ -24,7 +27,6 @@ class TestFileValidation:
                 id=1,
                 email="test@example.com",
                 username="testuser",
-                subscribed_topics=[],
             )
             mock_get_user.return_value = mock_user
 
@@ -42,17 +44,21 @@ class TestFileValidation:
 
         with patch("app.api.v1.files.UserService.get_user", new_callable=AsyncMock) as mock_get_user, \
              patch("app.api.v1.files.UserService.subscribe_user_to_topic", new_callable=AsyncMock) as mock_subscribe, \
-             patch("app.api.v1.files.FileService.save_file_to_disk", new_callable=AsyncMock) as mock_save, \
+             patch("app.api.v1.files.FileService.save_stream_to_disk", new_callable=AsyncMock) as mock_save, \
+             patch("app.api.v1.files.BlobService.acquire", new_callable=AsyncMock), \
              patch("app.api.v1.files.FileService.create_file_record", new_callable=AsyncMock) as mock_create:
             
             mock_user = User(
                 id=1,
                 email="test@example.com",
                 username="testuser",
-                subscribed_topics=[],
             )
             mock_get_user.return_value = mock_user
-            mock_save.return_value = "uploads/test_file.txt"
+            mock_save.return_value = StoredFile(
+                location_url="uploads/test_file.txt",
+                size=len(file_content),
+                checksum="0" * 64,
+            )
             
             # Create a mock file record with the topic attribute
             from app.db.models.file import File
@@ -69,3 +75,44 @@ class TestFileValidation:
 
             assert response.status_code == 201
             assert response.json() == "test_file"
+
+    @pytest.mark.asyncio
+    async def test_empty_file_rejected(self, client: AsyncClient, tmp_path, monkeypatch):
+        """Test that empty uploads are rejected without leaving a file behind."""
+        from app.services.file_service import FileService
+
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        files = {"file": ("empty.txt", io.BytesIO(b""), "text/plain")}
+        data = {"title": "Empty File", "user_id": "1"}
+
+        with patch("app.api.v1.files.FileService.create_file_record", new_callable=AsyncMock) as mock_create:
+            response = await client.post("/api/v1/files/save", files=files, data=data)
+
+            assert response.status_code == 400
+            assert "empty" in response.json()["detail"].lower()
+            mock_create.assert_not_called()
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_compressed_file_stored_decompressed(self, client: AsyncClient, tmp_path, monkeypatch):
+        """Test compressed uploads record the size and format of the real content."""
+        from app.db.models.file import File
+        from app.services.file_service import FileService
+
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        file_content = b"Decompressed book content\n" * 100
+        files = {"file": ("book.txt.gz", io.BytesIO(gzip.compress(file_content)), "application/gzip")}
+        data = {"title": "Compressed Book", "user_id": "1"}
+
+        with patch("app.api.v1.files.UserService.subscribe_user_to_topic", new_callable=AsyncMock), \
+             patch("app.api.v1.files.BlobService.acquire", new_callable=AsyncMock), \
+             patch("app.api.v1.files.FileService.create_file_record", new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = File(topic="compressed_book")
+
+            response = await client.post("/api/v1/files/save", files=files, data=data)
+
+            assert response.status_code == 201
+            kwargs = mock_create.call_args.kwargs
+            assert kwargs["size"] == len(file_content)
+            assert kwargs["file_format"] == "txt"
+            assert Path(kwargs["location_url"]).read_bytes() == file_content
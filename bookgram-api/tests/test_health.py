@@ -1,9 +1,14 @@
 """Test health check endpoint."""
 
-from unittest.mock import AsyncMock
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
 import pytest
 from httpx import AsyncClient
 
+from app.services.readiness import ReadinessMonitor
+
 
 async def mock_get_db():
     """Mock database session for health check test."""
@@ -32,3 +37,100 @@ async def test_health_check(client: AsyncClient) -> None:
     finally:
         # Clean up the override
         app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_liveness(client: AsyncClient) -> None:
+    """Test /livez answers without a database."""
+    response = await client.get("/livez")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+class TestReadiness:
+    """Test /readyz and the background readiness checks."""
+
+    @staticmethod
+    def monitor(min_free_disk: int = 0) -> ReadinessMonitor:
+        return ReadinessMonitor(interval=5.0, timeout=0.05, min_free_disk=min_free_disk)
+
+    @pytest.mark.asyncio
+    async def test_not_ready_before_first_check(self, client: AsyncClient) -> None:
+        """Test /readyz is 503 until the background checks have run."""
+        with patch("app.api.health.readiness_monitor", self.monitor()):
+            response = await client.get("/readyz")
+
+        assert response.status_code == 503
+        assert response.json()["database"] == {"status": "unknown"}
+
+    @pytest.mark.asyncio
+    async def test_ready(self, client: AsyncClient, tmp_path) -> None:
+        """Test a successful refresh makes /readyz report ready with pool and disk status."""
+        monitor = self.monitor()
+        with patch.object(monitor, "_select_one", new_callable=AsyncMock) as select_one:
+            await monitor.refresh()
+            await monitor.check_disk(tmp_path)
+
+            with patch("app.api.health.readiness_monitor", monitor):
+                first = await client.get("/readyz")
+                second = await client.get("/readyz")
+
+        assert first.status_code == 200
+        body = first.json()
+        assert body["status"] == "ready"
+        assert body["database"]["status"] == "healthy"
+        assert body["disk"]["free_bytes"] > 0
+        assert {"checked_out", "capacity", "saturation"} <= body["pool"].keys()
+        # Probes only read the cached result
+        assert second.status_code == 200
+        select_one.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_database_failure(self, tmp_path) -> None:
+        """Test a failing or hanging database makes the instance not ready."""
+        monitor = self.monitor()
+        await monitor.check_disk(tmp_path)
+
+        with patch.object(monitor, "_select_one", side_effect=OSError("connection refused")):
+            await monitor.check_database()
+        failed = monitor.status()
+
+        async def hang() -> None:
+            await asyncio.sleep(10)
+
+        with patch.object(monitor, "_select_one", side_effect=hang):
+            await monitor.check_database()
+        timed_out = monitor.status()
+
+        assert failed["status"] == "not_ready"
+        assert "connection refused" in failed["database"]["error"]
+        assert timed_out["status"] == "not_ready"
+        assert "no response" in timed_out["database"]["error"]
+
+    @pytest.mark.asyncio
+    async def test_stale_check(self, tmp_path) -> None:
+        """Test a successful check stops counting once it is too old."""
+        monitor = self.monitor()
+        with patch.object(monitor, "_select_one", new_callable=AsyncMock):
+            await monitor.check_database()
+        await monitor.check_disk(tmp_path)
+
+        with patch("app.services.readiness.time.monotonic", return_value=time.monotonic() + 60):
+            result = monitor.status()
+
+        assert result["status"] == "not_ready"
+        assert result["database"]["error"] == "last successful check is too old"
+
+    @pytest.mark.asyncio
+    async def test_low_disk_space(self, tmp_path) -> None:
+        """Test the instance is not ready below the free space threshold."""
+        monitor = self.monitor(min_free_disk=2**62)
+        with patch.object(monitor, "_select_one", new_callable=AsyncMock):
+            await monitor.check_database()
+        await monitor.check_disk(tmp_path)
+
+        result = monitor.status()
+
+        assert result["status"] == "not_ready"
+        assert result["disk"]["status"] == "low_space"
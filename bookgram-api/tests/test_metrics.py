@@ -0,0 +1,154 @@
+"""Tests for the metrics registry and /metrics."""
+
+import io
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.metrics import (
+    SAVE_STAGE_SECONDS,
+    UPLOADS_TOTAL,
+    Metric,
+    MetricsRegistry,
+    Stopwatch,
+)
+from app.db import get_db
+from app.db.models.file import File
+from app.main import app
+from app.services.cache import topic_id_cache
+from app.services.file_service import FileService
+
+
+class TestRegistry:
+    """Test metric types and the text exposition."""
+
+    def test_render(self):
+        """Test counters and histograms render in the Prometheus text format."""
+        registry = MetricsRegistry(prefix="test_")
+        counter = registry.counter("uploads_total", "Uploads", ("format",))
+        histogram = registry.histogram("stage_seconds", "Stages", ("stage",), buckets=(0.1, 1.0))
+        counter.inc(format="txt")
+        counter.inc(2, format='we"ird')
+        histogram.observe(0.05, stage="read")
+        histogram.observe(0.5, stage="read")
+
+        text = registry.render()
+
+        assert "# TYPE test_uploads_total counter" in text
+        assert 'test_uploads_total{format="txt"} 1' in text
+        assert 'test_uploads_total{format="we\\"ird"} 2' in text
+        assert "# TYPE test_stage_seconds histogram" in text
+        assert 'test_stage_seconds_bucket{stage="read",le="0.1"} 1' in text
+        assert 'test_stage_seconds_bucket{stage="read",le="1"} 2' in text
+        assert 'test_stage_seconds_bucket{stage="read",le="+Inf"} 2' in text
+        assert 'test_stage_seconds_sum{stage="read"} 0.55' in text
+        assert 'test_stage_seconds_count{stage="read"} 2' in text
+
+    def test_labels_are_checked(self):
+        """Test observations must use exactly the declared labels."""
+        counter = MetricsRegistry().counter("c", "C", ("format",))
+
+        with pytest.raises(ValueError):
+            counter.inc(outcome="saved")
+        with pytest.raises(ValueError):
+            counter.inc(-1, format="txt")
+
+    def test_metric_without_snapshot_is_refused(self):
+        """Test a metric type must implement snapshot to be created."""
+
+        class Gauge(Metric):
+            type = "gauge"
+
+        with pytest.raises(TypeError):
+            Gauge("g", "G")
+
+    def test_snapshots_of_all_workers_are_summed(self, tmp_path):
+        """Test render_all adds other workers' snapshots to this worker's live values."""
+        other = MetricsRegistry()
+        other.counter("uploads_total", "Uploads", ("format",)).inc(3, format="txt")
+        other.histogram("seconds", "S", buckets=(1.0,)).observe(0.5)
+        (tmp_path / "1.json").write_text(json.dumps(other.snapshot()))
+
+        registry = MetricsRegistry()
+        counter = registry.counter("uploads_total", "Uploads", ("format",))
+        histogram = registry.histogram("seconds", "S", buckets=(1.0,))
+        counter.inc(format="txt")
+        histogram.observe(2.0)
+        registry.write_snapshot(tmp_path)
+        # Live values win over this worker's own (older) snapshot
+        counter.inc(format="txt")
+
+        text = registry.render_all(tmp_path)
+
+        assert 'uploads_total{format="txt"} 5' in text
+        assert 'seconds_bucket{le="1"} 1' in text
+        assert "seconds_count 2" in text
+
+    @pytest.mark.asyncio
+    async def test_stopwatch_times_only_the_waits(self):
+        """Test Stopwatch.iterate accumulates the time spent producing items."""
+        watch = Stopwatch()
+
+        async def items():
+            yield 1
+            yield 2
+
+        assert [item async for item in watch.iterate(items())] == [1, 2]
+        assert watch.elapsed > 0
+
+
+@pytest.mark.asyncio
+async def test_save_is_instrumented(client: AsyncClient, tmp_path, monkeypatch):
+    """Test a save records every stage and its outcome, and /metrics serves them."""
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+    mock_db = AsyncMock(info={})
+    result = MagicMock()
+    result.one.return_value = (True, 1)
+    mock_db.execute.return_value = result
+    mock_db.scalar.return_value = File(id=1, topic="measured")
+    topic_id_cache.put("measured", 1)
+    stages = (
+        "read",
+        "write",
+        "place",
+        "page_index",
+        "blob_acquire",
+        "insert",
+        "subscribe",
+        "commit",
+    )
+    before = {stage: SAVE_STAGE_SECONDS.count(stage=stage) for stage in stages}
+    saved_before = UPLOADS_TOTAL.value(format="txt", outcome="saved")
+
+    async def override_get_db():
+        yield mock_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        files = {"file": ("measured.txt", io.BytesIO(b"measured content"), "text/plain")}
+        response = await client.post(
+            "/api/v1/files/save", files=files, data={"title": "Measured", "user_id": "1"}
+        )
+        rejected = await client.post(
+            "/api/v1/files/save",
+            files={"file": ("x.exe", io.BytesIO(b"x"), "application/octet-stream")},
+            data={"title": "X", "user_id": "1"},
+        )
+    finally:
+        app.dependency_overrides.pop(get_db)
+
+    assert response.status_code == 201
+    assert rejected.status_code == 400
+    for stage in stages:
+        assert SAVE_STAGE_SECONDS.count(stage=stage) == before[stage] + 1, stage
+    assert UPLOADS_TOTAL.value(format="txt", outcome="saved") == saved_before + 1
+
+    metrics = await client.get("/metrics")
+
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'bookgram_uploads_total{format="unknown",outcome="rejected"}' in metrics.text
+    assert 'bookgram_save_stage_seconds_count{stage="commit"}' in metrics.text
+    assert 'bookgram_ingested_bytes_total{format="txt"}' in metrics.text
@@ -0,0 +1,94 @@
+"""Tests for streaming multipart parsing."""
+
+import pytest
+
+from app.services.exceptions import InvalidFormError
+from app.services.multipart import MultipartStream
+
+BOUNDARY = "b0undary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def form_body(*parts: tuple[str, str | None, bytes]) -> bytes:
+    """Encode (name, filename, data) parts as a multipart/form-data body."""
+    body = b""
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode()
+        body += data + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+async def iter_pieces(body: bytes, size: int, consumed: list[int] | None = None):
+    """Yield the body in pieces of size bytes, recording how many were read."""
+    for start in range(0, len(body), size):
+        if consumed is not None:
+            consumed.append(start)
+        yield body[start : start + size]
+
+
+class TestMultipartStream:
+    """Test parsing a body as it streams in."""
+
+    @pytest.mark.asyncio
+    async def test_fields_and_files(self):
+        """Test fields and file parts are returned in order with their data."""
+        body = form_body(("title", None, "Été".encode()), ("file", "a.txt", b"x" * 1000))
+        stream = MultipartStream(iter_pieces(body, 7), CONTENT_TYPE)
+
+        parts = []
+        async for part in stream.parts():
+            if part.filename is None:
+                parts.append((part.name, await part.text(100)))
+            else:
+                parts.append((part.name, part.filename, b"".join([c async for c in part.chunks()])))
+
+        assert parts == [("title", "Été"), ("file", "a.txt", b"x" * 1000)]
+
+    @pytest.mark.asyncio
+    async def test_part_data_read_as_it_arrives(self):
+        """Test a part's first chunk is available before the rest of the body is read."""
+        consumed: list[int] = []
+        body = form_body(("file", "a.txt", b"x" * 10000))
+        stream = MultipartStream(iter_pieces(body, 100, consumed), CONTENT_TYPE)
+
+        async for part in stream.parts():
+            async for _ in part.chunks():
+                break
+            break
+
+        assert len(consumed) < 5
+
+    @pytest.mark.asyncio
+    async def test_unread_parts_are_skipped(self):
+        """Test parts left unread do not disturb the next ones."""
+        body = form_body(("skip", "a.txt", b"x" * 500), ("user_id", None, b"1"))
+        stream = MultipartStream(iter_pieces(body, 64), CONTENT_TYPE)
+
+        names = [part.name async for part in stream.parts()]
+
+        assert names == ["skip", "user_id"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("body", "message"),
+        [
+            (form_body(("file", "a.txt", b"data"))[:-20], "truncated"),
+            (form_body(("title", None, b"x" * 200)), "exceeds 100 bytes"),
+        ],
+        ids=["truncated", "field_too_large"],
+    )
+    async def test_invalid_body_rejected(self, body, message):
+        """Test truncated bodies and oversized fields are rejected."""
+        stream = MultipartStream(iter_pieces(body, 16), CONTENT_TYPE)
+
+        with pytest.raises(InvalidFormError, match=message):
+            async for part in stream.parts():
+                await part.read(100)
+
+    def test_not_multipart_rejected(self):
+        """Test other content types are rejected."""
+        with pytest.raises(InvalidFormError, match="multipart/form-data"):
+            MultipartStream(iter_pieces(b"", 1), "application/json")
@@ -0,0 +1,324 @@
+"""Tests for the transactional outbox and its worker."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import BackgroundTasks
+from httpx import AsyncClient
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import Settings, settings
+from app.db import get_db
+from app.db.models.file import File
+from app.db.models.outbox import JOB_DEAD, JOB_PENDING, OutboxJob
+from app.main import app
+from app.services import outbox_worker
+from app.services.cache import topic_id_cache
+from app.services.exceptions import PermanentJobError
+from app.services.file_service import FileService
+from app.services.outbox_service import OutboxService
+from app.services.outbox_worker import COMPLETED, DEAD, RETRY, OutboxWorker, execute
+
+
+def session_factory() -> MagicMock:
+    """Mock AsyncSessionLocal usable as an async context manager."""
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock()
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory
+
+
+def compiled(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestOutboxService:
+    """Test claiming and recording job outcomes."""
+
+    @pytest.mark.asyncio
+    async def test_claim_skips_locked_rows(self):
+        """Test due jobs are leased with one UPDATE over a SKIP LOCKED subquery."""
+        mock_db = AsyncMock()
+        result = MagicMock()
+        result.all.return_value = [OutboxJob(id=1)]
+        mock_db.scalars.return_value = result
+
+        jobs = await OutboxService.claim(mock_db, 10, job_ids=[1])
+
+        sql = compiled(mock_db.scalars.call_args.args[0])
+        assert len(jobs) == 1
+        assert sql.startswith("UPDATE outbox_jobs SET status=")
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "outbox_jobs.locked_until <" in sql
+        assert "LIMIT" in sql
+        assert "RETURNING" in sql
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("attempts", "permanent", "dead"),
+        [(1, False, False), (1, True, True), (5, False, True)],
+    )
+    async def test_fail_retries_or_dead_letters(self, monkeypatch, attempts, permanent, dead):
+        """Test failed jobs back off until permanent errors or the attempt budget."""
+        monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 5)
+        mock_db = AsyncMock()
+
+        assert (
+            await OutboxService.fail(mock_db, OutboxJob(id=1, attempts=attempts), "boom", permanent)
+            is dead
+        )
+
+        params = mock_db.execute.call_args.args[0].compile().params
+        assert params["status"] == (JOB_DEAD if dead else JOB_PENDING)
+        assert params["last_error"] == "boom"
+        assert ("available_at" in params) is not dead
+
+    def test_lease_must_exceed_extraction_timeout(self):
+        """Test a lease that could expire under a running extraction is refused."""
+        with pytest.raises(ValidationError, match="OUTBOX_LEASE"):
+            Settings(OUTBOX_LEASE=300, EXTRACTION_TIMEOUT=300)
+
+    def test_retry_delay_doubles_up_to_maximum(self, monkeypatch):
+        """Test exponential backoff is capped."""
+        monkeypatch.setattr(settings, "OUTBOX_RETRY_DELAY", 5.0)
+        monkeypatch.setattr(settings, "OUTBOX_MAX_RETRY_DELAY", 30.0)
+
+        assert [OutboxService.retry_delay(n) for n in (1, 2, 3, 4)] == [5.0, 10.0, 20.0, 30.0]
+
+
+class TestExecute:
+    """Test running one claimed job."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("side_effect", "kind", "outcome"),
+        [
+            (None, "test", COMPLETED),
+            (OSError("transient"), "test", RETRY),
+            (PermanentJobError("broken"), "test", DEAD),
+            (None, "unknown", DEAD),
+        ],
+    )
+    async def test_outcomes(self, side_effect, kind, outcome):
+        """Test the handler's result decides between complete, retry and dead-letter."""
+        handler = AsyncMock(side_effect=side_effect)
+        job = OutboxJob(id=7, kind=kind, payload={"file_id": 1}, attempts=1)
+
+        with (
+            patch("app.services.outbox_worker.AsyncSessionLocal", session_factory()),
+            patch.object(OutboxService, "complete", new_callable=AsyncMock) as mock_complete,
+            patch.object(OutboxService, "fail", new_callable=AsyncMock) as mock_fail,
+        ):
+            mock_fail.side_effect = lambda db, job, error, permanent: permanent
+
+            assert await execute(job, {"test": handler}) == outcome
+
+        if kind == "test":
+            handler.assert_awaited_once_with({"file_id": 1}, 1)
+        assert mock_complete.await_count == (outcome == COMPLETED)
+        assert mock_fail.await_count == (outcome != COMPLETED)
+
+
+class TestOutboxWorker:
+    """Test the claim loop."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test no more than concurrency jobs run at once, and all claimed jobs run."""
+        jobs = [OutboxJob(id=i, kind="test", payload={}) for i in range(7)]
+        running = 0
+        peak = 0
+
+        async def handler(payload, attempt):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        worker = OutboxWorker({"test": handler}, concurrency=2, batch_size=3, poll_interval=0.01)
+        claims = []
+
+        async def claim(limit):
+            claims.append(limit)
+            batch = jobs[:limit]
+            del jobs[:limit]
+            if not batch and not worker._running:
+                worker.stop()
+            return batch
+
+        async def fake_execute(job, handlers):
+            await handlers[job.kind](job.payload, job.attempts)
+            return COMPLETED
+
+        with (
+            patch.object(worker, "_claim", side_effect=claim),
+            patch("app.services.outbox_worker.execute", side_effect=fake_execute) as mock_execute,
+        ):
+            await asyncio.wait_for(worker.run(), timeout=5)
+
+        assert mock_execute.await_count == 7
+        assert peak == 2
+        assert max(claims) <= 2
+
+    @pytest.mark.asyncio
+    async def test_run_due_drains(self):
+        """Test run_due claims batches until none is due."""
+        worker = OutboxWorker({}, concurrency=2, batch_size=2, poll_interval=1)
+        batches = [[OutboxJob(id=1), OutboxJob(id=2)], [OutboxJob(id=3)], []]
+
+        with (
+            patch.object(worker, "_claim", new_callable=AsyncMock, side_effect=batches),
+            patch.object(worker, "_execute", new_callable=AsyncMock) as mock_execute,
+        ):
+            assert await worker.run_due() == 3
+
+        assert mock_execute.await_count == 3
+
+
+class TestDispatch:
+    """Test running jobs in the API process."""
+
+    def test_dispatch_respects_setting(self, monkeypatch):
+        """Test jobs only run inline with OUTBOX_INLINE."""
+        background_tasks = BackgroundTasks()
+        outbox_worker.dispatch(background_tasks, [1, 2])
+        assert [task.args for task in background_tasks.tasks] == [([1, 2],)]
+
+        monkeypatch.setattr(settings, "OUTBOX_INLINE", False)
+        background_tasks = BackgroundTasks()
+        outbox_worker.dispatch(background_tasks, [1, 2])
+        assert background_tasks.tasks == []
+
+    @pytest.mark.asyncio
+    async def test_inline_makes_one_attempt(self):
+        """Test an inline job is run once and its retry is left to the poll loop."""
+        job = OutboxJob(id=1, kind="test", payload={}, attempts=1)
+
+        with (
+            patch("app.services.outbox_worker.AsyncSessionLocal", session_factory()),
+            patch.object(OutboxService, "claim", new_callable=AsyncMock) as mock_claim,
+            patch("app.services.outbox_worker.execute", new_callable=AsyncMock) as mock_execute,
+        ):
+            mock_claim.return_value = [job]
+            mock_execute.return_value = RETRY
+
+            await outbox_worker.run_inline([1])
+
+        mock_execute.assert_awaited_once_with(job)
+        assert mock_claim.call_args.kwargs == {"job_ids": [1]}
+
+    @pytest.mark.asyncio
+    async def test_background_worker_runs_left_over_jobs(self):
+        """Test the API's poll loop runs due jobs and stops at shutdown."""
+        ran = []
+
+        async def handler(payload, attempt):
+            ran.append(payload)
+
+        worker = OutboxWorker({"test": handler}, concurrency=2, batch_size=2, poll_interval=0.01)
+        batches = [[OutboxJob(id=1, kind="test", payload={"file_id": 1}, attempts=2)]]
+
+        async def claim(limit):
+            return batches.pop() if batches else []
+
+        async def fake_execute(job, handlers):
+            await handlers[job.kind](job.payload, job.attempts)
+            return COMPLETED
+
+        with (
+            patch.object(worker, "_claim", side_effect=claim),
+            patch("app.services.outbox_worker.execute", side_effect=fake_execute),
+        ):
+            worker.start()
+            await asyncio.sleep(0.05)
+            await worker.shutdown(timeout=1)
+
+        assert ran == [{"file_id": 1}]
+        assert worker._task is None
+
+    @pytest.mark.asyncio
+    async def test_shutdown_cancels_slow_jobs(self):
+        """Test shutdown does not wait past its timeout for jobs in flight."""
+        started = asyncio.Event()
+
+        async def handler(payload, attempt):
+            started.set()
+            await asyncio.sleep(60)
+
+        worker = OutboxWorker({"test": handler}, concurrency=1, batch_size=1, poll_interval=0.01)
+        batches = [[OutboxJob(id=1, kind="test", payload={}, attempts=1)]]
+
+        async def claim(limit):
+            return batches.pop() if batches else []
+
+        async def fake_execute(job, handlers):
+            await handlers[job.kind](job.payload, job.attempts)
+            return COMPLETED
+
+        with (
+            patch.object(worker, "_claim", side_effect=claim),
+            patch("app.services.outbox_worker.execute", side_effect=fake_execute),
+        ):
+            worker.start()
+            await asyncio.wait_for(started.wait(), timeout=1)
+            await asyncio.wait_for(worker.shutdown(timeout=0.05), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_save_enqueues_extraction_in_transaction(client: AsyncClient, monkeypatch, tmp_path):
+    """Test the extraction job is written before the commit."""
+    monkeypatch.setattr(settings, "EXTRACTION_ENABLED", True)
+    monkeypatch.setattr(settings, "OUTBOX_INLINE", False)
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+    calls = []
+    mock_db = AsyncMock(info={})
+    result = MagicMock()
+    result.one.return_value = (True, 1)
+    mock_db.execute.return_value = result
+    mock_db.scalar.return_value = File(id=3, topic="queued")
+    topic_id_cache.put("queued", 1)
+    mock_db.commit.side_effect = lambda: calls.append("commit")
+
+    async def enqueue(db, kind, payloads):
+        calls.append(("enqueue", kind, payloads))
+        return [42]
+
+    async def override_get_db():
+        yield mock_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with patch.object(OutboxService, "enqueue", side_effect=enqueue):
+            response = await client.post(
+                "/api/v1/files/save",
+                files={"file": ("queued.txt", b"queued content", "text/plain")},
+                data={"title": "Queued", "user_id": "1"},
+            )
+    finally:
+        app.dependency_overrides.pop(get_db)
+
+    assert response.status_code == 201
+    assert calls[:2] == [("enqueue", "extract_file", [{"file_id": 3}]), "commit"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("internal_api")
+async def test_outbox_endpoint(client: AsyncClient):
+    """Test the internal endpoint reports the outbox backlog."""
+    report = {"jobs": [{"status": "dead", "kind": "extract_file", "count": 1}]}
+
+    async def override_get_db():
+        yield AsyncMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with patch.object(OutboxService, "stats", new_callable=AsyncMock, return_value=report):
+            response = await client.get("/internal/outbox")
+    finally:
+        app.dependency_overrides.pop(get_db)
+
+    assert response.status_code == 200
+    assert response.json() == report
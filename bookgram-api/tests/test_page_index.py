@@ -0,0 +1,122 @@
+"""Tests for the byte-offset page index."""
+
+import pytest
+
+from app.services.page_index import (
+    MARKDOWN_HEADING,
+    TEXT_HEADING,
+    PageIndexBuilder,
+    build_page_index,
+    index_path,
+    lookup,
+    read_span,
+    store_index,
+)
+
+BOOK = (
+    "Preface\n\n"
+    + "".join(
+        f"Chapter {i}\n\n" + "Été à la plage, encore une fois. " * 40 + "\n\n" for i in range(1, 6)
+    )
+).encode()
+
+
+class TestPageIndexBuilder:
+    """Test building the index from a stream."""
+
+    def test_streamed_index_matches_whole_content(self):
+        """Test the boundaries do not depend on how the content is chunked."""
+        expected = build_page_index(BOOK, 500, TEXT_HEADING)
+
+        for chunk_size in (1, 7, 64, 4096):
+            builder = PageIndexBuilder(500, TEXT_HEADING)
+            for position in range(0, len(BOOK), chunk_size):
+                builder.update(BOOK[position : position + chunk_size])
+            index = builder.finish()
+
+            assert index.pages == expected.pages
+            assert index.chapters == expected.chapters
+
+    def test_pages_cover_content_and_break_at_whitespace(self):
+        """Test pages are contiguous, within the size, and break after whitespace."""
+        index = build_page_index(BOOK, 500, TEXT_HEADING)
+
+        spans = index.spans("page")
+        assert spans[0][0] == 0 and spans[-1][1] == len(BOOK)
+        assert all(end - start <= 500 for start, end in spans)
+        assert all(BOOK[end - 1 : end] in (b"\n", b" ") for _, end in spans[:-1])
+
+    def test_hard_cut_keeps_utf8_characters_whole(self):
+        """Test content without break points is never cut inside a character."""
+        content = "é" * 100
+
+        index = build_page_index(content.encode(), 11)
+
+        assert (
+            "".join(content.encode()[start:end].decode() for start, end in index.spans("page"))
+            == content
+        )
+
+    @pytest.mark.parametrize("page_size", [1, 2, 3, 5])
+    def test_page_smaller_than_character(self, page_size):
+        """Test a page too small for a character holds that whole character."""
+        content = "aé€𝄞b𝄞".encode()
+        expected = build_page_index(content, page_size)
+
+        builder = PageIndexBuilder(page_size)
+        for position in range(len(content)):
+            builder.update(content[position : position + 1])
+        index = builder.finish()
+
+        assert index.pages == expected.pages
+        spans = index.spans("page")
+        assert all(end - start <= max(page_size, 4) for start, end in spans)
+        assert "".join(content[start:end].decode() for start, end in spans) == content.decode()
+
+    def test_chapters_with_front_matter(self):
+        """Test text before the first heading is its own chapter."""
+        index = build_page_index(BOOK, 500, TEXT_HEADING)
+
+        chapters = index.spans("chapter")
+        assert index.chapter_count == 6
+        assert BOOK[chapters[0][0] : chapters[0][1]] == b"Preface\n\n"
+        assert BOOK[chapters[1][0] :].startswith(b"Chapter 1\n")
+
+    def test_markdown_headings(self):
+        """Test only H1/H2 lines start chapters and a file without headings is one chapter."""
+        content = b"# One\ntext\n### detail\n## Two\n"
+
+        assert build_page_index(content, 100, MARKDOWN_HEADING).chapters.tolist() == [0, 22, 29]
+        assert build_page_index(b"no headings", 100, MARKDOWN_HEADING).chapters.tolist() == [0, 11]
+
+
+class TestPageIndexFile:
+    """Test the on-disk index."""
+
+    def test_lookup_reads_one_span(self, tmp_path):
+        """Test a stored index resolves a page or chapter to its bytes."""
+        blob = tmp_path / "blob"
+        blob.write_bytes(BOOK)
+        index = build_page_index(BOOK, 500, TEXT_HEADING)
+        assert store_index(blob, index) is True
+
+        page = lookup(index_path(blob), "page", 2, 500)
+        chapter = lookup(index_path(blob), "chapter", 3, 500)
+
+        assert page == (*index.spans("page")[2], index.page_count)
+        assert read_span(blob, chapter.start, chapter.end).startswith(b"Chapter 3\n")
+        with pytest.raises(IndexError):
+            lookup(index_path(blob), "page", index.page_count, 500)
+
+    def test_missing_or_stale_index(self, tmp_path):
+        """Test an index is ignored when absent or built with another page size."""
+        blob = tmp_path / "blob"
+        blob.write_bytes(BOOK)
+        assert lookup(index_path(blob), "page", 0, 500) is None
+
+        store_index(blob, build_page_index(BOOK, 500))
+
+        assert lookup(index_path(blob), "page", 0, 800) is None
+        assert store_index(blob, build_page_index(BOOK, 500)) is False
+        assert store_index(blob, build_page_index(BOOK, 800)) is True
+        assert lookup(index_path(blob), "page", 0, 800) is not None
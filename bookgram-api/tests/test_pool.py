@@ -0,0 +1,99 @@
+"""Tests for connection pool telemetry."""
+
+import sqlite3
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from app.db.pool import PoolWaitStats, TimedPoolMixin, pool_status
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    """Synchronous queue pool with checkout timing."""
+
+
+def make_pool(**kwargs) -> TimedQueuePool:
+    return TimedQueuePool(lambda: sqlite3.connect(":memory:"), **kwargs)
+
+
+class TestPoolWaitStats:
+    """Test the wait histogram."""
+
+    def test_cumulative_buckets(self):
+        """Test observations land in cumulative le buckets."""
+        stats = PoolWaitStats(buckets=(0.01, 0.1))
+        for seconds in (0.001, 0.01, 0.05, 3.0):
+            stats.observe(seconds)
+
+        report = stats.as_dict()
+
+        assert report["buckets"] == [
+            {"le": 0.01, "count": 2},
+            {"le": 0.1, "count": 3},
+            {"le": "+Inf", "count": 4},
+        ]
+        assert report["count"] == 4
+        assert report["max_seconds"] == 3.0
+
+
+class TestTimedPool:
+    """Test checkout timing and pool status."""
+
+    def test_checkouts_are_timed(self):
+        """Test every checkout is recorded and occupancy is reported."""
+        pool = make_pool(pool_size=2, max_overflow=1)
+        first = pool.connect()
+        second = pool.connect()
+
+        status = pool_status(pool)
+
+        assert status["checked_out"] == 2
+        assert status["size"] == 2
+        assert status["max_overflow"] == 1
+        assert status["checkout_wait"]["count"] == 2
+        first.close()
+        second.close()
+        assert pool_status(pool)["checked_in"] == 2
+
+    def test_timeouts_are_counted(self):
+        """Test a checkout that gives up is counted as a timeout."""
+        pool = make_pool(pool_size=1, max_overflow=0, timeout=0.01)
+        held = pool.connect()
+
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+
+        wait = pool_status(pool)["checkout_wait"]
+        assert wait["timeouts"] == 1
+        assert wait["max_seconds"] >= 0.01
+        held.close()
+
+    def test_recreate_keeps_timing(self):
+        """Test a recreated pool (after invalidation) is timed too."""
+        pool = make_pool(pool_size=1).recreate()
+
+        pool.connect().close()
+
+        assert pool.wait_stats.count == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("internal_api")
+async def test_pool_endpoint(client: AsyncClient):
+    """Test the internal endpoint reports the engine's pool."""
+    response = await client.get("/internal/pool")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["class"] == "TimedAsyncQueuePool"
+    assert {"size", "checked_out", "overflow", "checkout_wait"} <= body.keys()
+
+
+@pytest.mark.asyncio
+async def test_internal_api_disabled_by_default(client: AsyncClient):
+    """Test /internal answers 404 unless INTERNAL_API_ENABLED."""
+    response = await client.get("/internal/pool")
+
+    assert response.status_code == 404
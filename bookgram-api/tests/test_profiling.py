@@ -0,0 +1,177 @@
+"""Tests for on-demand request profiling."""
+
+import sys
+import time
+from datetime import UTC, datetime
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.profiling import AWAITING, Profile, ProfileStore, StackSampler, profile_store
+
+
+def make_profile(profile_id: str = "p1") -> Profile:
+    return Profile(
+        id=profile_id,
+        method="GET",
+        path="/x",
+        started_at=datetime.now(UTC),
+        interval=0.001,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_profiles():
+    """Start every test with an empty profile store."""
+    profile_store.clear()
+    yield
+    profile_store.clear()
+
+
+class TestProfile:
+    """Test sampling and the export formats."""
+
+    def test_samples_are_relative_to_the_anchor(self):
+        """Test only frames above the anchor are kept, and other stacks count as awaiting."""
+        profile = make_profile()
+
+        def busy(sampler: StackSampler) -> None:
+            sampler.sample()
+
+        def request() -> None:
+            busy(StackSampler(profile, sys._getframe()))
+
+        def suspended():
+            yield
+
+        request()
+        # A suspended coroutine's frame is not on the stack: the request is awaiting
+        generator = suspended()
+        next(generator)
+        StackSampler(profile, generator.gi_frame).sample()
+
+        (stack,) = [stack for stack in profile.stacks if stack != (AWAITING,)]
+        assert [function for function, _, _ in stack][:2] == [
+            "TestProfile.test_samples_are_relative_to_the_anchor.<locals>.busy",
+            "StackSampler.sample",
+        ]
+        assert profile.stacks[(AWAITING,)] == 1
+        assert profile.samples == 2
+
+    def test_formats(self):
+        """Test collapsed stacks and speedscope share frames and weights."""
+        profile = make_profile()
+        outer = ("outer", "/srv/app/a.py", 1)
+        inner = ("inner", "/srv/app/a.py", 5)
+        profile.stacks[(outer, inner)] += 3
+        profile.stacks[(AWAITING,)] += 1
+
+        collapsed = profile.collapsed()
+        speedscope = profile.speedscope()
+
+        assert "(awaiting) 1\n" in collapsed
+        assert "outer (/srv/app/a.py:1);inner (/srv/app/a.py:5) 3\n" in collapsed
+        frames = speedscope["shared"]["frames"]
+        assert {"name": "outer", "file": "/srv/app/a.py", "line": 1} in frames
+        sampled = speedscope["profiles"][0]
+        assert sampled["type"] == "sampled"
+        assert sorted(sampled["weights"]) == pytest.approx([0.001, 0.003])
+        assert [len(stack) for stack in sampled["samples"]] in ([2, 1], [1, 2])
+
+    def test_store_is_bounded(self):
+        """Test the store drops the oldest profiles beyond its size."""
+        store = ProfileStore(max_profiles=2)
+        for profile_id in ("a", "b", "c"):
+            store.add(make_profile(profile_id))
+
+        assert [profile.id for profile in store.list()] == ["c", "b"]
+        assert store.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_requests_are_not_profiled_by_default(client: AsyncClient):
+    """Test requests without a trigger are not profiled."""
+    response = await client.get("/livez", headers={"X-Profile": "anything"})
+
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert profile_store.list() == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("internal_api")
+async def test_header_profiles_request(client: AsyncClient, monkeypatch):
+    """Test a request with the token is profiled and downloadable."""
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+    monkeypatch.setattr(settings, "PROFILING_INTERVAL", 0.001)
+
+    wrong = await client.get("/livez", headers={"X-Profile": "guess"})
+    response = await client.get("/livez", headers={"X-Profile": "secret"})
+
+    assert "x-profile-id" not in wrong.headers
+    profile_id = response.headers["x-profile-id"]
+    auth = {"Authorization": "Bearer secret"}
+    listed = (await client.get("/internal/profiles", headers=auth)).json()
+    assert [(p["id"], p["path"], p["status_code"], p["trigger"]) for p in listed] == [
+        (profile_id, "/livez", 200, "header")
+    ]
+
+    speedscope = await client.get(f"/internal/profiles/{profile_id}", headers=auth)
+    collapsed = await client.get(f"/internal/profiles/{profile_id}?format=collapsed", headers=auth)
+    missing = await client.get("/internal/profiles/nope", headers=auth)
+
+    assert speedscope.json()["profiles"][0]["type"] == "sampled"
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    assert "speedscope.json" in speedscope.headers["content-disposition"]
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("internal_api")
+@pytest.mark.parametrize(
+    ("token", "headers"),
+    [
+        (None, {}),
+        (None, {"Authorization": "Bearer "}),
+        ("secret", {}),
+        ("secret", {"Authorization": "Bearer guess"}),
+        ("secret", {"X-Profile": "secret"}),
+    ],
+    ids=["no_token", "empty_token", "missing", "wrong", "profile_header"],
+)
+async def test_profiles_require_token(client: AsyncClient, monkeypatch, token, headers):
+    """Test profiles are only readable with the PROFILING_TOKEN bearer token."""
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", token)
+    profile_store.add(make_profile("p1"))
+
+    listed = await client.get("/internal/profiles", headers=headers)
+    profile = await client.get("/internal/profiles/p1", headers=headers)
+
+    assert listed.status_code == 403
+    assert profile.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_sample_rate_profiles_request(client: AsyncClient, monkeypatch):
+    """Test PROFILING_SAMPLE_RATE profiles requests without a header."""
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+
+    response = await client.get("/livez")
+
+    assert "x-profile-id" in response.headers
+    assert profile_store.list()[0].trigger == "sampled"
+
+
+def test_sampler_thread_collects_samples():
+    """Test the background thread samples until stopped."""
+    profile = make_profile()
+    sampler = StackSampler(profile, sys._getframe())
+    sampler.start()
+    deadline = time.monotonic() + 0.05
+    while time.monotonic() < deadline:
+        pass
+    sampler.stop()
+
+    assert profile.samples > 0
+    assert all(stack != (AWAITING,) for stack in profile.stacks)
@@ -0,0 +1,237 @@
+"""Tests for per-request database round-trip counting."""
+
+import asyncio
+import io
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import registry
+from sqlalchemy.dialects.postgresql.base import PGDialect
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.util import await_only
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.db import get_db
+from app.db.models.file import File
+from app.db.query_counter import (
+    QUERY_COUNT_HEADER,
+    QueryCountMiddleware,
+    count_queries,
+    instrument_engine,
+)
+from app.main import app
+from app.services.cache import topic_id_cache
+from app.services.file_service import FileService
+
+Responder = Callable[[str], list[tuple[Any, ...]]]
+
+
+class RecordingCursor:
+    """DB-API cursor answering each statement with the rows its responder returns."""
+
+    def __init__(self, respond: Responder) -> None:
+        self.respond = respond
+        self.description: list[tuple[Any, ...]] | None = None
+        self.rowcount = -1
+        self._rows: list[tuple[Any, ...]] = []
+
+    def execute(self, statement: str, parameters: Any = None) -> None:
+        # Yield to the event loop like a network round trip would (async drivers must await)
+        await_only(asyncio.sleep(0))
+        self._rows = self.respond(statement)
+        self.rowcount = len(self._rows)
+        self.description = (
+            [(f"c{i}", None, None, None, None, None, None) for i in range(len(self._rows[0]))]
+            if self._rows
+            else None
+        )
+
+    def fetchone(self) -> tuple[Any, ...] | None:
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self) -> list[tuple[Any, ...]]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size: int | None = None) -> list[tuple[Any, ...]]:
+        rows, self._rows = self._rows[: size or 1], self._rows[size or 1 :]
+        return rows
+
+    def close(self) -> None:
+        pass
+
+    async def _async_soft_close(self) -> None:
+        pass
+
+
+class RecordingConnection:
+    """DB-API connection whose cursors share one responder."""
+
+    responder: Responder = staticmethod(lambda statement: [])
+
+    def cursor(self) -> RecordingCursor:
+        return RecordingCursor(RecordingConnection.responder)
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingDBAPI:
+    """Just enough of a DB-API module for SQLAlchemy to compile and run PostgreSQL statements."""
+
+    paramstyle = "pyformat"
+    Error = Exception
+
+    @staticmethod
+    def connect(*args: Any, **kwargs: Any) -> RecordingConnection:
+        return RecordingConnection()
+
+
+class RecordingDialect(PGDialect):
+    """PostgreSQL dialect over RecordingDBAPI, usable from AsyncSession (no server needed)."""
+
+    driver = "recording"
+    is_async = True
+    supports_statement_cache = False
+
+    @classmethod
+    def import_dbapi(cls) -> type[RecordingDBAPI]:
+        return RecordingDBAPI
+
+    def initialize(self, connection: Any) -> None:
+        self.server_version_info = (16, 0)
+        self.default_schema_name = "public"
+
+
+registry.register("postgresql.recording", __name__, "RecordingDialect")
+
+
+@pytest.fixture
+def recording_engine():
+    """Async engine whose statements reach before_cursor_execute but no database."""
+    engine = create_async_engine("postgresql+recording://")
+    yield engine
+    RecordingConnection.responder = staticmethod(lambda statement: [])
+
+
+@pytest.fixture
+def sqlite_engine():
+    """In-memory SQLite engine with query counting installed."""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+class TestQueryCounter:
+    """Test the query counter."""
+
+    def test_counts_statements_in_block(self, sqlite_engine):
+        """Test statements are counted only while the counter is active."""
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with count_queries() as counter:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+            conn.execute(text("SELECT 3"))
+
+        assert counter.count == 2
+        assert counter.statements == ["SELECT 1", "SELECT 2"]
+
+    def test_instrument_engine_is_idempotent(self, sqlite_engine):
+        """Test instrumenting twice does not double count."""
+        instrument_engine(sqlite_engine)
+
+        with sqlite_engine.connect() as conn, count_queries() as counter:
+            conn.execute(text("SELECT 1"))
+
+        assert counter.count == 1
+
+    @pytest.mark.asyncio
+    async def test_middleware_reports_count_header(self, sqlite_engine):
+        """Test the middleware reports the request's statements in a header."""
+
+        async def endpoint(request):
+            with sqlite_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+            return PlainTextResponse("ok")
+
+        test_app = QueryCountMiddleware(Starlette(routes=[Route("/", endpoint)]))
+        async with AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test") as ac:
+            first = await ac.get("/")
+            second = await ac.get("/")
+
+        assert first.headers[QUERY_COUNT_HEADER] == "2"
+        assert second.headers[QUERY_COUNT_HEADER] == "2"
+
+
+class TestSavePathRoundTrips:
+    """Pin the number of database round trips of the save path."""
+
+    @pytest.mark.asyncio
+    async def test_save_is_three_statements(
+        self, client: AsyncClient, recording_engine, tmp_path, monkeypatch
+    ):
+        """Test saving to a known topic is blob upsert, file INSERT ... RETURNING and subscription insert."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        topic_id_cache.put("pinned", 1)
+        now = datetime(2024, 1, 1)
+        file_row = {column.name: None for column in File.__table__.c} | {
+            "id": 1,
+            "topic_id": 1,
+            "extraction_attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+        def respond(statement: str) -> list[tuple[Any, ...]]:
+            if statement.startswith("INSERT INTO blobs"):
+                return [(1,)]
+            if statement.startswith("INSERT INTO files"):
+                return [tuple(file_row.values())]
+            if "INSERT INTO user_topic_subscriptions" in statement:
+                return [(True, 1)]
+            return []
+
+        RecordingConnection.responder = staticmethod(respond)
+        # Every statement sent to the database, whichever request context runs it
+        statements: list[str] = []
+        event.listen(
+            recording_engine.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+
+        async def override_get_db():
+            async with AsyncSession(recording_engine, expire_on_commit=False) as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            files = {"file": ("pinned.txt", io.BytesIO(b"pinned content"), "text/plain")}
+            response = await client.post(
+                "/api/v1/files/save", files=files, data={"title": "Pinned", "user_id": "1"}
+            )
+        finally:
+            app.dependency_overrides.pop(get_db)
+
+        assert response.status_code == 201
+        assert response.json() == "pinned"
+        assert [" ".join(statement.split()[:3]) for statement in statements] == [
+            "INSERT INTO blobs",
+            "INSERT INTO files",
+            "WITH inserted AS",
+        ]
@@ -0,0 +1,93 @@
+"""Tests for full-text search."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services.search_service import SearchService
+
+
+def hit(file_id: int, page_index: int, rank: float) -> SimpleNamespace:
+    """A search result row."""
+    return SimpleNamespace(
+        file_id=file_id,
+        topic=f"book_{file_id}",
+        page_index=page_index,
+        rank=rank,
+        snippet="<mark>x</mark>",
+    )
+
+
+class TestSearchService:
+    """Test the search query."""
+
+    @pytest.mark.asyncio
+    async def test_search_query_shape(self):
+        """Test matches use the index, are ranked within a bounded set, and only results get snippets."""
+        mock_db = AsyncMock()
+        mock_db.execute.return_value = MagicMock(all=MagicMock(return_value=[]))
+
+        await SearchService.search_pages(mock_db, "whale", offset=20, limit=10, max_candidates=500)
+
+        statement = mock_db.execute.call_args.args[0]
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        hits_sql, outer_sql = sql.split("SELECT hits.file_id")
+        assert "file_pages.search_vector @@ websearch_to_tsquery" in hits_sql
+        assert "ts_rank_cd" in hits_sql and "ts_headline" not in hits_sql
+        # The bounded candidate set is deterministic
+        assert "ORDER BY file_pages.file_id DESC, file_pages.page_index" in hits_sql
+        assert "ts_headline" in outer_sql
+        params = statement.compile(dialect=postgresql.dialect()).params
+        assert {500, 20, 10} <= set(params.values())
+
+
+class TestSearchEndpoint:
+    """Test GET /files/search."""
+
+    @pytest.mark.asyncio
+    async def test_search(self, client: AsyncClient):
+        """Test results are returned with the next offset when more exist."""
+        with patch(
+            "app.api.v1.files.SearchService.search_pages", new_callable=AsyncMock
+        ) as mock_search:
+            mock_search.return_value = [hit(1, 4, 0.9), hit(2, 0, 0.5), hit(3, 1, 0.1)]
+
+            response = await client.get("/api/v1/files/search", params={"q": "whale", "limit": 2})
+
+            assert response.status_code == 200
+            body = response.json()
+            assert [(item["file_id"], item["page_index"]) for item in body["items"]] == [
+                (1, 4),
+                (2, 0),
+            ]
+            assert body["items"][0]["snippet"] == "<mark>x</mark>"
+            assert body["next_offset"] == 2
+            # One extra row is fetched to detect the next page
+            assert mock_search.call_args.kwargs == {"offset": 0, "limit": 3}
+
+    @pytest.mark.asyncio
+    async def test_last_page(self, client: AsyncClient):
+        """Test the last page has no next offset."""
+        with patch(
+            "app.api.v1.files.SearchService.search_pages", new_callable=AsyncMock
+        ) as mock_search:
+            mock_search.return_value = [hit(1, 4, 0.9)]
+
+            response = await client.get("/api/v1/files/search", params={"q": "whale", "offset": 20})
+
+            assert response.json()["next_offset"] is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_requests(self, client: AsyncClient):
+        """Test empty queries and paging past the ranked candidates are rejected."""
+        empty = await client.get("/api/v1/files/search", params={"q": ""})
+        too_deep = await client.get(
+            "/api/v1/files/search", params={"q": "whale", "offset": settings.SEARCH_MAX_CANDIDATES}
+        )
+
+        assert empty.status_code == 422
+        assert too_deep.status_code == 400
@@ -0,0 +1,63 @@
+"""Tests for the sharded upload layout migration."""
+
+import hashlib
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.scripts.shard_uploads import MigrationStats, migrate_batch, relocate
+from app.services.file_service import FileService
+
+
+class TestShardUploads:
+    """Test the upload layout migration script."""
+
+    @pytest.mark.asyncio
+    async def test_relocate_legacy_file(self, tmp_path, monkeypatch):
+        """Test a legacy file is hashed and linked into its sharded path."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        legacy = tmp_path / "python_basics.txt"
+        legacy.write_bytes(b"legacy content")
+
+        checksum, dst = await relocate(legacy, None)
+
+        assert checksum == hashlib.sha256(b"legacy content").hexdigest()
+        assert dst == FileService.blob_path(checksum)
+        assert dst.read_bytes() == b"legacy content"
+        # Old path stays valid until the database row is committed
+        assert legacy.exists()
+
+    @pytest.mark.asyncio
+    async def test_migrate_batch(self, tmp_path, monkeypatch):
+        """Test a batch updates rows in bulk and reports stale paths."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        legacy = tmp_path / "legacy.txt"
+        legacy.write_bytes(b"legacy")
+        flat_checksum = hashlib.sha256(b"flat").hexdigest()
+        flat = tmp_path / flat_checksum
+        flat.write_bytes(b"flat")
+        sharded_checksum = hashlib.sha256(b"sharded").hexdigest()
+        sharded = FileService.blob_path(sharded_checksum)
+
+        rows = [
+            (1, str(legacy), None, 6),
+            (2, str(flat), flat_checksum, 4),
+            (3, str(flat), flat_checksum, 4),
+            (4, str(sharded), sharded_checksum, 7),
+            (5, str(tmp_path / "gone.txt"), None, 1),
+        ]
+        mock_db = AsyncMock()
+        stats = MigrationStats()
+
+        stale_paths = await migrate_batch(mock_db, rows, stats)
+
+        assert stats == MigrationStats(scanned=5, migrated=3, already_sharded=1, missing=1)
+        assert set(stale_paths) == {legacy, flat}
+        assert FileService.blob_path(flat_checksum).read_bytes() == b"flat"
+        # Blob upsert, blob relocation and file update in one transaction
+        assert mock_db.execute.call_count == 3
+        mock_db.commit.assert_called_once()
+        file_updates = mock_db.execute.call_args_list[-1].args[1]
+        assert {u["id"] for u in file_updates} == {1, 2, 3}
+        assert all(Path(u["location_url"]).parent.parent.parent == tmp_path for u in file_updates)
@@ -0,0 +1,69 @@
+"""Tests for non-blocking storage I/O."""
+
+import asyncio
+import hashlib
+import threading
+import time
+
+import pytest
+
+from app.services.storage import StorageIO
+
+
+class TestStorageIO:
+    """Test StorageIO class."""
+
+    @pytest.mark.asyncio
+    async def test_run_off_event_loop_thread(self):
+        """Test blocking calls run on the storage pool, not the loop thread."""
+        storage = StorageIO(max_workers=2)
+        try:
+            thread_name = await storage.run(lambda: threading.current_thread().name)
+            assert thread_name.startswith("storage-io")
+        finally:
+            storage.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test no more than max_workers calls run at once."""
+        storage = StorageIO(max_workers=2)
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_call() -> None:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        try:
+            await asyncio.gather(*(storage.run(slow_call) for _ in range(6)))
+        finally:
+            storage.shutdown()
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_write_fsync_replace(self, tmp_path):
+        """Test write, fsync and replace produce the final file."""
+        storage = StorageIO(max_workers=1)
+        tmp_file = tmp_path / "data.part"
+        final_file = tmp_path / "data.txt"
+        digest = hashlib.sha256()
+
+        try:
+            with open(tmp_file, "wb") as f:
+                await storage.write(f, b"chunk one ", digest)
+                await storage.write(f, b"chunk two", digest)
+                await storage.fsync(f)
+            await storage.replace(tmp_file, final_file)
+        finally:
+            storage.shutdown()
+
+        assert not tmp_file.exists()
+        assert final_file.read_bytes() == b"chunk one chunk two"
+        assert digest.hexdigest() == hashlib.sha256(b"chunk one chunk two").hexdigest()
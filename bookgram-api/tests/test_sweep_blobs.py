@@ -0,0 +1,88 @@
+"""Tests for the orphan blob sweep."""
+
+import hashlib
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.scripts import sweep_blobs
+from app.scripts.sweep_blobs import SweepStats, scan, sweep_batch
+from app.services.file_service import FileService
+from app.services.page_index import index_path
+
+
+def write_blob(content: bytes):
+    """Store a blob file at its sharded path."""
+    checksum = hashlib.sha256(content).hexdigest()
+    path = FileService.blob_path(checksum)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return checksum, path
+
+
+class TestSweepBlobs:
+    """Test the orphan blob sweep script."""
+
+    def test_scan(self, tmp_path, monkeypatch):
+        """Test only files at their sharded blob path changed before the cutoff are candidates."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        checksum, path = write_blob(b"blob")
+        index_path(path).write_bytes(b"index")
+        (path.parent / ".tmp.part").write_bytes(b"partial")
+        (tmp_path / hashlib.sha256(b"flat").hexdigest()).write_bytes(b"flat")
+        stats = SweepStats()
+
+        assert scan(tmp_path, time.time() + 60, stats) == [(checksum, path, 4)]
+        assert stats == SweepStats(scanned=1)
+
+        stats = SweepStats()
+        assert scan(tmp_path, time.time() - 60, stats) == []
+        assert stats == SweepStats(scanned=1, recent=1)
+
+    @pytest.mark.asyncio
+    async def test_sweep_batch_removes_unreferenced(self, tmp_path, monkeypatch):
+        """Test blobs without a row are unlinked with their index and referenced ones are kept."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        kept, kept_path = write_blob(b"kept")
+        orphan, orphan_path = write_blob(b"orphan")
+        index_path(orphan_path).write_bytes(b"index")
+        mock_db = AsyncMock()
+        mock_db.scalars.return_value = [kept]
+        session = MagicMock()
+        session.__aenter__.return_value = mock_db
+        monkeypatch.setattr(sweep_blobs, "AsyncSessionLocal", MagicMock(return_value=session))
+        candidates = [(kept, kept_path, 4), (orphan, orphan_path, 6)]
+        stats = SweepStats()
+
+        await sweep_batch(candidates, time.time() + 1, stats)
+
+        assert stats == SweepStats(referenced=1, removed=1, removed_bytes=6)
+        assert kept_path.exists()
+        assert not orphan_path.exists()
+        assert not index_path(orphan_path).exists()
+
+    @pytest.mark.asyncio
+    async def test_sweep_batch_keeps_touched_blob(self, tmp_path, monkeypatch):
+        """Test a blob touched by a deduplicating save after the scan is kept."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        checksum, path = write_blob(b"reused")
+        mock_db = AsyncMock()
+        mock_db.scalars.return_value = []
+        session = MagicMock()
+        session.__aenter__.return_value = mock_db
+        monkeypatch.setattr(sweep_blobs, "AsyncSessionLocal", MagicMock(return_value=session))
+        tmp = tmp_path / ".reused.part"
+        tmp.write_bytes(b"reused")
+        # File timestamps come from a coarse clock
+        time.sleep(0.05)
+        cutoff = time.time()
+        time.sleep(0.05)
+
+        await FileService.place_blob(tmp, checksum)
+        stats = SweepStats()
+        await sweep_batch([(checksum, path, 6)], cutoff, stats)
+
+        assert stats == SweepStats(recent=1)
+        assert path.exists()
+        assert not tmp.exists()
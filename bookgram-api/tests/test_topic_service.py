@@ -0,0 +1,79 @@
+"""Tests for topic service."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.cache import topic_id_cache
+from app.services.topic_service import TopicService
+
+
+def rows(*pairs: tuple[str, int]) -> MagicMock:
+    """Mock result of (name, id) rows."""
+    result = MagicMock()
+    result.tuples.return_value.all.return_value = list(pairs)
+    return result
+
+
+class TestTopicService:
+    """Test resolving topic names to IDs."""
+
+    @pytest.mark.asyncio
+    async def test_cached_topics_need_no_query(self):
+        """Test known topics are resolved from the cache."""
+        topic_id_cache.put("python", 1)
+        mock_db = AsyncMock(info={})
+
+        assert await TopicService.get_ids(mock_db, ["python", "python"]) == {"python": 1}
+
+        mock_db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_existing_topics_are_selected_and_cached(self):
+        """Test uncached topics are looked up in one query and then cached."""
+        mock_db = AsyncMock(info={})
+        mock_db.execute.return_value = rows(("python", 1), ("rust", 2))
+
+        assert await TopicService.get_ids(mock_db, ["python", "rust"]) == {"python": 1, "rust": 2}
+
+        mock_db.execute.assert_awaited_once()
+        assert topic_id_cache.peek("rust") == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("commit", [True, False])
+    async def test_new_topics_are_cached_on_commit(self, commit):
+        """Test missing topics are inserted idempotently and cached only once committed."""
+        async with AsyncSession() as db:
+            with patch.object(db, "execute", new_callable=AsyncMock) as mock_execute:
+                mock_execute.side_effect = [rows(), rows(("rust", 7))]
+
+                assert await TopicService.get_id(db, "rust") == 7
+                # Reused within the transaction without a query
+                assert await TopicService.get_id(db, "rust") == 7
+
+                insert = mock_execute.call_args_list[1].args[0]
+                assert "ON CONFLICT (name) DO NOTHING" in str(
+                    insert.compile(dialect=postgresql.dialect())
+                )
+                assert mock_execute.await_count == 2
+                assert topic_id_cache.peek("rust") is None
+
+            if commit:
+                await db.commit()
+            else:
+                await db.rollback()
+
+        assert topic_id_cache.peek("rust") == (7 if commit else None)
+
+    @pytest.mark.asyncio
+    async def test_topic_created_concurrently(self):
+        """Test a topic inserted by a concurrent transaction is looked up again."""
+        mock_db = AsyncMock(info={})
+        mock_db.execute.side_effect = [rows(), rows(), rows(("go", 9))]
+
+        assert await TopicService.get_id(mock_db, "go") == 9
+
+        assert mock_db.execute.await_count == 3
+        assert topic_id_cache.peek("go") == 9
@@ -0,0 +1,73 @@
+"""Tests for the topic endpoints."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+
+
+class TestTopicSubscribers:
+    """Test the topic subscriber endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_list_subscribers_full_page(self, client: AsyncClient):
+        """Test a full page returns the cursor for the next page."""
+        with patch(
+            "app.api.v1.topics.UserService.get_topic_subscribers", new_callable=AsyncMock
+        ) as mock_get:
+            mock_get.return_value = [3, 7]
+
+            response = await client.get(
+                "/api/v1/topics/python/subscribers", params={"after": 1, "limit": 2}
+            )
+
+            assert response.status_code == 200
+            assert response.json() == {"topic": "python", "user_ids": [3, 7], "next_after": 7}
+            assert mock_get.call_args.kwargs["after_user_id"] == 1
+            assert mock_get.call_args.kwargs["limit"] == 2
+
+    @pytest.mark.asyncio
+    async def test_list_subscribers_last_page(self, client: AsyncClient):
+        """Test a short page has no next cursor."""
+        with patch(
+            "app.api.v1.topics.UserService.get_topic_subscribers", new_callable=AsyncMock
+        ) as mock_get:
+            mock_get.return_value = [3]
+
+            response = await client.get("/api/v1/topics/python/subscribers")
+
+            assert response.status_code == 200
+            assert response.json()["next_after"] is None
+
+    @pytest.mark.asyncio
+    async def test_list_subscribers_rejects_large_limit(self, client: AsyncClient):
+        """Test the page size is capped."""
+        response = await client.get("/api/v1/topics/python/subscribers", params={"limit": 100000})
+
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_stream_subscribers_pages_by_keyset(self, client: AsyncClient, monkeypatch):
+        """Test streaming walks the subscribers batch by batch."""
+        monkeypatch.setattr(settings, "SUBSCRIBER_STREAM_BATCH_SIZE", 2)
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__ = AsyncMock()
+        session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        with (
+            patch("app.api.v1.topics.AsyncSessionLocal", session_factory),
+            patch(
+                "app.api.v1.topics.UserService.get_topic_subscribers", new_callable=AsyncMock
+            ) as mock_get,
+        ):
+            mock_get.side_effect = [[1, 2], [5, 8], [9]]
+
+            response = await client.get("/api/v1/topics/python/subscribers/stream")
+
+            assert response.status_code == 200
+            assert response.text.splitlines() == ["1", "2", "5", "8", "9"]
+            afters = [call.kwargs["after_user_id"] for call in mock_get.call_args_list]
+            assert afters == [None, 2, 8]
+            assert session_factory.call_count == 3
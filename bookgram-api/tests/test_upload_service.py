@@ -0,0 +1,231 @@
+"""Tests for resumable upload service."""
+
+import hashlib
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.models.file import File
+from app.db.models.upload_session import UploadSession
+from app.services.exceptions import UploadConflictError
+from app.services.file_service import FileService
+from app.services.upload_service import UploadService
+
+
+async def iter_chunks(*chunks: bytes):
+    """Yield the given chunks as an async stream."""
+    for chunk in chunks:
+        yield chunk
+
+
+def make_session(bytes_received: int = 0, total_size: int | None = None) -> UploadSession:
+    """Build an active upload session."""
+    return UploadSession(
+        id="session-1",
+        user_id=1,
+        topic="resumable_book",
+        filename="book.txt",
+        format="txt",
+        total_size=total_size,
+        bytes_received=bytes_received,
+        status="active",
+    )
+
+
+def mock_db_returning(value: object) -> AsyncMock:
+    """Mock session whose execute() returns a scalar result."""
+    mock_db = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = value
+    mock_db.execute.return_value = mock_result
+    return mock_db
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """Use a temporary upload directory with an empty partial file."""
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+    partial_path = UploadService.partial_path("session-1")
+    partial_path.parent.mkdir(parents=True)
+    partial_path.touch()
+    return tmp_path
+
+
+class TestUploadService:
+    """Test UploadService class."""
+
+    @pytest.mark.asyncio
+    async def test_create_session(self, tmp_path, monkeypatch):
+        """Test a session row is inserted and its empty partial file created."""
+        monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+        mock_db = mock_db_returning(make_session())
+
+        with patch("app.services.upload_service.UserService.get_user", new_callable=AsyncMock):
+            upload_session = await UploadService.create_session(
+                mock_db, user_id=1, topic="resumable_book", filename="book.txt", file_format="txt"
+            )
+
+        assert upload_session.id == "session-1"
+        assert str(mock_db.execute.call_args.args[0]).startswith("INSERT INTO upload_sessions")
+        assert UploadService.partial_path("session-1").read_bytes() == b""
+
+    @pytest.mark.asyncio
+    async def test_write_chunks_at_offsets(self, upload_dir):
+        """Test chunks are written in place at their offsets."""
+        upload_session = make_session()
+
+        await UploadService.write_chunk(
+            mock_db_returning(6), upload_session, 0, iter_chunks(b"Hello ")
+        )
+        upload_session.bytes_received = 6
+        new_offset = await UploadService.write_chunk(
+            mock_db_returning(11), upload_session, 6, iter_chunks(b"wor", b"ld")
+        )
+
+        assert new_offset == 11
+        assert UploadService.partial_path("session-1").read_bytes() == b"Hello world"
+
+    @pytest.mark.asyncio
+    async def test_resend_overlapping_chunk(self, upload_dir):
+        """Test a resent chunk overwrites the same bytes."""
+        UploadService.partial_path("session-1").write_bytes(b"Hello ")
+        upload_session = make_session(bytes_received=6)
+
+        await UploadService.write_chunk(
+            mock_db_returning(11), upload_session, 0, iter_chunks(b"Hello world")
+        )
+
+        assert UploadService.partial_path("session-1").read_bytes() == b"Hello world"
+
+    @pytest.mark.asyncio
+    async def test_write_chunk_past_offset_rejected(self, upload_dir):
+        """Test a chunk leaving a gap is rejected."""
+        upload_session = make_session(bytes_received=6)
+
+        with pytest.raises(UploadConflictError, match="current offset 6"):
+            await UploadService.write_chunk(
+                mock_db_returning(6), upload_session, 10, iter_chunks(b"data")
+            )
+
+    @pytest.mark.asyncio
+    async def test_write_chunk_beyond_declared_size(self, upload_dir):
+        """Test a chunk past the declared size is rejected."""
+        upload_session = make_session(total_size=4)
+
+        with pytest.raises(UploadConflictError, match="declared size"):
+            await UploadService.write_chunk(
+                mock_db_returning(0), upload_session, 0, iter_chunks(b"too long")
+            )
+
+    @pytest.mark.asyncio
+    async def test_finalize_incomplete_upload(self, upload_dir):
+        """Test finalizing before all declared bytes arrive is rejected."""
+        upload_session = make_session(bytes_received=5, total_size=10)
+
+        with pytest.raises(UploadConflictError, match="incomplete"):
+            await UploadService.finalize(AsyncMock(), upload_session)
+
+    @pytest.mark.asyncio
+    async def test_finalize(self, upload_dir):
+        """Test finalize stores a blob and runs the save flow."""
+        content = b"complete book"
+        UploadService.partial_path("session-1").write_bytes(content + b"junk")
+        upload_session = make_session(bytes_received=len(content), total_size=len(content))
+        checksum = hashlib.sha256(content).hexdigest()
+        mock_db = AsyncMock()
+
+        with (
+            patch(
+                "app.services.upload_service.BlobService.acquire", new_callable=AsyncMock
+            ) as mock_acquire,
+            patch(
+                "app.services.upload_service.FileService.create_file_record", new_callable=AsyncMock
+            ) as mock_create,
+            patch(
+                "app.services.upload_service.UserService.subscribe_user_to_topic",
+                new_callable=AsyncMock,
+            ) as mock_subscribe,
+        ):
+            mock_create.return_value = File(id=7, topic="resumable_book")
+
+            file_record = await UploadService.finalize(mock_db, upload_session)
+
+        assert file_record.topic == "resumable_book"
+        assert FileService.blob_path(checksum).read_bytes() == content
+        # Kept until the transaction commits
+        assert UploadService.partial_path("session-1").read_bytes() == content
+        assert mock_acquire.call_args.kwargs["checksum"] == checksum
+        assert mock_create.call_args.kwargs["size"] == len(content)
+        mock_subscribe.assert_called_once_with(db=mock_db, user_id=1, topic="resumable_book")
+        assert upload_session.status == "completed"
+        assert upload_session.file_id == 7
+
+    @pytest.mark.asyncio
+    async def test_finalize_again_after_rollback(self, upload_dir):
+        """Test a finalize whose transaction failed leaves the session finalizable."""
+        content = b"complete book"
+        UploadService.partial_path("session-1").write_bytes(content)
+        checksum = hashlib.sha256(content).hexdigest()
+
+        with (
+            patch("app.services.upload_service.BlobService.acquire", new_callable=AsyncMock),
+            patch(
+                "app.services.upload_service.FileService.create_file_record", new_callable=AsyncMock
+            ) as mock_create,
+            patch(
+                "app.services.upload_service.UserService.subscribe_user_to_topic",
+                new_callable=AsyncMock,
+            ),
+        ):
+            mock_create.side_effect = [
+                RuntimeError("insert failed"),
+                File(id=7, topic="resumable_book"),
+            ]
+
+            with pytest.raises(RuntimeError):
+                await UploadService.finalize(AsyncMock(), make_session(bytes_received=len(content)))
+
+            # Chunks cannot change the content now linked into the blob store
+            with pytest.raises(UploadConflictError, match="being finalized"):
+                await UploadService.write_chunk(
+                    mock_db_returning(len(content)),
+                    make_session(bytes_received=len(content)),
+                    len(content),
+                    iter_chunks(b"more"),
+                )
+
+            upload_session = make_session(bytes_received=len(content))
+            await UploadService.finalize(AsyncMock(), upload_session)
+
+        await UploadService.discard_partial(upload_session)
+        assert FileService.blob_path(checksum).read_bytes() == content
+        assert not UploadService.partial_path("session-1").exists()
+        assert list(UploadService.partial_path("session-1").parent.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_expire_sessions_skips_locked_rows(self):
+        """Test idle sessions are expired with one UPDATE over a SKIP LOCKED subquery."""
+        mock_db = AsyncMock()
+        result = MagicMock()
+        result.all.return_value = ["session-1"]
+        mock_db.scalars.return_value = result
+
+        expired = await UploadService.expire_sessions(mock_db, 100)
+
+        sql = str(mock_db.scalars.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert expired == ["session-1"]
+        assert sql.startswith("UPDATE upload_sessions SET status=")
+        assert "upload_sessions.updated_at <" in sql
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "RETURNING upload_sessions.id" in sql
+
+    @pytest.mark.asyncio
+    async def test_remove_partial(self, upload_dir):
+        """Test the partial file and a blob link left by a failed finalize are removed."""
+        partial_path = UploadService.partial_path("session-1")
+        partial_path.with_name("session-1.blob").write_bytes(b"")
+
+        await UploadService.remove_partial("session-1")
+
+        assert list(partial_path.parent.iterdir()) == []
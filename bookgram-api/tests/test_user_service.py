@@ -4,18 +4,29 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 
 from app.db.models.user import User
+from app.services.cache import topic_id_cache
 from app.services.user_service import UserService
 
 
+@pytest.fixture(autouse=True)
+def known_topics() -> None:
+    """Cache the topics used here, so subscribing resolves them without a query."""
+    for topic_id, name in enumerate(("python", "python_basics", "rust"), start=1):
+        topic_id_cache.put(name, topic_id)
+
+
 class TestUserService:
     """Test UserService class."""
 
     @pytest.mark.asyncio
     async def test_create_user(self):
-        """Test creating a new user."""
-        mock_db = AsyncMock()
-        mock_db.add = MagicMock()
-        mock_db.flush = AsyncMock()
+        """Test creating a new user is a single INSERT ... RETURNING."""
+        mock_db = AsyncMock(info={})
+        mock_result = MagicMock()
+        mock_result.scalar_one.return_value = User(
+            id=1, email="newuser@example.com", username="newuser"
+        )
+        mock_db.execute.return_value = mock_result
         
         user = await UserService.create_user(
             db=mock_db,
@@ -23,21 +34,23 @@ class TestUserService:
             username="newuser",
         )
 
+        assert user.id == 1
         assert user.email == "newuser@example.com"
-        assert user.username == "newuser"
-        assert user.subscribed_topics == []
-        mock_db.add.assert_called_once()
-        mock_db.flush.assert_called_once()
+        mock_db.execute.assert_called_once()
+        statement = mock_db.execute.call_args.args[0]
+        assert str(statement).startswith("INSERT INTO users")
+        assert "RETURNING" in str(statement)
+        mock_db.flush.assert_not_called()
+        mock_db.refresh.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_get_user(self):
         """Test getting a user by ID."""
-        mock_db = AsyncMock()
+        mock_db = AsyncMock(info={})
         mock_user = User(
             id=1,
             email="test@example.com",
             username="testuser",
-            subscribed_topics=[],
         )
         
         mock_result = MagicMock()
@@ -55,7 +68,7 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_get_user_not_found(self):
         """Test getting non-existent user returns None."""
-        mock_db = AsyncMock()
+        mock_db = AsyncMock(info={})
         mock_result = MagicMock()
         mock_result.scalar_one_or_none.return_value = None
         mock_db.execute.return_value = mock_result
@@ -67,119 +80,123 @@ class TestUserService:
 
     @pytest.mark.asyncio
     async def test_subscribe_user_to_topic(self):
-        """Test subscribing user to a topic."""
-        mock_db = AsyncMock()
-        mock_db.flush = AsyncMock()
-        mock_db.refresh = AsyncMock()
-        
-        mock_user = User(
-            id=1,
-            email="subscriber@example.com",
-            username="subscriber",
-            subscribed_topics=[],
-        )
-        
+        """Test subscribing user to a topic is a single INSERT statement."""
+        mock_db = AsyncMock(info={})
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_user
+        mock_result.one.return_value = (True, 1)
         mock_db.execute.return_value = mock_result
 
-        updated_user = await UserService.subscribe_user_to_topic(
+        subscribed = await UserService.subscribe_user_to_topic(
             db=mock_db,
             user_id=1,
             topic="python_basics",
         )
 
-        assert updated_user is not None
-        assert "python_basics" in updated_user.subscribed_topics
-        mock_db.flush.assert_called_once()
-        mock_db.refresh.assert_called_once()
+        assert subscribed is True
+        mock_db.execute.assert_called_once()
+        statement = str(mock_db.execute.call_args.args[0])
+        assert "INSERT INTO user_topic_subscriptions" in statement
+        assert "ON CONFLICT DO NOTHING" in statement
+        mock_db.flush.assert_not_called()
+        mock_db.refresh.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_subscribe_user_to_multiple_topics(self):
-        """Test subscribing user to multiple topics."""
-        mock_db = AsyncMock()
-        mock_db.flush = AsyncMock()
-        mock_db.refresh = AsyncMock()
-        
-        mock_user = User(
-            id=1,
-            email="multi@example.com",
-            username="multiuser",
-            subscribed_topics=[],
-        )
-        
+    async def test_subscribe_to_same_topic_twice(self):
+        """Test subscribing to an existing subscription inserts nothing."""
+        mock_db = AsyncMock(info={})
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_user
+        mock_result.one.return_value = (True, 0)
         mock_db.execute.return_value = mock_result
 
-        # Subscribe to multiple topics
-        await UserService.subscribe_user_to_topic(
+        subscribed = await UserService.subscribe_user_to_topic(
             db=mock_db,
             user_id=1,
             topic="python",
         )
-        await UserService.subscribe_user_to_topic(
-            db=mock_db,
-            user_id=1,
-            topic="javascript",
-        )
-        updated_user = await UserService.subscribe_user_to_topic(
-            db=mock_db,
-            user_id=1,
-            topic="rust",
-        )
 
-        assert updated_user is not None
-        assert len(updated_user.subscribed_topics) == 3
-        assert "python" in updated_user.subscribed_topics
-        assert "javascript" in updated_user.subscribed_topics
-        assert "rust" in updated_user.subscribed_topics
+        assert subscribed is False
+        mock_db.execute.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_subscribe_to_same_topic_twice(self):
-        """Test subscribing to same topic twice doesn't duplicate."""
-        mock_db = AsyncMock()
-        mock_db.flush = AsyncMock()
-        mock_db.refresh = AsyncMock()
-        
-        mock_user = User(
-            id=1,
-            email="duplicate@example.com",
-            username="duplicateuser",
-            subscribed_topics=[],
-        )
+    async def test_subscribe_user_not_found(self):
+        """Test subscribing non-existent user raises error."""
+        mock_db = AsyncMock(info={})
+        mock_result = MagicMock()
+        mock_result.one.return_value = (False, 0)
+        mock_db.execute.return_value = mock_result
         
+        with pytest.raises(ValueError, match="User with id 99999 not found"):
+            await UserService.subscribe_user_to_topic(
+                db=mock_db,
+                user_id=99999,
+                topic="python",
+            )
+
+    @pytest.mark.asyncio
+    async def test_subscribe_user_to_topics(self):
+        """Test subscribing to many topics is a single INSERT statement."""
+        mock_db = AsyncMock(info={})
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_user
+        mock_result.one.return_value = (True, 2)
         mock_db.execute.return_value = mock_result
 
-        # Subscribe to same topic twice
-        await UserService.subscribe_user_to_topic(
+        inserted = await UserService.subscribe_user_to_topics(
             db=mock_db,
             user_id=1,
-            topic="python",
-        )
-        updated_user = await UserService.subscribe_user_to_topic(
-            db=mock_db,
-            user_id=1,
-            topic="python",
+            topics=["python", "rust", "python"],
         )
 
-        assert updated_user is not None
-        assert len(updated_user.subscribed_topics) == 1
-        assert updated_user.subscribed_topics.count("python") == 1
+        assert inserted == 2
+        mock_db.execute.assert_called_once()
+        statement = str(mock_db.execute.call_args.args[0])
+        assert "INSERT INTO user_topic_subscriptions" in statement
+        assert "unnest" in statement
+        assert [1, 3] in mock_db.execute.call_args.args[0].compile().params.values()
 
     @pytest.mark.asyncio
-    async def test_subscribe_user_not_found(self):
-        """Test subscribing non-existent user raises error."""
-        mock_db = AsyncMock()
+    async def test_subscribe_user_to_topics_user_not_found(self):
+        """Test subscribing a non-existent user to many topics raises error."""
+        mock_db = AsyncMock(info={})
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
+        mock_result.one.return_value = (False, 0)
         mock_db.execute.return_value = mock_result
-        
+
         with pytest.raises(ValueError, match="User with id 99999 not found"):
-            await UserService.subscribe_user_to_topic(
+            await UserService.subscribe_user_to_topics(
                 db=mock_db,
                 user_id=99999,
-                topic="python",
+                topics=["python"],
             )
+
+    @pytest.mark.asyncio
+    async def test_get_subscribed_topics(self):
+        """Test listing a user's subscribed topics."""
+        mock_db = AsyncMock(info={})
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = ["python", "rust"]
+        mock_db.execute.return_value = mock_result
+
+        topics = await UserService.get_subscribed_topics(db=mock_db, user_id=1)
+
+        assert topics == ["python", "rust"]
+        mock_db.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_topic_subscribers_uses_keyset(self):
+        """Test subscriber pages continue after the last user ID."""
+        mock_db = AsyncMock(info={})
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = [8, 9]
+        mock_db.execute.return_value = mock_result
+
+        user_ids = await UserService.get_topic_subscribers(
+            db=mock_db,
+            topic="python",
+            after_user_id=7,
+            limit=2,
+        )
+
+        assert user_ids == [8, 9]
+        statement = str(mock_db.execute.call_args.args[0])
+        assert "user_topic_subscriptions.user_id >" in statement
+        assert "ORDER BY user_topic_subscriptions.user_id" in statement
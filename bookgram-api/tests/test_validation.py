@@ -0,0 +1,198 @@
+"""Tests for streaming content validation."""
+
+import io
+import zipfile
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.services.exceptions import CorruptUploadError
+from app.services.file_service import FileService
+from app.services.validation import (
+    EpubValidator,
+    PdfValidator,
+    TextValidator,
+    content_validator,
+)
+
+
+def make_pdf(xref: int | None = None) -> bytes:
+    """Minimal PDF with a classic xref table (startxref points at it unless given)."""
+    body = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog >>\nendobj\n"
+    xref = len(body) if xref is None else xref
+    return body + (
+        b"xref\n0 2\n0000000000 65535 f \n0000000009 00000 n \n"
+        b"trailer\n<< /Size 2 /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % xref
+    )
+
+
+def make_epub(container: bool = True) -> bytes:
+    """Minimal EPUB (zip) archive."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("mimetype", "application/epub+zip")
+        if container:
+            archive.writestr("META-INF/container.xml", "<container/>")
+        archive.writestr("chapter.xhtml", "<p>" + "text " * 1000 + "</p>")
+    return buffer.getvalue()
+
+
+def validate(validator, content: bytes, path, chunk_size: int = 7) -> None:
+    """Feed content in small chunks, store it at path and finish."""
+    path.write_bytes(content)
+    for start in range(0, len(content), chunk_size):
+        validator.update(content[start : start + chunk_size])
+    validator.finish(path)
+
+
+class TestTextValidator:
+    """Test UTF-8 text checks."""
+
+    def test_valid_utf8_split_across_chunks(self, tmp_path):
+        """Test multi-byte characters split between chunks are accepted."""
+        validate(TextValidator(), "naïve café — ünïcode ✓\n".encode() * 3, tmp_path / "a.txt")
+
+    @pytest.mark.parametrize(
+        ("content", "message"),
+        [
+            (b"plain text\xff more", "invalid byte at offset 10"),
+            (b"binary\x00data", "NUL byte at offset 6"),
+            ("ends mid-character é".encode()[:-1], "truncated character"),
+        ],
+        ids=["invalid", "binary", "truncated"],
+    )
+    def test_invalid_text_rejected(self, tmp_path, content, message):
+        """Test non-UTF-8, binary and truncated text are rejected."""
+        with pytest.raises(CorruptUploadError, match=message):
+            validate(TextValidator(), content, tmp_path / "a.txt", chunk_size=4)
+
+
+class TestPdfValidator:
+    """Test PDF header and trailer checks."""
+
+    def test_valid_pdf(self, tmp_path):
+        """Test a PDF whose startxref points at its xref table is accepted."""
+        validate(PdfValidator(), make_pdf(), tmp_path / "a.pdf")
+
+    def test_missing_header_rejected_early(self):
+        """Test content without a header is rejected within the first kilobyte."""
+        validator = PdfValidator()
+        with pytest.raises(CorruptUploadError, match="missing %PDF- header"):
+            validator.update(b"MZ" + b"\x00" * 4096)
+
+    @pytest.mark.parametrize(
+        ("content", "message"),
+        [
+            (make_pdf()[:-40], "no startxref/%%EOF trailer"),
+            (make_pdf(xref=12), "not a cross-reference"),
+        ],
+        ids=["truncated", "bad_offset"],
+    )
+    def test_broken_trailer_rejected(self, tmp_path, content, message):
+        """Test truncated PDFs and wrong xref offsets are rejected."""
+        with pytest.raises(CorruptUploadError, match=message):
+            validate(PdfValidator(), content, tmp_path / "a.pdf")
+
+
+class TestEpubValidator:
+    """Test EPUB zip structure checks."""
+
+    def test_valid_epub(self, tmp_path):
+        """Test an EPUB archive is accepted."""
+        validate(EpubValidator(), make_epub(), tmp_path / "a.epub", chunk_size=1000)
+
+    def test_not_a_zip_rejected_early(self):
+        """Test content without a zip header is rejected on the first bytes."""
+        validator = EpubValidator()
+        with pytest.raises(CorruptUploadError, match="not a zip archive"):
+            validator.update(b"%PDF")
+
+    @pytest.mark.parametrize(
+        ("content", "message"),
+        [
+            (make_epub()[:-100], "no zip central directory"),
+            (make_epub(container=False), "no META-INF/container.xml"),
+        ],
+        ids=["truncated", "no_container"],
+    )
+    def test_broken_archive_rejected(self, tmp_path, content, message):
+        """Test truncated archives and zips that are not EPUBs are rejected."""
+        with pytest.raises(CorruptUploadError, match=message):
+            validate(EpubValidator(), content, tmp_path / "a.epub", chunk_size=1000)
+
+
+def test_validator_per_format(monkeypatch):
+    """Test every allowed format has a validator, unless validation is off."""
+    assert all(content_validator(f) is not None for f in FileService.ALLOWED_FORMATS)
+
+    monkeypatch.setattr(settings, "VALIDATE_UPLOAD_CONTENT", False)
+    assert FileService.content_validator("txt") is None
+
+
+@pytest.mark.asyncio
+async def test_rejected_before_whole_stream_is_read(tmp_path, monkeypatch):
+    """Test invalid content stops the upload at the chunk that proves it invalid."""
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+    consumed = []
+
+    async def chunks():
+        for chunk in (b"\x7fELF\x02\x01\x01\x00", b"more", b"and more"):
+            consumed.append(chunk)
+            yield chunk
+
+    with pytest.raises(CorruptUploadError):
+        await FileService.save_stream_to_disk(chunks(), validator=TextValidator())
+
+    assert len(consumed) == 1
+    assert [p for p in tmp_path.iterdir() if p.is_file()] == []
+
+
+@pytest.mark.asyncio
+async def test_save_rejects_binary_renamed_to_txt(client: AsyncClient, tmp_path, monkeypatch):
+    """Test the save endpoint answers 400 for binary content named .txt."""
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+
+    response = await client.post(
+        "/api/v1/files/save",
+        files={"file": ("book.txt", b"\x89PNG\r\n\x1a\n\x00\x00", "text/plain")},
+        data={"title": "Renamed", "user_id": "1"},
+    )
+
+    assert response.status_code == 400
+    assert "not text" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_save_rejects_before_body_is_read(client: AsyncClient, tmp_path, monkeypatch):
+    """Test invalid content is rejected while the rest of the multipart body is unsent."""
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 64)
+    boundary = "b0undary"
+    body = (
+        (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="title"\r\n\r\nBinary\r\n'
+            f'--{boundary}\r\nContent-Disposition: form-data; name="user_id"\r\n\r\n1\r\n'
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="a.txt"\r\n\r\n'
+        ).encode()
+        + b"\x7fELF\x00"
+        + b"\x00" * 100000
+        + f"\r\n--{boundary}--\r\n".encode()
+    )
+    sent = []
+
+    async def pieces():
+        for start in range(0, len(body), 1024):
+            sent.append(start)
+            yield body[start : start + 1024]
+
+    response = await client.post(
+        "/api/v1/files/save",
+        content=pieces(),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+
+    assert response.status_code == 400
+    assert "NUL byte" in response.json()["detail"]
+    assert len(sent) < 5
+    assert [p for p in tmp_path.iterdir() if p.is_file()] == []